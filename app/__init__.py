@@ -2,8 +2,22 @@ from flask import Flask
 from app.routes.properties import properties_bp
 from app.routes.auth import auth_bp
 from app.routes.users import users_bp
-from app.extensions import cors, db, migrate, jwt
+from app.routes.tenants import tenants_bp
+from app.routes.batch import batch_bp
+from app.routes.chats import chats_bp
+from app.routes.ledger import ledger_bp
+from app.routes.sync import sync_bp
+from app.extensions import cors, db, migrate, jwt, mail
+from app.commands import register_commands
+from app.compression import init_compression
+from app.db_routing import shard_bind
+from app.profiling import init_profiling
+from app.query_log import init_slow_query_log
+from app.request_log import init_logging, restart_log_listener
+from app.services.lease_expiry import start_lease_expiry_scheduler
+from app.services.token_denylist import TokenDenylist, is_token_revoked
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -16,23 +30,61 @@ def create_app():
     env = os.getenv("FLASK_ENV", "development")  # Default to 'development' if not set
     configure_app(app, env)
 
+    # JSON request and error logs, written by a background thread
+    init_logging(app)
+
     # Initialize extensions
     cors.init_app(app)  # Enable CORS
     db.init_app(app)
     migrate.init_app(app, db)
 
-#TODO: UNCOMMENT WHEN START MAIL DEVELOPMENT
-    # mail.init_app(app)
+    mail.init_app(app)
     jwt.init_app(app)
 
+    # Revoked tokens are checked against an in-memory copy of the revoked_token table
+    app.extensions["token_denylist"] = TokenDenylist()
+    jwt.token_in_blocklist_loader(is_token_revoked)
+
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(users_bp, url_prefix="/api/users")
     app.register_blueprint(properties_bp, url_prefix="/api/properties")
+    app.register_blueprint(tenants_bp, url_prefix="/api/tenants")
+    app.register_blueprint(chats_bp, url_prefix="/api/chats")
+    app.register_blueprint(ledger_bp, url_prefix="/api/tenancies")
+    app.register_blueprint(batch_bp, url_prefix="/api/batch")
+    app.register_blueprint(sync_bp, url_prefix="/api/sync")
+
+    register_commands(app)
+    init_compression(app)
+    init_slow_query_log(app)
+    init_profiling(app)
+
+    # Optional in-process lease-expiry scan; enable it in one process only
+    scan_interval = app.config["LEASE_EXPIRY_SCAN_INTERVAL"]
+    if scan_interval > 0 and not app.config.get("TESTING"):
+        app.extensions["lease_expiry_scheduler"] = start_lease_expiry_scheduler(app, scan_interval)
 
     return app
 
 
+def reinit_after_fork(app):
+    """
+    Make a worker forked from a preloaded app safe to serve requests.
+
+    Pooled connections inherited from the parent are dropped without closing
+    them, since the parent still owns the sockets, so the worker opens its own.
+    Background threads don't survive fork, so the log writer and EXPLAIN worker
+    are restarted.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    restart_log_listener(app)
+    if "slow_query_log" in app.extensions:
+        app.extensions["slow_query_log"].restart_after_fork()
+
+
 def configure_app(app, env):
     """Configure the Flask app based on the environment."""
     # Common configurations
@@ -40,6 +92,124 @@ def configure_app(app, env):
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
     app.config["JWT_SECRET_KEY"] = os.getenv('JWT_SECRET_KEY')
 
+    # Optional read replica; GET routes marked with read_from_replica use it
+    binds = {}
+    replica_url = os.getenv("REPLICA_DATABASE_URL")
+    if replica_url:
+        binds["replica"] = replica_url
+    app.config["SQLALCHEMY_REPLICA_STICKY_SECONDS"] = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+    # Optional shards for landlord portfolios, as comma-separated URLs; the default
+    # database is shard 0 and the listed databases are shards 1, 2, ...
+    shard_urls = [url.strip() for url in os.getenv("SHARD_DATABASE_URLS", "").split(",") if url.strip()]
+    for shard, shard_url in enumerate(shard_urls, start=1):
+        binds[shard_bind(shard)] = shard_url
+    app.config["SHARD_COUNT"] = 1 + len(shard_urls)
+    if binds:
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+    # Upper bound on the number of tenancies in one batch request
+    app.config["TENANCY_BATCH_MAX_SIZE"] = int(os.getenv("TENANCY_BATCH_MAX_SIZE", "500"))
+
+    # Upper bound on the number of tenant accounts created by one provisioning request
+    app.config["TENANT_PROVISIONING_MAX_SIZE"] = int(os.getenv("TENANT_PROVISIONING_MAX_SIZE", "100"))
+
+    # Upper bound on the number of properties deleted by one batch request
+    app.config["PROPERTY_BATCH_DELETE_MAX_SIZE"] = int(os.getenv("PROPERTY_BATCH_DELETE_MAX_SIZE", "100"))
+
+    # Longest rent-roll projection, which bounds the per-property month matrix
+    app.config["RENT_ROLL_MAX_MONTHS"] = int(os.getenv("RENT_ROLL_MAX_MONTHS", "60"))
+
+    # Lease-expiry scanner; a scan interval in seconds of 0 leaves it to the CLI command
+    app.config["LEASE_EXPIRY_HORIZON_DAYS"] = int(os.getenv("LEASE_EXPIRY_HORIZON_DAYS", "60"))
+    app.config["LEASE_EXPIRY_BATCH_SIZE"] = int(os.getenv("LEASE_EXPIRY_BATCH_SIZE", "500"))
+    app.config["LEASE_EXPIRY_SCAN_INTERVAL"] = int(os.getenv("LEASE_EXPIRY_SCAN_INTERVAL", "0"))
+
+    # Access tokens are short-lived and renewed with a refresh token; each refresh slides the
+    # session forward by the refresh lifetime, up to JWT_SESSION_MAX_DAYS after the login
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "15")))
+    app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "14")))
+    app.config["JWT_SESSION_MAX_DAYS"] = int(os.getenv("JWT_SESSION_MAX_DAYS", "90"))
+
+    # Hours a provisioned tenant has to set a password with the emailed link
+    app.config["PASSWORD_SETUP_TOKEN_HOURS"] = int(os.getenv("PASSWORD_SETUP_TOKEN_HOURS", "72"))
+
+    # Seconds before a process picks up token revocations made by other processes
+    app.config["JWT_DENYLIST_REFRESH_SECONDS"] = int(os.getenv("JWT_DENYLIST_REFRESH_SECONDS", "5"))
+
+    # Messages move to the archive table once older than MESSAGE_ARCHIVE_AFTER_DAYS, or once
+    # their tenancy ended MESSAGE_ARCHIVE_ENDED_TENANCY_DAYS ago; history reads span both tables
+    app.config["MESSAGE_ARCHIVE_AFTER_DAYS"] = int(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "365"))
+    app.config["MESSAGE_ARCHIVE_ENDED_TENANCY_DAYS"] = int(os.getenv("MESSAGE_ARCHIVE_ENDED_TENANCY_DAYS", "90"))
+    app.config["MESSAGE_ARCHIVE_BATCH_SIZE"] = int(os.getenv("MESSAGE_ARCHIVE_BATCH_SIZE", "1000"))
+    app.config["MESSAGE_HISTORY_MAX_PAGE_SIZE"] = int(os.getenv("MESSAGE_HISTORY_MAX_PAGE_SIZE", "100"))
+
+    # Stored responses of create requests sent with an Idempotency-Key header are replayed
+    # for this long; a key left in progress is released after the lock timeout
+    app.config["IDEMPOTENCY_TTL_SECONDS"] = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    app.config["IDEMPOTENCY_LOCK_SECONDS"] = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+    # Logging; successful requests faster than LOG_SLOW_REQUEST_MS are logged at the sample rate
+    app.config["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "INFO").upper()
+    app.config["LOG_ACCESS_SAMPLE_RATE"] = float(os.getenv("LOG_ACCESS_SAMPLE_RATE", "1.0"))
+    app.config["LOG_SLOW_REQUEST_MS"] = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+    app.config["LOG_QUEUE_SIZE"] = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # Slow-query log: statements over the threshold are logged with their endpoint and,
+    # for SELECTs, an EXPLAIN plan captured in the background (ANALYZE re-runs the query)
+    app.config["SLOW_QUERY_LOG_ENABLED"] = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() == "true"
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    app.config["SLOW_QUERY_SAMPLE_RATE"] = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+    app.config["SLOW_QUERY_EXPLAIN"] = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    app.config["SLOW_QUERY_EXPLAIN_ANALYZE"] = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "false").lower() == "true"
+    app.config["SLOW_QUERY_EXPLAIN_INTERVAL"] = int(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+
+    # On-demand profiling: requests sending this token in X-Profile-Token are profiled
+    # and their profile written to PROFILING_DIR; disabled when no token is set
+    app.config["PROFILING_TOKEN"] = os.getenv("PROFILING_TOKEN")
+    app.config["PROFILING_DIR"] = os.getenv("PROFILING_DIR", os.path.join(app.instance_path, "profiles"))
+
+    # Largest page of ledger entries, and of tenancies in arrears, returned at once
+    app.config["LEDGER_MAX_PAGE_SIZE"] = int(os.getenv("LEDGER_MAX_PAGE_SIZE", "200"))
+    app.config["ARREARS_MAX_RESULTS"] = int(os.getenv("ARREARS_MAX_RESULTS", "500"))
+
+    # Incremental sync: largest number of changes returned at once, and days changes are kept
+    app.config["SYNC_MAX_PAGE_SIZE"] = int(os.getenv("SYNC_MAX_PAGE_SIZE", "500"))
+    app.config["SYNC_RETENTION_DAYS"] = int(os.getenv("SYNC_RETENTION_DAYS", "30"))
+
+    # Radius search: largest radius (meters) and number of properties returned
+    app.config["NEARBY_MAX_RADIUS_M"] = float(os.getenv("NEARBY_MAX_RADIUS_M", "50000"))
+    app.config["NEARBY_MAX_RESULTS"] = int(os.getenv("NEARBY_MAX_RESULTS", "100"))
+
+    # Upper bound on the number of sub-requests in one batch request
+    app.config["BATCH_MAX_REQUESTS"] = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+    # Response compression; bodies below the minimum size (bytes) are sent as is
+    app.config["COMPRESSION_ENABLED"] = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    app.config["COMPRESSION_MIN_SIZE"] = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    app.config["COMPRESSION_LEVEL"] = int(os.getenv("COMPRESSION_LEVEL", "6"))
+    app.config["COMPRESSION_BROTLI_QUALITY"] = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    app.config["APP_NAME"] = os.getenv("APP_NAME", "Rent App")
+
+    # Seconds a cached group chat membership may lag changes made by other processes
+    app.config["CHAT_MEMBERSHIP_CACHE_TTL"] = int(os.getenv("CHAT_MEMBERSHIP_CACHE_TTL", "60"))
+
+    # Email server configuration
+    app.config["MAIL_SERVER"] = os.getenv("MAIL_SERVER", "localhost")
+    app.config["MAIL_PORT"] = int(os.getenv("MAIL_PORT", "25"))
+    app.config["MAIL_USE_TLS"] = os.getenv("MAIL_USE_TLS", "false").lower() == "true"
+    app.config["MAIL_USE_SSL"] = os.getenv("MAIL_USE_SSL", "false").lower() == "true"
+    app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
+    app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
+    app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_DEFAULT_SENDER", "no-reply@rentapp.local")
+
+    # Outbox workers drain queued emails; failed sends are retried with exponential backoff
+    app.config["OUTBOX_BATCH_SIZE"] = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    app.config["OUTBOX_MAX_ATTEMPTS"] = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    app.config["OUTBOX_RETRY_BASE_SECONDS"] = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+    app.config["OUTBOX_CLAIM_TIMEOUT_SECONDS"] = int(os.getenv("OUTBOX_CLAIM_TIMEOUT_SECONDS", "300"))
+
     # Environment-specific configurations
     if env == "testing":
         app.config["TESTING"] = True
@@ -0,0 +1,164 @@
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.idempotency import purge_expired_keys
+from app.services.change_feed import purge_change_log
+from app.services.ledger import rebuild_balances
+from app.services.lease_expiry import scan_expiring_leases
+from app.services.message_archive import archive_messages
+from app.services.outbox import OutboxWorkerPool, drain_outbox
+from app.services.password_setup import purge_expired_password_setup_tokens
+from app.services.portfolio_summary import rebuild_summaries
+from app.services.refresh_tokens import purge_expired_refresh_tokens
+from app.services.tenant_provisioning import purge_pending_tenant_accounts
+from app.services.token_denylist import purge_expired_revocations, revoke_user_tokens
+from app.sharding import create_shard_schema, for_each_shard, shard_directory, shard_engines, use_shard
+
+portfolio_cli = AppGroup("portfolio", help="Maintain landlord portfolio data.")
+leases_cli = AppGroup("leases", help="Lease maintenance jobs.")
+outbox_cli = AppGroup("outbox", help="Send queued emails.")
+auth_cli = AppGroup("auth", help="Manage issued access tokens.")
+messages_cli = AppGroup("messages", help="Group chat message maintenance.")
+idempotency_cli = AppGroup("idempotency", help="Manage stored idempotency keys.")
+ledger_cli = AppGroup("ledger", help="Maintain tenancy rent ledgers.")
+shards_cli = AppGroup("shards", help="Manage landlord portfolio shards.")
+sync_cli = AppGroup("sync", help="Maintain the portfolio change log.")
+
+
+@portfolio_cli.command("rebuild-summaries")
+@click.option("--landlord-id", type=int, default=None, help="Only rebuild this landlord's summary.")
+def rebuild_summaries_command(landlord_id):
+    """Recompute portfolio summaries from the property and tenancy tables."""
+    if landlord_id is not None:
+        with use_shard(shard_directory.shard_for(landlord_id)):
+            count = rebuild_summaries(landlord_id)
+    else:
+        count = sum(rebuild_summaries() for _ in for_each_shard())
+    click.echo(f"Rebuilt {count} portfolio summaries.")
+
+
+@leases_cli.command("scan-expiring")
+@click.option("--days", type=int, default=None, help="How many days ahead to look.")
+@click.option("--batch-size", type=int, default=None, help="Leases processed per batch.")
+def scan_expiring_command(days, batch_size):
+    """Record notifications for leases ending soon."""
+    scanned = notified = 0
+    for _ in for_each_shard():
+        result = scan_expiring_leases(horizon_days=days, batch_size=batch_size)
+        scanned += result["scanned"]
+        notified += result["notified"]
+    click.echo(f"Scanned {scanned} leases, recorded {notified} notifications.")
+
+
+@outbox_cli.command("drain")
+@click.option("--batch-size", type=int, default=None, help="Emails sent per SMTP connection.")
+def drain_outbox_command(batch_size):
+    """Send every due email, then exit."""
+    sent = drain_outbox(batch_size)
+    click.echo(f"Sent {sent} emails.")
+
+
+@outbox_cli.command("worker")
+@click.option("--threads", type=int, default=4, help="Number of worker threads.")
+@click.option("--poll-interval", type=float, default=2.0, help="Seconds to wait when the outbox is empty.")
+@click.option("--batch-size", type=int, default=None, help="Emails sent per SMTP connection.")
+def outbox_worker_command(threads, poll_interval, batch_size):
+    """Keep sending queued emails until interrupted."""
+    pool = OutboxWorkerPool(
+        current_app._get_current_object(), threads=threads,
+        poll_interval=poll_interval, batch_size=batch_size
+    )
+    pool.start()
+    click.echo(f"Outbox worker running with {threads} threads. Press CTRL+C to quit.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+@auth_cli.command("revoke-user")
+@click.argument("user_id", type=int)
+def revoke_user_command(user_id):
+    """Revoke every access token issued to a user so far."""
+    revoke_user_tokens(user_id)
+    click.echo(f"Revoked all tokens of user {user_id}.")
+
+
+@auth_cli.command("purge-revocations")
+def purge_revocations_command():
+    """Delete revocations, refresh tokens and set-password tokens that have expired."""
+    deleted = purge_expired_revocations()
+    click.echo(f"Deleted {deleted} expired revocations.")
+    deleted = purge_expired_refresh_tokens()
+    click.echo(f"Deleted {deleted} expired refresh tokens.")
+    deleted = purge_expired_password_setup_tokens()
+    click.echo(f"Deleted {deleted} expired set-password tokens.")
+
+
+@messages_cli.command("archive")
+@click.option("--days", type=int, default=None, help="Archive messages older than this many days.")
+@click.option("--ended-days", type=int, default=None, help="Archive chats of tenancies ended this many days ago.")
+@click.option("--batch-size", type=int, default=None, help="Messages moved per transaction.")
+def archive_messages_command(days, ended_days, batch_size):
+    """Move cold messages to the archive table."""
+    archived = sum(
+        archive_messages(max_age_days=days, ended_tenancy_days=ended_days, batch_size=batch_size)
+        for _ in for_each_shard()
+    )
+    click.echo(f"Archived {archived} messages.")
+
+
+@idempotency_cli.command("purge-expired")
+def purge_idempotency_keys_command():
+    """Delete idempotency keys past their TTL."""
+    deleted = purge_expired_keys()
+    click.echo(f"Deleted {deleted} expired idempotency keys.")
+
+
+@ledger_cli.command("rebuild-balances")
+@click.option("--tenancy-id", type=int, default=None, help="Only rebuild this tenancy's balance.")
+def rebuild_balances_command(tenancy_id):
+    """Recompute tenancy balances from the ledger."""
+    count = sum(rebuild_balances(tenancy_id) for _ in for_each_shard())
+    click.echo(f"Rebuilt {count} tenancy balances.")
+
+
+@shards_cli.command("create-schema")
+def create_shard_schema_command():
+    """Create the portfolio tables on every shard database."""
+    for shard, engine in shard_engines().items():
+        if shard:
+            create_shard_schema(engine)
+            click.echo(f"Created the portfolio tables on shard {shard}.")
+
+
+@shards_cli.command("purge-pending-tenants")
+@click.option("--minutes", type=int, default=60, help="Only purge accounts pending for this many minutes.")
+def purge_pending_tenants_command(minutes):
+    """Delete tenant accounts whose provisioning died before their tenancy links committed."""
+    deleted = purge_pending_tenant_accounts(datetime.utcnow() - timedelta(minutes=minutes))
+    click.echo(f"Deleted {deleted} pending tenant accounts.")
+
+
+@sync_cli.command("purge-changes")
+@click.option("--days", type=int, default=None, help="Keep changes from this many days.")
+def purge_changes_command(days):
+    """Delete changes older than the sync retention period."""
+    deleted = sum(purge_change_log(days) for _ in for_each_shard())
+    click.echo(f"Deleted {deleted} logged changes.")
+
+
+def register_commands(app):
+    """Register the app's CLI command groups."""
+    app.cli.add_command(portfolio_cli)
+    app.cli.add_command(leases_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(auth_cli)
+    app.cli.add_command(messages_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(shards_cli)
+    app.cli.add_command(sync_cli)
@@ -0,0 +1,151 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain", "text/html"}
+
+
+def compress_response(enabled=True, min_size=None, level=None):
+    """
+    Override the compression settings of a view.
+
+    Apply below the route decorator. Use `compress_response(enabled=False)` for
+    responses that mix secrets with user input, where compression leaks
+    information (BREACH).
+
+    Args:
+        enabled (bool): Whether the view's responses may be compressed.
+        min_size (int): Smallest body compressed, instead of COMPRESSION_MIN_SIZE.
+        level (int): gzip level (1-9) or brotli quality (0-11), instead of the configured one.
+    """
+    def decorator(view):
+        view.compression_options = {"enabled": enabled, "min_size": min_size, "level": level}
+        return view
+    return decorator
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk):
+        # Sync-flush each chunk so the client can decode it as soon as it arrives
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _new_stream(encoding, level):
+    if encoding == "br":
+        return _BrotliStream(level)
+    return _GzipStream(level)
+
+
+def compress_chunks(chunks, encoding, level):
+    """
+    Compress an iterable of body chunks one by one, without buffering the body.
+
+    Args:
+        chunks (iterable): The response body, as bytes or str chunks.
+        encoding (str): "gzip" or "br".
+        level (int): gzip level or brotli quality.
+
+    Yields:
+        bytes: Compressed chunks, together forming one gzip or brotli stream.
+    """
+    stream = _new_stream(encoding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                yield stream.compress(chunk)
+        yield stream.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def compress_body(body, encoding, level):
+    """Compress a complete response body."""
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _negotiate_encoding():
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def _view_options():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(view, "compression_options", {})
+
+
+def compress(response):
+    """
+    after_request hook compressing eligible responses with the client's preferred encoding.
+
+    Buffered bodies are compressed whole once they reach the minimum size;
+    streamed bodies are compressed chunk by chunk as they are sent.
+    """
+    options = _view_options()
+    if not current_app.config["COMPRESSION_ENABLED"] or not options.get("enabled", True):
+        return response
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    level = options.get("level")
+    if level is None:
+        level = current_app.config["COMPRESSION_BROTLI_QUALITY" if encoding == "br" else "COMPRESSION_LEVEL"]
+
+    if response.is_streamed:
+        response.response = compress_chunks(response.response, encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        min_size = options.get("min_size")
+        if min_size is None:
+            min_size = current_app.config["COMPRESSION_MIN_SIZE"]
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        response.set_data(compress_body(body, encoding, level))
+
+    response.headers["Content-Encoding"] = encoding
+    # The compressed body differs from the identity one, so strong validators no longer apply
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Register response compression on the app."""
+    app.after_request(compress)
@@ -0,0 +1,179 @@
+import threading
+import time
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Bind key of the optional read replica in SQLALCHEMY_BINDS
+REPLICA_BIND = "replica"
+
+# Tables holding a landlord's portfolio, which live on the landlord's shard. Shard 0 is the
+# default database; shard n > 0 is the "shard_<n>" bind. Everything else stays on the default.
+SHARDED_TABLES = frozenset({
+    "landlord_summary", "property", "tenancy", "tenancy_tenants", "group_chat", "message",
+    "message_archive", "lease_expiry_notification", "ledger_entry", "tenancy_balance",
+    "change_log", "change_log_head",
+})
+
+
+def shard_bind(shard):
+    """The SQLALCHEMY_BINDS key of a shard."""
+    return f"shard_{shard}"
+
+
+def current_shard():
+    """The shard selected for the current app context (0, the default database, if none)."""
+    return (g.get("shard") or 0) if has_app_context() else 0
+
+
+class RecentWriters:
+    """
+    Remember which users committed writes recently, so their follow-up reads
+    are served by the primary until the replica has caught up.
+    """
+
+    def __init__(self, max_entries=10000):
+        self._writes = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def record(self, identity, window):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._writes) >= self._max_entries:
+                self._writes = {
+                    key: written_at for key, written_at in self._writes.items()
+                    if now - written_at < window
+                }
+            self._writes[identity] = now
+
+    def wrote_within(self, identity, window):
+        written_at = self._writes.get(identity)
+        return written_at is not None and time.monotonic() - written_at < window
+
+    def clear(self):
+        with self._lock:
+            self._writes.clear()
+
+
+recent_writers = RecentWriters()
+
+
+def _current_identity():
+    """Return the JWT identity of the request, or None outside an authenticated request."""
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def _sticky_seconds():
+    return current_app.config.get("SQLALCHEMY_REPLICA_STICKY_SECONDS", 10)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends statements on sharded tables to the shard selected in
+    `g.shard`, and reads to the replica bind while the current view is marked
+    with `read_from_replica` and nothing has been written in this session.
+    Everything else, including models with their own bind key, uses the
+    regular Flask-SQLAlchemy bind selection.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            shard = current_shard()
+            if shard and _statement_table_name(mapper, clause) in SHARDED_TABLES:
+                return self._db.engines[shard_bind(shard)]
+        if bind is None and self._reads_from_replica() and _uses_default_bind(mapper, clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self):
+        if not has_app_context() or g.get("db_route") != "replica":
+            return False
+        if self._flushing or self.info.get("has_writes"):
+            return False
+        return REPLICA_BIND in self._db.engines
+
+
+def _statement_table_name(mapper, clause):
+    """The name of the table a statement targets, or None if it can't be told."""
+    table = None
+    if mapper is not None:
+        table = sa.inspect(mapper).local_table
+    elif isinstance(clause, sa.Table):
+        table = clause
+    elif isinstance(clause, sa.UpdateBase):
+        table = clause.table
+    elif isinstance(clause, sa.CompoundSelect):
+        # UNIONs of portfolio queries are routed by their first select
+        return _statement_table_name(None, clause.selects[0])
+    elif isinstance(clause, sa.Select):
+        froms = clause.get_final_froms()
+        table = froms[0] if froms else None
+        while isinstance(table, sa.Join):
+            table = table.left
+    return table.name if isinstance(table, sa.Table) else None
+
+
+def _uses_default_bind(mapper, clause):
+    """Check that the statement targets tables on the default bind."""
+    table = None
+    if mapper is not None:
+        table = sa.inspect(mapper).local_table
+    elif isinstance(clause, sa.Table):
+        table = clause
+    elif isinstance(clause, sa.UpdateBase):
+        return False
+    if table is None:
+        return True
+    return table.metadata.info.get("bind_key") is None
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _bind_compound_selects(orm_execute_state):
+    # The ORM passes neither a mapper nor the statement to get_bind for a UNION of
+    # ORM selects, so hand it the statement to route by
+    if isinstance(orm_execute_state.statement, sa.CompoundSelect):
+        orm_execute_state.bind_arguments.setdefault("clause", orm_execute_state.statement)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_session_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_recent_writer(session):
+    if not session.info.get("has_writes") or not has_app_context():
+        return
+    identity = _current_identity()
+    if identity is not None:
+        recent_writers.record(identity, _sticky_seconds())
+
+
+def read_from_replica(view):
+    """
+    Serve the wrapped view from the read replica, if one is configured.
+
+    Users who committed a write within SQLALCHEMY_REPLICA_STICKY_SECONDS keep
+    reading from the primary so they always see their own changes. Apply it
+    below `jwt_required` so the caller's identity is known.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        previous_route = g.get("db_route")
+        identity = _current_identity()
+        if identity is None or not recent_writers.wrote_within(identity, _sticky_seconds()):
+            g.db_route = "replica"
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.db_route = previous_route
+
+    return wrapper
@@ -1,15 +1,47 @@
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
+from flask import g, has_app_context
 from flask_jwt_extended import JWTManager
+from flask_mail import Mail
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.db_routing import RoutingSession
 
-#TODO: UNCOMMENT WHEN START MAIL DEVELOPMENT
-# mail = Mail()
-db = SQLAlchemy()
+
+
+class BatchJWTManager(JWTManager):
+    """
+    JWTManager whose decoding reuses the token a batch request already verified,
+    so its sub-requests, which carry the same Authorization header, share one
+    signature check. The revocation check still runs for each of them.
+
+    flask_jwt_extended has no public hook that can skip decoding, so this
+    overrides a private method. The version is pinned in requirements.txt,
+    and tests/test_batch_routes.py fails if the method stops being called.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        verified = g.get("batch_token") if has_app_context() else None
+        if verified is not None and verified[0] == encoded_token and csrf_value is None:
+            return verified[1]
+        return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+
+mail = Mail()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 cors = CORS()
 bcrypt = Bcrypt() 
-jwt = JWTManager()
+jwt = BatchJWTManager()
 
 
+# SQLite ignores foreign keys, and so ON DELETE CASCADE, unless each connection turns them on
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
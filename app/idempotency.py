@@ -0,0 +1,165 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.idempotencyKey import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.full_path.encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _error(message, status_code):
+    return jsonify({"error": message}), status_code
+
+
+def _replay(record):
+    response = current_app.response_class(record.response_body, status=record.status_code, mimetype=record.mimetype)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _claim_key(user_id, key, fingerprint, now):
+    """
+    Insert the placeholder row for a key, or return the row already holding it.
+
+    Returns:
+        tuple: (record, claimed), where claimed is True if this request now owns the key.
+    """
+    record = db.session.get(IdempotencyKey, (user_id, key), populate_existing=True)
+    if record is not None:
+        lock_expired = (
+            record.status_code is None
+            and record.created_at < now - timedelta(seconds=current_app.config["IDEMPOTENCY_LOCK_SECONDS"])
+        )
+        if record.expires_at > now and not lock_expired:
+            return record, False
+        # Expired, or left in progress by a request that never finished
+        db.session.delete(record)
+        db.session.flush()
+
+    record = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config["IDEMPOTENCY_TTL_SECONDS"])
+    )
+    db.session.add(record)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another attempt with the same key claimed it first
+        db.session.rollback()
+        return db.session.get(IdempotencyKey, (user_id, key), populate_existing=True), False
+    return record, True
+
+
+def _release_key(user_id, key):
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+    ))
+    db.session.commit()
+
+
+def _store_response(record, response):
+    record.status_code = response.status_code
+    record.response_body = response.get_data(as_text=True)
+    record.mimetype = response.mimetype
+
+
+def store_idempotent_response(response):
+    """
+    Store the response of an @idempotent view in the transaction of its writes.
+
+    Call right before the view commits, so a retry can never find the writes
+    committed without their response. Outside an @idempotent request with a
+    key, the response is only converted.
+
+    Args:
+        response: Anything a view can return.
+
+    Returns:
+        Response: The response to return from the view.
+    """
+    response = current_app.make_response(response)
+    record = g.pop("idempotency_record", None)
+    if record is not None:
+        _store_response(record, response)
+    return response
+
+
+def idempotent(view):
+    """
+    Replay the stored response when a request is retried with the same Idempotency-Key header.
+
+    Apply below `@jwt_required()`; keys are scoped to the authenticated user.
+    The first request with a key stores its response for IDEMPOTENCY_TTL_SECONDS,
+    and retries get that response back without running the view again.
+    Views that write must store their response with `store_idempotent_response`
+    before committing; responses of views that return without writing, such as
+    validation errors, are stored afterwards. Server errors are not stored, so
+    the client can retry them. Requests without the header run as usual.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters", 400)
+
+        user_id = int(get_jwt_identity())
+        fingerprint = _fingerprint()
+        record, claimed = _claim_key(user_id, key, fingerprint, datetime.utcnow())
+        if not claimed:
+            if record is None or record.status_code is None:
+                return _error(f"A request with this {IDEMPOTENCY_HEADER} is still in progress", 409)
+            if record.fingerprint != fingerprint:
+                return _error(f"{IDEMPOTENCY_HEADER} was already used for a different request", 422)
+            return _replay(record)
+
+        g.idempotency_record = record
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release_key(user_id, key)
+            raise
+        finally:
+            stored = g.pop("idempotency_record", None) is None
+
+        if response.status_code >= 500 or response.is_streamed:
+            _release_key(user_id, key)
+            return response
+
+        if not stored:
+            _store_response(record, response)
+            db.session.commit()
+        return response
+    return wrapper
+
+
+def purge_expired_keys():
+    """
+    Delete idempotency keys past their TTL.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    result = db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow()))
+    db.session.commit()
+    return result.rowcount
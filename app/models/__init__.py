@@ -5,4 +5,19 @@ from .property import Property
 from .groupChat import GroupChat
 from .message import Message
 from .tenancy import Tenancy
-from .tenancyTenants import TenancyTenants
\ No newline at end of file
+from .tenancyTenants import TenancyTenants
+from .landlordSummary import LandlordSummary
+from .leaseExpiryNotification import LeaseExpiryNotification
+from .scanCheckpoint import ScanCheckpoint
+from .emailOutbox import EmailOutbox
+from .revokedToken import RevokedToken
+from .refreshToken import RefreshToken
+from .idempotencyKey import IdempotencyKey
+from .messageArchive import MessageArchive
+from .ledgerEntry import LedgerEntry
+from .tenancyBalance import TenancyBalance
+from .landlordShard import LandlordShard
+from .changeLog import ChangeLog
+from .changeLogHead import ChangeLogHead
+from .tenantShard import TenantShard
+from .passwordSetupToken import PasswordSetupToken
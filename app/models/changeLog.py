@@ -0,0 +1,22 @@
+from app.extensions import db
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id', ondelete='CASCADE'), primary_key=True)
+    # Position in the landlord's feed; allocated from change_log_head, so it has no gaps
+    # and the landlord's changes commit in version order
+    version = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # "property", "tenancy" or "tenancy_tenant"
+    entity_id = db.Column(db.Integer, nullable=False)
+    # Second key of tenancy_tenant changes, whose entity_id is the tenancy
+    tenant_id = db.Column(db.Integer, nullable=True)
+    operation = db.Column(db.String(10), nullable=False)  # "insert", "update" or "delete"
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+
+    # Purging walks old changes by age
+    __table_args__ = (
+        db.Index('ix_change_log_created_at', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f"<ChangeLog LandlordID: {self.landlord_id}, Version: {self.version}, {self.operation} {self.entity}>"
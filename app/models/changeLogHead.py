@@ -0,0 +1,14 @@
+from app.extensions import db
+from sqlalchemy.orm import relationship
+
+class ChangeLogHead(db.Model):
+    __tablename__ = 'change_log_head'
+    landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id', ondelete='CASCADE'), primary_key=True)
+    # Version of the landlord's latest change; incremented under a row lock by every write
+    last_version = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationships
+    landlord = relationship("Landlord")
+
+    def __repr__(self):
+        return f"<ChangeLogHead LandlordID: {self.landlord_id}, Version: {self.last_version}>"
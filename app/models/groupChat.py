@@ -7,7 +7,7 @@ class GroupChat(db.Model):
     group_name = db.Column(db.String(255), nullable=False)
 
     # Relationships
-    messages = relationship("Message", back_populates="group_chat")
+    messages = relationship("Message", back_populates="group_chat", passive_deletes=True)
     tenancy = relationship("Tenancy", back_populates="group_chat", uselist=False)
 
     def __repr__(self):
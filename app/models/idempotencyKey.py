@@ -0,0 +1,17 @@
+from app.extensions import db
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_key'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    # SHA-256 of the method, path and body, to reject a key reused for another request
+    fingerprint = db.Column(db.String(64), nullable=False)
+    # NULL until the first request finishes
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey UserID: {self.user_id}, Key: {self.key}, Status: {self.status_code}>"
@@ -0,0 +1,11 @@
+from app.extensions import db
+
+class LandlordShard(db.Model):
+    __tablename__ = 'landlord_shard'
+    landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id', ondelete='CASCADE'), primary_key=True)
+    # 0 is the default database; n > 0 is the shard_<n> bind
+    shard = db.Column(db.Integer, nullable=False, default=0)
+    assigned_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<LandlordShard LandlordID: {self.landlord_id}, Shard: {self.shard}>"
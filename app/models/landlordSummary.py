@@ -0,0 +1,30 @@
+from app.extensions import db
+from sqlalchemy.orm import relationship
+
+class LandlordSummary(db.Model):
+    __tablename__ = 'landlord_summary'
+    landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id', ondelete='CASCADE'), primary_key=True)
+    property_count = db.Column(db.Integer, nullable=False, default=0)
+    status_counts = db.Column(db.JSON, nullable=False, default=dict)
+    active_tenancy_count = db.Column(db.Integer, nullable=False, default=0)
+    monthly_rent_due = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # Relationships
+    landlord = relationship("Landlord")
+
+    def to_dict(self):
+        """
+        Convert the summary to a dictionary for the dashboard.
+        """
+        return {
+            'landlord_id': self.landlord_id,
+            'property_count': self.property_count or 0,
+            'properties_by_status': dict(self.status_counts or {}),
+            'active_tenancies': self.active_tenancy_count or 0,
+            'monthly_rent_due': float(self.monthly_rent_due or 0),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f"<LandlordSummary LandlordID: {self.landlord_id}, Properties: {self.property_count}>"
@@ -0,0 +1,20 @@
+from app.extensions import db
+from sqlalchemy.orm import relationship
+
+class LeaseExpiryNotification(db.Model):
+    __tablename__ = 'lease_expiry_notification'
+    notification_id = db.Column(db.Integer, primary_key=True)
+    tenancy_id = db.Column(db.Integer, db.ForeignKey('tenancy.tenancy_id', ondelete='CASCADE'), nullable=False)
+    lease_end_date = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    # One notification per lease end, so re-scans and extended leases behave
+    __table_args__ = (
+        db.UniqueConstraint('tenancy_id', 'lease_end_date', name='uq_lease_expiry_notification_tenancy_end'),
+    )
+
+    # Relationships
+    tenancy = relationship("Tenancy")
+
+    def __repr__(self):
+        return f"<LeaseExpiryNotification TenancyID: {self.tenancy_id}, Ends: {self.lease_end_date}>"
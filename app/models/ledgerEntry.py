@@ -0,0 +1,52 @@
+from app.extensions import db
+from sqlalchemy import event
+from sqlalchemy.orm import relationship
+
+class LedgerEntry(db.Model):
+    __tablename__ = 'ledger_entry'
+    entry_id = db.Column(db.Integer, primary_key=True)
+    tenancy_id = db.Column(db.Integer, db.ForeignKey('tenancy.tenancy_id', ondelete='CASCADE'), nullable=False)
+    # charge, payment or adjustment
+    entry_type = db.Column(db.String(20), nullable=False)
+    # Signed: positive amounts increase what the tenants owe, negative ones reduce it
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
+    effective_date = db.Column(db.Date, nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    # Entries are never changed; a mistake is undone by a reversing entry
+    reverses_entry_id = db.Column(db.Integer, db.ForeignKey('ledger_entry.entry_id'), nullable=True, unique=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    # A tenancy's statement is read in entry order
+    __table_args__ = (
+        db.Index('ix_ledger_entry_tenancy_id_entry_id', 'tenancy_id', 'entry_id'),
+    )
+
+    # Relationships
+    tenancy = relationship("Tenancy")
+
+    def to_dict(self):
+        """
+        Convert the ledger entry to a dictionary.
+        """
+        return {
+            'entry_id': self.entry_id,
+            'tenancy_id': self.tenancy_id,
+            'entry_type': self.entry_type,
+            'amount': float(self.amount),
+            'effective_date': self.effective_date.isoformat(),
+            'description': self.description,
+            'reverses_entry_id': self.reverses_entry_id,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<LedgerEntry ID: {self.entry_id}, TenancyID: {self.tenancy_id}, Amount: {self.amount}>"
+
+
+# The ledger is append-only: corrections are new entries, so the history always adds up to the balance
+@event.listens_for(LedgerEntry, "before_update")
+@event.listens_for(LedgerEntry, "before_delete")
+def _reject_change(mapper, connection, entry):
+    raise ValueError("Ledger entries can't be changed or deleted; append a reversing entry instead")
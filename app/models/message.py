@@ -4,11 +4,17 @@ from sqlalchemy.orm import relationship
 class Message(db.Model):
     __tablename__ = 'message'
     message_id = db.Column(db.Integer, primary_key=True)
-    group_chat_id = db.Column(db.Integer, db.ForeignKey('group_chat.group_chat_id'), nullable=False)
+    group_chat_id = db.Column(db.Integer, db.ForeignKey('group_chat.group_chat_id', ondelete='CASCADE'), nullable=False)
     sender_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
 
+    # Chat history is read newest first, by message id; archival walks messages by age
+    __table_args__ = (
+        db.Index('ix_message_group_chat_id_message_id', 'group_chat_id', 'message_id'),
+        db.Index('ix_message_timestamp', 'timestamp'),
+    )
+
     # Relationships
     group_chat = relationship("GroupChat", back_populates="messages")
     sender = relationship("User", back_populates="messages")
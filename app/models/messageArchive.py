@@ -0,0 +1,19 @@
+from app.extensions import db
+
+class MessageArchive(db.Model):
+    __tablename__ = 'message_archive'
+    # Keeps the id the message had in the message table
+    message_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    group_chat_id = db.Column(db.Integer, db.ForeignKey('group_chat.group_chat_id', ondelete='CASCADE'), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    # Chat history is read newest first, by message id
+    __table_args__ = (
+        db.Index('ix_message_archive_group_chat_id_message_id', 'group_chat_id', 'message_id'),
+    )
+
+    def __repr__(self):
+        return f"<MessageArchive ID: {self.message_id}, Content: {self.content[:30]}>"
@@ -0,0 +1,12 @@
+from app.extensions import db
+
+class PasswordSetupToken(db.Model):
+    __tablename__ = 'password_setup_token'
+    # SHA-256 of the token; the token itself is only in the email
+    token_hash = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<PasswordSetupToken UserID: {self.user_id}, Expires: {self.expires_at}>"
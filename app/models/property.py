@@ -1,4 +1,5 @@
 from app.extensions import db
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import relationship
 
 class Property(db.Model):
@@ -7,10 +8,24 @@ class Property(db.Model):
     landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id'), nullable=False)
     address = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(50), nullable=False, default="vacant")
+    # Optional location; geohash is derived from it by set_property_location and indexed for radius search
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
+
+    __table_args__ = (
+        # Trigram index so address substring search doesn't scan the table on Postgres
+        db.Index(
+            "ix_property_address_trgm", "address",
+            postgresql_using="gin", postgresql_ops={"address": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        db.Index("ix_property_landlord_id_geohash", "landlord_id", "geohash"),
+    )
 
     # Relationships
     landlord = relationship("Landlord", back_populates="properties")
-    tenancies = relationship("Tenancy", back_populates="property")
+    # Deleting a property leaves its tenancies to the database's ON DELETE CASCADE instead of loading them
+    tenancies = relationship("Tenancy", back_populates="property", passive_deletes=True)
 
     def to_dict(self):
         """
@@ -21,9 +36,37 @@ class Property(db.Model):
             'landlord_id': self.landlord_id,
             'address': self.address,
             'status': self.status,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'tenancies': [tenancy.tenancy_id for tenancy in self.tenancies] if self.tenancies else []
         }
 
-
     def __repr__(self):
-        return f"<Property ID: {self.property_id}, Address: {self.address}>"
\ No newline at end of file
+        return f"<Property ID: {self.property_id}, Address: {self.address}>"
+
+
+# Postgres needs the pg_trgm extension before the trigram index can be created
+event.listen(
+    Property.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# SQLite (used by the tests) indexes addresses in an external-content FTS5 table
+# with the trigram tokenizer, kept in sync with the property table by triggers
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS property_fts USING fts5("
+    "address, content='property', content_rowid='property_id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS property_fts_ai AFTER INSERT ON property BEGIN "
+    "INSERT INTO property_fts(rowid, address) VALUES (new.property_id, new.address); END",
+    "CREATE TRIGGER IF NOT EXISTS property_fts_ad AFTER DELETE ON property BEGIN "
+    "INSERT INTO property_fts(property_fts, rowid, address) VALUES ('delete', old.property_id, old.address); END",
+    "CREATE TRIGGER IF NOT EXISTS property_fts_au AFTER UPDATE OF address ON property BEGIN "
+    "INSERT INTO property_fts(property_fts, rowid, address) VALUES ('delete', old.property_id, old.address); "
+    "INSERT INTO property_fts(rowid, address) VALUES (new.property_id, new.address); END",
+):
+    event.listen(Property.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Property.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS property_fts").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,17 @@
+from app.extensions import db
+
+class RefreshToken(db.Model):
+    __tablename__ = 'refresh_token'
+    jti = db.Column(db.String(36), primary_key=True)
+    # Every token rotated from the same login shares a family
+    family_id = db.Column(db.String(36), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    session_started_at = db.Column(db.DateTime, nullable=False)
+    issued_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    # Set once the token has been exchanged; presenting it again is reuse
+    rotated_at = db.Column(db.DateTime, nullable=True)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshToken JTI: {self.jti}, Family: {self.family_id}, UserID: {self.user_id}>"
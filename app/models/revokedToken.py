@@ -0,0 +1,15 @@
+from app.extensions import db
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+    # Increasing id, used as the watermark when processes refresh their denylist
+    revocation_id = db.Column(db.Integer, primary_key=True)
+    # A NULL jti revokes every token of the user issued up to revoked_at
+    jti = db.Column(db.String(36), unique=True, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False)
+    # For a user-wide cutoff, when the last token it covers expires
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken JTI: {self.jti}, UserID: {self.user_id}>"
@@ -0,0 +1,13 @@
+from app.extensions import db
+
+class ScanCheckpoint(db.Model):
+    __tablename__ = 'scan_checkpoint'
+    name = db.Column(db.String(100), primary_key=True)
+    # Date of the run the position belongs to; the position is cleared when the run completes
+    run_date = db.Column(db.Date, nullable=True)
+    last_date = db.Column(db.Date, nullable=True)
+    last_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f"<ScanCheckpoint {self.name}: ({self.last_date}, {self.last_id})>"
@@ -10,12 +10,30 @@ class Tenancy(db.Model):
     lease_end_date = db.Column(db.Date, nullable=True) 
     group_chat_id = db.Column(db.Integer, db.ForeignKey('group_chat.group_chat_id'), unique=True, nullable=False)
 
+    # Keyset order for walking leases by end date, e.g. the lease-expiry scanner
+    __table_args__ = (
+        db.Index('ix_tenancy_lease_end_date_tenancy_id', 'lease_end_date', 'tenancy_id'),
+    )
+
     # Relationships
     property = relationship("Property", back_populates="tenancies")
     group_chat = relationship("GroupChat", back_populates="tenancy")
     tenancy_tenants = relationship(
-        "TenancyTenants", back_populates="tenancy"
+        "TenancyTenants", back_populates="tenancy", passive_deletes=True
     )
 
+    def to_dict(self):
+        """
+        Convert the tenancy object to a dictionary.
+        """
+        return {
+            'tenancy_id': self.tenancy_id,
+            'property_id': self.property_id,
+            'rent_due': float(self.rent_due),
+            'lease_start_date': self.lease_start_date.isoformat(),
+            'lease_end_date': self.lease_end_date.isoformat() if self.lease_end_date else None,
+            'group_chat_id': self.group_chat_id
+        }
+
     def __repr__(self):
         return f"<Tenancy ID: {self.tenancy_id}, PropertyID: {self.property_id}>"
\ No newline at end of file
@@ -0,0 +1,22 @@
+from app.extensions import db
+from sqlalchemy.orm import relationship
+
+class TenancyBalance(db.Model):
+    __tablename__ = 'tenancy_balance'
+    tenancy_id = db.Column(db.Integer, db.ForeignKey('tenancy.tenancy_id', ondelete='CASCADE'), primary_key=True)
+    # Copied from the property so a landlord's arrears are one range of the index below
+    landlord_id = db.Column(db.Integer, db.ForeignKey('landlord.landlord_id', ondelete='CASCADE'), nullable=False)
+    # Sum of the tenancy's ledger entries; positive means the tenants owe money
+    balance = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    last_entry_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    __table_args__ = (
+        db.Index('ix_tenancy_balance_landlord_id_balance', 'landlord_id', 'balance'),
+    )
+
+    # Relationships
+    tenancy = relationship("Tenancy")
+
+    def __repr__(self):
+        return f"<TenancyBalance TenancyID: {self.tenancy_id}, Balance: {self.balance}>"
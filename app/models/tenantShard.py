@@ -0,0 +1,14 @@
+from app.extensions import db
+
+class TenantShard(db.Model):
+    __tablename__ = 'tenant_shard'
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.tenant_id', ondelete='CASCADE'), primary_key=True)
+    # The shard of the landlord whose tenancies the tenant belongs to; n > 0 is the shard_<n> bind
+    shard = db.Column(db.Integer, nullable=False, default=0)
+    # Set until the tenant's tenancy links have committed on the shard; if that never
+    # happens, flask shards purge-pending-tenants deletes the account
+    pending = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false(), index=True)
+    assigned_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<TenantShard TenantID: {self.tenant_id}, Shard: {self.shard}>"
@@ -10,6 +10,11 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False)
 
+    # Addresses are unique regardless of case, so a bulk insert can't add a differently cased duplicate
+    __table_args__ = (
+        db.Index('uq_users_email_lower', db.func.lower(email), unique=True),
+    )
+
     # Relationships
     tenant = relationship("Tenant", back_populates="user", uselist=False)
     landlord = relationship("Landlord", back_populates="user")
@@ -0,0 +1,147 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+TOP_FUNCTIONS = 30
+
+# Only one profiler can be active per process, so concurrent profiled requests run unprofiled
+_profiler_lock = threading.Lock()
+
+
+def _requested(app):
+    token = app.config["PROFILING_TOKEN"]
+    supplied = request.headers.get(PROFILE_TOKEN_HEADER)
+    return bool(token and supplied) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and "profile" in g:
+        conn.info["profile_query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.pop("profile_query_started_at", None)
+    if started_at is not None and has_app_context() and "profile" in g:
+        g.profile["queries"].append({
+            "statement": statement,
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            "executemany": executemany,
+        })
+
+
+def _top_functions(profiler):
+    stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats(pstats.SortKey.CUMULATIVE)
+    functions = []
+    for (filename, line, name) in stats.fcn_list[:TOP_FUNCTIONS]:
+        calls, primitive_calls, total_time, cumulative_time, _ = stats.stats[(filename, line, name)]
+        functions.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total_time * 1000, 3),
+            "cumulative_ms": round(cumulative_time * 1000, 3),
+        })
+    return functions
+
+
+def _start_profile(app):
+    def start_profile():
+        if not _requested(app) or not _profiler_lock.acquire(blocking=False):
+            return
+        profiler = cProfile.Profile()
+        g.profile = {
+            "request": request._get_current_object(),
+            "profiler": profiler,
+            "queries": [],
+            "started_at": time.perf_counter(),
+        }
+        profiler.enable()
+    return start_profile
+
+
+def _stop_profile():
+    profile = g.pop("profile")
+    profile["profiler"].disable()
+    _profiler_lock.release()
+    return profile
+
+
+def _save_profile(app):
+    def save_profile(response):
+        profile = g.get("profile")
+        if profile is None or profile["request"] is not request._get_current_object():
+            return response  # Not profiled, or a batch sub-request of a profiled request
+        profile = _stop_profile()
+        duration_ms = (time.perf_counter() - profile["started_at"]) * 1000
+        sql_ms = sum(query["duration_ms"] for query in profile["queries"])
+
+        profile_id = uuid.uuid4().hex
+        directory = app.config["PROFILING_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        profile["profiler"].dump_stats(os.path.join(directory, f"{profile_id}.prof"))
+        report = {
+            "profile_id": profile_id,
+            "request_id": g.get("request_id"),
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 3),
+            "sql_count": len(profile["queries"]),
+            "sql_ms": round(sql_ms, 3),
+            "queries": profile["queries"],
+            "functions": _top_functions(profile["profiler"]),
+        }
+        with open(os.path.join(directory, f"{profile_id}.json"), "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        response.headers["Server-Timing"] = (
+            f'app;dur={duration_ms:.1f}, db;dur={sql_ms:.1f};desc="{len(profile["queries"])} queries"'
+        )
+        app.logger.info(
+            "Profiled %s %s", request.method, request.path,
+            extra={"profile_id": profile_id, "duration_ms": report["duration_ms"], "sql_ms": report["sql_ms"]}
+        )
+        return response
+    return save_profile
+
+
+def _discard_profile(exception):
+    # An unhandled exception skips after_request; still stop the profiler and free the lock
+    profile = g.get("profile")
+    if profile is not None and profile["request"] is request._get_current_object():
+        _stop_profile()
+
+
+def init_profiling(app):
+    """
+    Profile single requests on demand when PROFILING_TOKEN is set.
+
+    A request sending the token in the X-Profile-Token header runs under
+    cProfile with its SQL statements timed. The profile is written to
+    PROFILING_DIR as `<id>.prof` (for pstats or snakeviz) and `<id>.json`
+    (statements and top functions), and the response carries the id in
+    X-Profile-Id and the app and database time in Server-Timing.
+    """
+    if not app.config["PROFILING_TOKEN"]:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_profile(app))
+    app.after_request(_save_profile(app))
+    app.teardown_request(_discard_profile)
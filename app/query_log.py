@@ -0,0 +1,149 @@
+import queue
+import random
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+# Set on connections used to run EXPLAIN, so their own statements aren't timed
+EXPLAIN_CONNECTION = "slow_query_explain"
+
+
+def redact_parameters(parameters):
+    """Replace bound values with their type names, so logs never contain user data."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explain_prefix(dialect_name, analyze):
+    """The EXPLAIN syntax of a dialect, or None if plans aren't captured for it."""
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    if dialect_name == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    if dialect_name in ("mysql", "mariadb"):
+        return "EXPLAIN ANALYZE " if analyze else "EXPLAIN "
+    return None
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than SLOW_QUERY_THRESHOLD_MS with the endpoint that ran them.
+
+    Timing is two perf_counter calls per statement. A sample of slow statements
+    (SLOW_QUERY_SAMPLE_RATE) is logged, and SELECTs among them are queued for a
+    background thread that captures their plan on a separate connection, at most
+    once per statement every SLOW_QUERY_EXPLAIN_INTERVAL seconds. The request
+    that ran the statement never waits for the EXPLAIN.
+    """
+
+    def __init__(self, app, max_pending=100):
+        config = app.config
+        self.logger = app.logger
+        self.threshold = config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+        self.sample_rate = config["SLOW_QUERY_SAMPLE_RATE"]
+        self.explain = config["SLOW_QUERY_EXPLAIN"]
+        self.analyze = config["SLOW_QUERY_EXPLAIN_ANALYZE"]
+        self.explain_interval = config["SLOW_QUERY_EXPLAIN_INTERVAL"]
+        self.pending = queue.Queue(maxsize=max_pending)
+        self._explained_at = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def attach(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def start(self):
+        self._worker = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+        self._worker.start()
+
+    def restart_after_fork(self):
+        """Start a fresh queue and worker in a forked process, if the parent had a worker."""
+        self.pending = queue.Queue(maxsize=self.pending.maxsize)
+        self._lock = threading.Lock()
+        if self._worker is not None:
+            self.start()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started_at", time.perf_counter())
+        if elapsed < self.threshold or conn.info.get(EXPLAIN_CONNECTION):
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+
+        endpoint = request.endpoint if has_request_context() else None
+        self.logger.warning(
+            "Slow query (%.1f ms) in %s: %s parameters=%s",
+            elapsed * 1000, endpoint or "no request", statement,
+            redact_parameters(parameters) if not executemany else f"{len(parameters)} rows"
+        )
+        if self.explain and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            self._queue_explain(conn.engine, statement, parameters, endpoint)
+
+    def _queue_explain(self, engine, statement, parameters, endpoint):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained_at.get(statement, float("-inf")) < self.explain_interval:
+                return
+            if len(self._explained_at) >= 1000:
+                self._explained_at.clear()
+            self._explained_at[statement] = now
+        try:
+            self.pending.put_nowait((engine, statement, parameters, endpoint))
+        except queue.Full:
+            pass  # Plans are best effort; never block the request
+
+    def explain_pending(self):
+        """Capture the plans of every queued statement (done by the worker thread when started)."""
+        while True:
+            try:
+                job = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            self._explain(*job)
+
+    def _explain(self, engine, statement, parameters, endpoint):
+        prefix = explain_prefix(engine.dialect.name, self.analyze)
+        if prefix is None:
+            return
+        try:
+            with engine.connect() as connection:
+                connection.info[EXPLAIN_CONNECTION] = True
+                try:
+                    rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+                finally:
+                    connection.info.pop(EXPLAIN_CONNECTION, None)
+                    connection.rollback()
+        except Exception:
+            self.logger.exception("Could not capture the plan of a slow query in %s", endpoint or "no request")
+            return
+        plan = "\n".join(" | ".join(str(value) for value in row) for row in rows)
+        self.logger.warning("Plan of slow query in %s: %s\n%s", endpoint or "no request", statement, plan)
+
+    def _run(self):
+        while True:
+            self._explain(*self.pending.get())
+
+
+def init_slow_query_log(app):
+    """Attach the slow-query log to the app's engines when SLOW_QUERY_LOG_ENABLED is set."""
+    if not app.config["SLOW_QUERY_LOG_ENABLED"]:
+        return None
+    slow_query_log = SlowQueryLog(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            slow_query_log.attach(engine)
+    if app.config["SLOW_QUERY_EXPLAIN"] and not app.config.get("TESTING"):
+        slow_query_log.start()
+    app.extensions["slow_query_log"] = slow_query_log
+    return slow_query_log
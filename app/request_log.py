@@ -0,0 +1,163 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 128
+
+# Attributes every LogRecord has; anything else was passed with `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including fields passed with `extra=`."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Tag records logged during a request with its id and endpoint."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = getattr(g, "request_id", None)
+            record.endpoint = request.endpoint
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hand records to a background listener without blocking the logging thread.
+
+    The traceback is rendered here, while its frames are still alive, but the
+    JSON formatting and the write happen on the listener's thread. When the
+    queue is full the record is dropped and counted instead of waiting.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.listener = None
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _stop_listener(listener):
+    if listener._thread is not None:
+        listener.stop()
+
+
+def restart_log_listener(app):
+    """
+    Give a forked worker its own queue and listener thread; threads don't survive fork,
+    so records queued in a worker forked from a preloaded app would never be written.
+    """
+    for handler in app.logger.handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = queue.Queue(maxsize=app.config["LOG_QUEUE_SIZE"])
+            handler.listener = logging.handlers.QueueListener(
+                handler.queue, *handler.listener.handlers, respect_handler_level=True
+            )
+            handler.listener.start()
+            atexit.register(_stop_listener, handler.listener)
+
+
+def _start_request():
+    request_id = request.headers.get(REQUEST_ID_HEADER, "")
+    if not request_id or len(request_id) > MAX_REQUEST_ID_LENGTH or not request_id.isprintable():
+        request_id = uuid.uuid4().hex
+    g.request_id = request_id
+    g.request_started_at = time.perf_counter()
+
+
+def _log_request(app, access_logger):
+    def log_request(response):
+        started_at = g.pop("request_started_at", None)
+        if started_at is None:
+            return response
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        duration_ms = (time.perf_counter() - started_at) * 1000
+
+        # Successful requests are sampled; errors and slow requests are always logged
+        if (response.status_code < 400 and duration_ms < app.config["LOG_SLOW_REQUEST_MS"]
+                and random.random() >= app.config["LOG_ACCESS_SAMPLE_RATE"]):
+            return response
+        access_logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 2),
+                "remote_addr": request.remote_addr,
+            }
+        )
+        return response
+    return log_request
+
+
+def init_logging(app, stream=None):
+    """
+    Send the app's logs as JSON lines to `stream` (default: stderr) through a background thread,
+    and log each request with its id, status and duration.
+    """
+    logger = app.logger
+    logger.removeHandler(default_handler)
+    for handler in list(logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            _stop_listener(handler.listener)
+            logger.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=app.config["LOG_QUEUE_SIZE"]))
+    handler.addFilter(RequestContextFilter())
+    handler.listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    handler.listener.start()
+    atexit.register(_stop_listener, handler.listener)
+
+    logger.addHandler(handler)
+    logger.setLevel(app.config["LOG_LEVEL"])
+
+    access_logger = logger.getChild("access")
+    app.before_request(_start_request)
+    app.after_request(_log_request(app, access_logger))
+    return handler
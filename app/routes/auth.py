@@ -1,17 +1,27 @@
 from app.models.landlord import Landlord
+from app.models.landlordSummary import LandlordSummary
+from app.models.changeLogHead import ChangeLogHead
 from app.models.tenant import Tenant
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import get_jwt, jwt_required
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models.user import User
+from app.compression import compress_response
 from app.extensions import bcrypt, db
+from app.services.password_setup import PasswordSetupError, has_usable_password, set_password_with_token
+from app.services.repository import find_user_by_email
+from app.sharding import assign_landlord_shard, use_shard
+from app.services.refresh_tokens import RefreshTokenError, revoke_family, rotate_refresh_token, start_session
+from app.services.token_denylist import revoke_token
 
 auth_bp = Blueprint("auth", __name__)
 
 
 @auth_bp.route("/login", methods=["POST"])
+@compress_response(enabled=False)
 def login_user():
     """
-    Handle user login and return a JWT access token upon successful authentication.
+    Handle user login and return a JWT access token and refresh token upon successful authentication.
     """
     data = request.json
 
@@ -21,16 +31,19 @@ def login_user():
     
     # Normalize email to lowercase for case-insensitive comparison
     email = data["email"].lower()
-    user = User.query.filter_by(email=email).first()
+    user = find_user_by_email(email)
 
     if user:
         # Check password
         password = data["password"].encode('utf-8')
-        if bcrypt.check_password_hash(user.password, password):
-            # Generate JWT access token
-            access_token = create_access_token(identity=str(user.user_id), fresh=True)
+        # Provisioned accounts have no password until the tenant sets one
+        if has_usable_password(user) and bcrypt.check_password_hash(user.password, password):
+            # Generate JWT access and refresh tokens
+            tokens = start_session(user.user_id)
+            db.session.commit()
             return jsonify({
-                "token": access_token,
+                "token": tokens["token"],
+                "refresh_token": tokens["refresh_token"],
                 "user": {
                     "id": user.user_id,
                     "email": user.email,
@@ -42,6 +55,50 @@ def login_user():
     return jsonify({"error": "Email not found"}), 404
 
 
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout_user():
+    """
+    Revoke the access token used for this request, and the refresh tokens of its session.
+    """
+    jwt_payload = get_jwt()
+    if jwt_payload.get("sid"):
+        revoke_family(jwt_payload["sid"])
+    revoke_token(jwt_payload)
+    return jsonify({"message": "Logged out"}), 200
+
+
+@auth_bp.route("/refresh", methods=["POST"])
+@compress_response(enabled=False)
+@jwt_required(refresh=True)
+def refresh_token():
+    """
+    Exchange a refresh token for a new access token and refresh token, without the password.
+    """
+    try:
+        tokens = rotate_refresh_token(get_jwt())
+    except RefreshTokenError as e:
+        return jsonify({"error": str(e)}), 401
+    return jsonify(tokens), 200
+
+
+@auth_bp.route("/set-password", methods=["POST"])
+def set_password():
+    """
+    Set the password of a provisioned account with the one-time token from its email.
+    """
+    data = request.json
+    if not isinstance(data, dict) or not all(
+        isinstance(data.get(key), str) and data[key] for key in ("token", "password")
+    ):
+        return jsonify({"error": "Missing token or password"}), 400
+
+    try:
+        set_password_with_token(data["token"], data["password"])
+    except PasswordSetupError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"message": "Password set"}), 200
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register_user():
@@ -54,7 +111,7 @@ def register_user():
         return jsonify({"error": "Invalid data"}), 400
     
     email = data['email'].lower()
-    if User.query.filter_by(email=email).first():
+    if find_user_by_email(email):
         return jsonify({"error": "Email already registered"}), 400
     
     hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
@@ -68,20 +125,39 @@ def register_user():
     )
 
     db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Registered by a concurrent request, caught by the unique index on lower(email)
+        db.session.rollback()
+        return jsonify({"error": "Email already registered"}), 400
 
 
 
     # Assign the user to a specific role (Tenant or Landlord)
+    shard = None
     if data['role'].lower() == 'tenant':
         new_tenant = Tenant(tenant_id=new_user.user_id)
         db.session.add(new_tenant)
     elif data['role'].lower() == 'landlord':
         new_landlord = Landlord(landlord_id=new_user.user_id)
         db.session.add(new_landlord)
+        shard = assign_landlord_shard(new_user.user_id)
     else:
         return jsonify({"error": "Invalid role"}), 400
-
     db.session.commit()
+
+    if shard is not None:
+        # The summary and change log head live on the landlord's shard, which may be another
+        # database, so they're committed on their own. Both are created by the landlord's
+        # first portfolio write if this fails.
+        with use_shard(shard):
+            db.session.add(LandlordSummary(landlord_id=new_user.user_id))
+            db.session.add(ChangeLogHead(landlord_id=new_user.user_id))
+            try:
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                current_app.logger.exception("Error while creating the landlord's summary")
     
     return jsonify({"message": "User registered successfully"}), 201
@@ -0,0 +1,102 @@
+from flask import Blueprint, current_app, g, request, jsonify
+from flask_jwt_extended import get_jwt, jwt_required
+from werkzeug.test import EnvironBuilder
+from app.extensions import db
+from app.request_log import REQUEST_ID_HEADER
+from app.routes.properties import error_response
+
+# Blueprint for batching several API calls into one request
+batch_bp = Blueprint("batch", __name__)
+
+# Sub-requests are limited to reads, so a batch never commits partial work
+BATCH_METHODS = {"GET"}
+
+
+def validate_sub_request(index, sub_request):
+    """
+    Check one entry of a batch.
+
+    Returns:
+        str: The error message, or None if the entry is valid.
+    """
+    if not isinstance(sub_request, dict) or not isinstance(sub_request.get("path"), str):
+        return f"Request {index} must be an object with a path"
+    if sub_request.get("method", "GET").upper() not in BATCH_METHODS:
+        return f"Request {index} uses an unsupported method"
+    path = sub_request["path"]
+    if not path.startswith("/api/") or path.startswith(request.path):
+        return f"Request {index} has an invalid path"
+    return None
+
+
+def dispatch_sub_request(sub_request):
+    """
+    Run a sub-request through the app's normal dispatch, reusing the current app context.
+
+    The sub-request's context is pushed inside the batch's app context, so it
+    shares the database session and the verified token with the batch and with
+    the other sub-requests. It carries the batch's Authorization header and
+    request id, so it is logged under the batch's id. `g` is restored once it
+    returns, so no sub-request sees state left by another, and the batch keeps
+    its own request id and timing.
+
+    Returns:
+        dict: The status code and body of the sub-response.
+    """
+    builder = EnvironBuilder(
+        path=sub_request["path"],
+        method=sub_request.get("method", "GET").upper(),
+        base_url=request.host_url,
+        headers={"Authorization": request.headers["Authorization"], REQUEST_ID_HEADER: g.request_id},
+        environ_overrides={"REMOTE_ADDR": request.remote_addr}
+    )
+    saved_globals = dict(vars(g))
+    try:
+        with current_app.request_context(builder.get_environ()):
+            response = current_app.full_dispatch_request()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Batch sub-request to %s failed", sub_request["path"])
+        return {"status": 500, "body": {"error": "An error occurred while processing the request."}}
+    finally:
+        vars(g).clear()
+        vars(g).update(saved_globals)
+        builder.close()
+
+    body = response.get_json(silent=True)
+    if body is None:
+        body = response.get_data(as_text=True)
+    return {"status": response.status_code, "body": body}
+
+
+# Run several API calls in one request
+@batch_bp.route("", methods=["POST"])
+@jwt_required()
+def run_batch():
+    """
+    Run a list of GET requests against the API and return all of their responses.
+
+    Request Body:
+        requests (list): Sub-requests, each with a path (including any query
+            string) and an optional method, which must be GET.
+
+    Returns:
+        JSON: The sub-responses in request order, each with its status and body, or an error message.
+    """
+    data = request.json
+    if not data or not isinstance(data.get("requests"), list) or not data["requests"]:
+        return error_response("Missing requests", 400)
+
+    sub_requests = data["requests"]
+    max_size = current_app.config["BATCH_MAX_REQUESTS"]
+    if len(sub_requests) > max_size:
+        return error_response(f"A batch can contain at most {max_size} requests", 400)
+
+    for index, sub_request in enumerate(sub_requests):
+        error = validate_sub_request(index, sub_request)
+        if error:
+            return error_response(error, 400)
+
+    # Sub-requests reuse the token verified for the batch instead of checking its signature again
+    g.batch_token = (request.headers["Authorization"].split()[-1], get_jwt())
+    return jsonify({"responses": [dispatch_sub_request(sub_request) for sub_request in sub_requests]}), 200
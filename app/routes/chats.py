@@ -0,0 +1,59 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.db_routing import read_from_replica
+from app.sharding import use_landlord_shard
+from app.routes.properties import error_response, get_current_user
+from app.services.chat_membership import is_chat_member
+from app.services.message_archive import get_chat_history
+
+# Blueprint for group chat endpoints
+chats_bp = Blueprint("chats", __name__)
+chats_bp.before_request(use_landlord_shard)  # Portfolio rows live on the landlord's shard
+
+# Get the message history of a group chat
+@chats_bp.route("/<int:group_chat_id>/messages", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_chat_messages(group_chat_id):
+    """
+    Get the messages of a group chat the authenticated user belongs to, newest first.
+
+    Path Parameters:
+        group_chat_id (int): The ID of the group chat.
+
+    Query Parameters:
+        before (int): Only return messages older than this message ID, to page back.
+        limit (int): The number of messages to return (default: 50).
+
+    Returns:
+        JSON: A page of messages and the cursor of the next page, or an error message.
+    """
+    try:
+        user = get_current_user()
+        if not user or not is_chat_member(user.user_id, group_chat_id):
+            return error_response("Unauthorized", 403)
+
+        before_id = request.args.get("before", type=int)
+        limit = request.args.get("limit", default=50, type=int)
+        if limit < 1:
+            return error_response("Invalid limit", 400)
+        limit = min(limit, current_app.config["MESSAGE_HISTORY_MAX_PAGE_SIZE"])
+
+        messages = get_chat_history(group_chat_id, before_id, limit)
+
+        return jsonify({
+            "messages": [
+                {
+                    "message_id": message.message_id,
+                    "sender_id": message.sender_id,
+                    "content": message.content,
+                    "timestamp": message.timestamp.isoformat() if message.timestamp else None
+                }
+                for message in messages
+            ],
+            "next_before": messages[-1].message_id if len(messages) == limit else None
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("Error while retrieving messages")
+        return error_response("An error occurred while retrieving messages.", 500)
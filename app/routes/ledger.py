@@ -0,0 +1,176 @@
+from datetime import date, datetime
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.db_routing import read_from_replica
+from app.idempotency import idempotent
+from app.sharding import use_landlord_shard
+from app.routes.properties import error_response, get_current_user
+from app.services.ledger import get_balance, get_ledger_page, record_ledger_entry, reverse_ledger_entry
+from app.services.repository import get_ledger_entry, get_tenancy_landlord, is_tenancy_tenant
+
+# Blueprint for tenancy rent ledger endpoints
+ledger_bp = Blueprint("ledger", __name__)
+ledger_bp.before_request(use_landlord_shard)  # Portfolio rows live on the landlord's shard
+
+def parse_effective_date(data):
+    """
+    Parse the optional effective_date (YYYY-MM-DD) of a ledger payload, defaulting to today.
+
+    Raises:
+        ValueError: If the date is not in YYYY-MM-DD format.
+    """
+    if data.get("effective_date"):
+        return datetime.strptime(data["effective_date"], "%Y-%m-%d").date()
+    return date.today()
+
+# Get the ledger of a tenancy
+@ledger_bp.route("/<int:tenancy_id>/ledger", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_tenancy_ledger(tenancy_id):
+    """
+    Get the balance and a page of ledger entries of a tenancy, newest first.
+
+    Available to the landlord of the tenancy's property and to its tenants.
+
+    Path Parameters:
+        tenancy_id (int): The ID of the tenancy.
+
+    Query Parameters:
+        before (int): Only return entries older than this entry ID, to page back.
+        limit (int): The number of entries to return (default: 50).
+
+    Returns:
+        JSON: The balance, a page of entries and the cursor of the next page, or an error message.
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return error_response("Unauthorized", 403)
+        landlord_id = get_tenancy_landlord(tenancy_id)
+        if landlord_id is None:
+            return error_response("Tenancy not found", 404)
+        if landlord_id != user.user_id and not is_tenancy_tenant(user.user_id, tenancy_id):
+            return error_response("Unauthorized", 403)
+
+        before_id = request.args.get("before", type=int)
+        limit = request.args.get("limit", default=50, type=int)
+        if limit < 1:
+            return error_response("Invalid limit", 400)
+        limit = min(limit, current_app.config["LEDGER_MAX_PAGE_SIZE"])
+
+        entries = get_ledger_page(tenancy_id, before_id, limit)
+        return jsonify({
+            "tenancy_id": tenancy_id,
+            "balance": float(get_balance(tenancy_id)),
+            "entries": [entry.to_dict() for entry in entries],
+            "next_before": entries[-1].entry_id if len(entries) == limit else None
+        }), 200
+
+    except Exception as e:
+        current_app.logger.exception("Error while retrieving the ledger")
+        return error_response("An error occurred while retrieving the ledger.", 500)
+
+# Record a charge, payment or adjustment
+@ledger_bp.route("/<int:tenancy_id>/ledger", methods=["POST"])
+@jwt_required()
+@idempotent
+def create_ledger_entry(tenancy_id):
+    """
+    Record a charge, payment or adjustment on a tenancy of the authenticated landlord.
+
+    Path Parameters:
+        tenancy_id (int): The ID of the tenancy.
+
+    Request Body:
+        entry_type (str): "charge", "payment" or "adjustment".
+        amount (number): Positive for charges and payments; adjustments may be negative.
+        effective_date (str): YYYY-MM-DD (default: today).
+        description (str): Optional note.
+
+    Returns:
+        JSON: The new entry and the tenancy's balance, or an error message.
+    """
+    data = request.json
+    if not data or "entry_type" not in data or "amount" not in data:
+        return error_response("Missing ledger entry details", 400)
+
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+    landlord_id = get_tenancy_landlord(tenancy_id)
+    if landlord_id != user.user_id:
+        return error_response("Tenancy not found", 404)
+
+    try:
+        effective_date = parse_effective_date(data)
+    except ValueError:
+        return error_response("Invalid date format. Use YYYY-MM-DD", 400)
+
+    try:
+        entry = record_ledger_entry(
+            tenancy_id, landlord_id, data["entry_type"], data["amount"], effective_date,
+            description=data.get("description"), created_by=user.user_id
+        )
+        db.session.commit()
+        return jsonify({"entry": entry.to_dict(), "balance": float(get_balance(tenancy_id))}), 201
+    except ValueError as e:
+        db.session.rollback()
+        return error_response(str(e), 400)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while recording the ledger entry")
+        return error_response("An error occurred while recording the ledger entry.", 500)
+
+# Reverse a ledger entry
+@ledger_bp.route("/<int:tenancy_id>/ledger/<int:entry_id>/reverse", methods=["POST"])
+@jwt_required()
+def reverse_tenancy_ledger_entry(tenancy_id, entry_id):
+    """
+    Undo a ledger entry of the authenticated landlord's tenancy with a reversing entry.
+
+    Path Parameters:
+        tenancy_id (int): The ID of the tenancy.
+        entry_id (int): The ID of the entry to reverse.
+
+    Request Body:
+        effective_date (str): YYYY-MM-DD (default: today).
+        description (str): Optional note.
+
+    Returns:
+        JSON: The reversing entry and the tenancy's balance, or an error message.
+    """
+    data = request.get_json(silent=True) or {}
+
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+    landlord_id = get_tenancy_landlord(tenancy_id)
+    entry = get_ledger_entry(entry_id)
+    if landlord_id != user.user_id or not entry or entry.tenancy_id != tenancy_id:
+        return error_response("Ledger entry not found", 404)
+
+    try:
+        effective_date = parse_effective_date(data)
+    except ValueError:
+        return error_response("Invalid date format. Use YYYY-MM-DD", 400)
+
+    try:
+        reversal = reverse_ledger_entry(
+            entry, landlord_id, effective_date, description=data.get("description"), created_by=user.user_id
+        )
+        db.session.commit()
+        return jsonify({"entry": reversal.to_dict(), "balance": float(get_balance(tenancy_id))}), 201
+    except ValueError as e:
+        db.session.rollback()
+        return error_response(str(e), 409)
+    except IntegrityError:
+        # A concurrent request reversed the same entry first
+        db.session.rollback()
+        return error_response("Entry already reversed", 409)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while reversing the ledger entry")
+        return error_response("An error occurred while reversing the ledger entry.", 500)
@@ -1,28 +1,72 @@
 from datetime import datetime
 from app.models.groupChat import GroupChat
 from app.models.tenancy import Tenancy
-from app.models.user import User
 from app.models.property import Property
 from app.extensions import db
-from flask import Blueprint, request, jsonify 
+from app.db_routing import read_from_replica
+from app.idempotency import idempotent, store_idempotent_response
+from app.sharding import use_landlord_shard
+from app.services.ledger import list_arrears, parse_amount
+from app.services.property_deletion import delete_properties
+from app.services.property_location import find_properties_near, set_property_location, validate_coordinates
+from app.services.portfolio_summary import record_property_created, record_tenancies_created
+from app.services.rent_roll import month_index, project_landlord_rent_roll
+from app.services.chat_membership import invalidate_memberships
+from app.services.change_feed import record_changes
+from app.services.repository import (
+    find_owned_property_addresses, get_landlord_summary, get_landlord_with_property, get_user,
+    get_user_and_property, list_property_tenancies, paginate_expiring_leases, paginate_landlord_properties
+)
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
 
 # Blueprint for property-related endpoints
 properties_bp = Blueprint("properties", __name__)
+properties_bp.before_request(use_landlord_shard)  # Portfolio rows live on the landlord's shard
 
 def get_current_user():
     """Get the current user from the JWT token."""
-    current_user_id = int(get_jwt_identity())
-    user = db.session.get(User, current_user_id)
-    return user
+    return get_user(int(get_jwt_identity()))
+
+def get_current_landlord_property(property_id):
+    """
+    Get the current user and their property in one query.
+
+    Returns:
+        tuple: (user, property), where property is None unless the user is a landlord who owns it.
+    """
+    return get_landlord_with_property(int(get_jwt_identity()), property_id)
 
 def error_response(message, status_code):
     """Generate a consistent error response."""
     return jsonify({"error": message}), status_code
 
+def parse_lease_dates(data):
+    """
+    Parse the lease dates of a tenancy payload.
+
+    Args:
+        data (dict): Payload with lease_start_date and optional lease_end_date (YYYY-MM-DD).
+
+    Returns:
+        tuple: (lease_start_date, lease_end_date), where lease_end_date may be None.
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    lease_start_date = datetime.strptime(data["lease_start_date"], "%Y-%m-%d").date()
+    lease_end_date = None  # Initialize as None by default
+
+    # Only try to parse lease_end_date if it's provided and not empty
+    if data.get("lease_end_date"):
+        lease_end_date = datetime.strptime(data["lease_end_date"], "%Y-%m-%d").date()
+    return lease_start_date, lease_end_date
+
 # Create property
 @properties_bp.route("", methods=["POST"])
 @jwt_required()
+@idempotent
 def create_landlord_property():
     """
     Create a new property for the authenticated landlord.
@@ -41,16 +85,20 @@ def create_landlord_property():
     if not user or user.role != "Landlord":
         return error_response("Unauthorized", 403)
 
+    # Create the new property
+    new_property = Property(
+        address=data["address"],
+        landlord_id=user.user_id  # Use the landlord_id from the authenticated user
+    )
     try:
-        # Create the new property
-        new_property = Property(
-            address=data["address"],
-            landlord_id=user.user_id  # Use the landlord_id from the authenticated user
-        )
-        db.session.add(new_property)
+        set_property_location(new_property, data.get("latitude"), data.get("longitude"))
+    except ValueError as e:
+        return error_response(str(e), 400)
 
-        # Commit the transaction
-        db.session.commit()
+    try:
+        db.session.add(new_property)
+        db.session.flush()  # Apply the default status before counting the property
+        record_property_created(user.user_id, new_property.status)
 
         # Prepare the response
         #TODO: add location once get property api 
@@ -58,15 +106,21 @@ def create_landlord_property():
         response = jsonify(new_property.to_dict())
         response.status_code = 201
         # response.headers["Location"] = location
+
+        # Commit the transaction, with the response of an Idempotency-Key
+        store_idempotent_response(response)
+        db.session.commit()
         return response
 
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception("Error while creating the property")
         return error_response("An error occurred while creating the property.", 500)
 
 # Get all properties for a landlord
 @properties_bp.route("", methods=["GET"])
 @jwt_required()
+@read_from_replica
 def get_landlord_properties():
     """
     Get all properties for the authenticated landlord, with optional pagination and filtering.
@@ -75,6 +129,7 @@ def get_landlord_properties():
         page (int): The page number (default: 1).
         per_page (int): The number of items per page (default: 10).
         status (str): Filter properties by status.
+        q (str): Search for properties whose address contains this text, best matches first.
 
     Returns:
         JSON: A list of properties with pagination metadata or an error message.
@@ -87,12 +142,9 @@ def get_landlord_properties():
     page = request.args.get("page", default=1, type=int)
     per_page = request.args.get("per_page", default=10, type=int)
     status = request.args.get("status", type=str)
+    search_term = request.args.get("q", type=str)
 
-    query = Property.query.filter_by(landlord_id=user.user_id)
-    if status:
-        query = query.filter(Property.status == status)
-
-    properties = query.paginate(page=page, per_page=per_page, error_out=False)
+    properties = paginate_landlord_properties(user.user_id, page, per_page, status, search_term)
 
     return jsonify({
         "total": properties.total,
@@ -101,9 +153,210 @@ def get_landlord_properties():
         "properties": [property.to_dict() for property in properties.items]
     })
 
+# Get the portfolio summary for a landlord
+@properties_bp.route("/summary", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_portfolio_summary():
+    """
+    Get the dashboard summary of the authenticated landlord's portfolio.
+
+    The summary is maintained by the property and tenancy write paths, so this
+    is a single primary-key lookup rather than an aggregate over the portfolio.
+
+    Returns:
+        JSON: Property counts by status, active tenancies and monthly rent due, or an error message.
+    """
+    try:
+        user = get_current_user()
+        if not user or user.role != "Landlord":
+            return error_response("Unauthorized", 403)
+
+        return jsonify(get_landlord_summary(user.user_id).to_dict()), 200
+    except Exception as e:
+        current_app.logger.exception("Error while retrieving the portfolio summary")
+        return error_response("An error occurred while retrieving the portfolio summary.", 500)
+
+# Project rent income for a landlord's portfolio
+@properties_bp.route("/rent-roll", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_rent_roll_projection():
+    """
+    Project monthly rent income, occupancy and lease expiries across the landlord's portfolio.
+
+    Query Parameters:
+        start (str): First projected month, YYYY-MM (default: the current month).
+        months (int): Number of months to project (default: 12, at most RENT_ROLL_MAX_MONTHS).
+
+    Returns:
+        JSON: One entry per month with rent_roll, active_tenancies, occupied_properties,
+        occupancy_rate, expiring_leases and expiring_rent, or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    start = request.args.get("start", type=str)
+    months = request.args.get("months", default=12, type=int)
+    max_months = current_app.config["RENT_ROLL_MAX_MONTHS"]
+    if months < 1 or months > max_months:
+        return error_response(f"months must be between 1 and {max_months}", 400)
+
+    try:
+        first_day = datetime.strptime(start, "%Y-%m") if start else datetime.now()
+    except ValueError:
+        return error_response("Invalid start month. Use YYYY-MM", 400)
+
+    try:
+        projection = project_landlord_rent_roll(
+            user.user_id, month_index(first_day.year, first_day.month), months
+        )
+        return jsonify({"months": projection}), 200
+    except Exception as e:
+        current_app.logger.exception("Error while projecting the rent roll")
+        return error_response("An error occurred while projecting the rent roll.", 500)
+
+# Get the landlord's properties near a point
+@properties_bp.route("/nearby", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_nearby_properties():
+    """
+    Get the authenticated landlord's properties within a radius of a point, nearest first.
+
+    Properties without coordinates are never returned.
+
+    Query Parameters:
+        lat (float): Latitude of the center.
+        lng (float): Longitude of the center.
+        radius_m (float): Search radius in meters (default: 2000, at most NEARBY_MAX_RADIUS_M).
+        limit (int): Maximum number of properties returned (default: 50, at most NEARBY_MAX_RESULTS).
+
+    Returns:
+        JSON: The properties with their distance_m, or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    try:
+        latitude, longitude = validate_coordinates(request.args["lat"], request.args["lng"])
+    except KeyError:
+        return error_response("lat and lng are required", 400)
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    radius_m = request.args.get("radius_m", default=2000, type=float)
+    max_radius_m = current_app.config["NEARBY_MAX_RADIUS_M"]
+    if not 0 < radius_m <= max_radius_m:
+        return error_response(f"radius_m must be between 0 and {max_radius_m:g}", 400)
+    limit = request.args.get("limit", default=50, type=int)
+    if limit < 1:
+        return error_response("Invalid limit", 400)
+    limit = min(limit, current_app.config["NEARBY_MAX_RESULTS"])
+
+    try:
+        nearby = find_properties_near(user.user_id, latitude, longitude, radius_m, limit)
+        return jsonify({
+            "properties": [
+                {**property.to_dict(), "distance_m": round(distance, 1)} for property, distance in nearby
+            ]
+        }), 200
+    except Exception as e:
+        current_app.logger.exception("Error while searching nearby properties")
+        return error_response("An error occurred while searching nearby properties.", 500)
+
+# Get the landlord's tenancies in arrears
+@properties_bp.route("/arrears", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_arrears():
+    """
+    Get the authenticated landlord's tenancies with an outstanding balance, largest first.
+
+    Query Parameters:
+        min_balance (float): Only include balances of at least this amount (default: 0.01).
+        limit (int): Maximum number of tenancies returned (default: 100, at most ARREARS_MAX_RESULTS).
+
+    Returns:
+        JSON: The tenancies in arrears with their property and balance, or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    try:
+        min_balance = parse_amount(request.args.get("min_balance", "0.01"))
+    except ValueError:
+        return error_response("Invalid min_balance", 400)
+    limit = request.args.get("limit", default=100, type=int)
+    if limit < 1:
+        return error_response("Invalid limit", 400)
+    limit = min(limit, current_app.config["ARREARS_MAX_RESULTS"])
+
+    try:
+        arrears = list_arrears(user.user_id, min_balance, limit)
+        return jsonify({
+            "arrears": [
+                {
+                    "tenancy_id": balance.tenancy_id,
+                    "property_id": property_id,
+                    "address": address,
+                    "balance": float(balance.balance),
+                    "last_entry_id": balance.last_entry_id
+                }
+                for balance, property_id, address in arrears
+            ]
+        }), 200
+    except Exception as e:
+        current_app.logger.exception("Error while retrieving arrears")
+        return error_response("An error occurred while retrieving arrears.", 500)
+
+# Get leases of a landlord that are ending soon
+@properties_bp.route("/expiring-leases", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_expiring_leases():
+    """
+    Get the lease-expiry notifications recorded for the authenticated landlord's tenancies.
+
+    Query Parameters:
+        page (int): The page number (default: 1).
+        per_page (int): The number of items per page (default: 10).
+
+    Returns:
+        JSON: Upcoming lease ends, soonest first, with pagination metadata or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    page = request.args.get("page", default=1, type=int)
+    per_page = request.args.get("per_page", default=10, type=int)
+
+    notifications = paginate_expiring_leases(user.user_id, datetime.now().date(), page, per_page)
+
+    return jsonify({
+        "total": notifications.total,
+        "page": notifications.page,
+        "per_page": notifications.per_page,
+        "expiring_leases": [
+            {
+                "tenancy_id": notification.tenancy.tenancy_id,
+                "property_id": notification.tenancy.property_id,
+                "rent_due": float(notification.tenancy.rent_due),
+                "lease_end_date": notification.lease_end_date.isoformat(),
+                "notified_at": notification.created_at.isoformat() if notification.created_at else None
+            }
+            for notification in notifications.items
+        ]
+    })
+
 # Get a single property
 @properties_bp.route("/<int:property_id>", methods=["GET"])
 @jwt_required()
+@read_from_replica
 def get_property(property_id):
     """
     Get details of a specific property based on property ID for the authenticated landlord.
@@ -115,16 +368,16 @@ def get_property(property_id):
         JSON: Details of the specific property or an error message.
     """
     try:
-        user = get_current_user()
+        user, property = get_current_landlord_property(property_id)
         if not user or user.role != "Landlord":
             return error_response("Unauthorized", 403)
 
-        property = Property.query.filter_by(property_id=property_id, landlord_id=user.user_id).first()
         if not property:
             return error_response("Property not found", 404)
 
         return jsonify(property.to_dict()), 200
     except Exception as e:
+        current_app.logger.exception("Error while retrieving the property")
         return error_response("An error occurred while retrieving the property.", 500)
     
 # Update property
@@ -141,13 +394,11 @@ def update_property_address(property_id):
         JSON: Updated property details or an error message.
     """
     try:
-        # Authenticate user
-        user = get_current_user()
+        # Authenticate user and check the property belongs to them, in one query
+        user, property = get_current_landlord_property(property_id)
         if not user or user.role != "Landlord":
             return error_response("Unauthorized", 403)
 
-        # Check if property exists and belongs to the landlord
-        property = Property.query.filter_by(property_id=property_id, landlord_id=user.user_id).first()
         if not property:
             return error_response("Property not found", 404)
 
@@ -156,7 +407,12 @@ def update_property_address(property_id):
         if not data or "address" not in data:
             return error_response("Missing or invalid 'address' in the request body.", 400)
 
-        # Update the address
+        # Update the address, and the location when coordinates are sent
+        if "latitude" in data or "longitude" in data:
+            try:
+                set_property_location(property, data.get("latitude"), data.get("longitude"))
+            except ValueError as e:
+                return error_response(str(e), 400)
         property.address = data["address"]
         db.session.commit()
 
@@ -164,11 +420,89 @@ def update_property_address(property_id):
 
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception("Error while updating the property")
         return error_response("An error occurred while updating the property.", 500)
 
+# Delete property
+@properties_bp.route("/<int:property_id>", methods=["DELETE"])
+@jwt_required()
+def delete_property(property_id):
+    """
+    Delete a property of the authenticated landlord with its tenancies, ledgers and group chats.
+
+    Path Parameters:
+        property_id (int): The ID of the property to delete.
+
+    Returns:
+        JSON: A confirmation message or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    try:
+        deleted_ids, tenant_ids = delete_properties(user.user_id, [property_id])
+        if not deleted_ids:
+            return error_response("Property not found", 404)
+        db.session.commit()
+        invalidate_memberships(user.user_id, *tenant_ids)  # Their group chats are gone
+
+        return jsonify({"message": "Property deleted", "property_id": property_id}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while deleting the property")
+        return error_response("An error occurred while deleting the property.", 500)
+
+# Delete properties in bulk
+@properties_bp.route("/batch-delete", methods=["POST"])
+@jwt_required()
+def delete_properties_batch():
+    """
+    Delete many properties of the authenticated landlord in a single transaction.
+
+    Every property is deleted with its tenancies, ledgers and group chats, or
+    none is if any of them isn't the landlord's.
+
+    Request Body:
+        property_ids (list): IDs of the properties to delete.
+
+    Returns:
+        JSON: The IDs of the deleted properties or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    data = request.json
+    property_ids = data.get("property_ids") if isinstance(data, dict) else None
+    if not isinstance(property_ids, list) or not property_ids:
+        return error_response("Missing property_ids", 400)
+    if not all(isinstance(property_id, int) and not isinstance(property_id, bool) for property_id in property_ids):
+        return error_response("Invalid property_ids", 400)
+
+    max_size = current_app.config["PROPERTY_BATCH_DELETE_MAX_SIZE"]
+    if len(property_ids) > max_size:
+        return error_response(f"A batch can delete at most {max_size} properties", 400)
+
+    try:
+        deleted_ids, tenant_ids = delete_properties(user.user_id, property_ids)
+        if not deleted_ids:
+            return error_response("Property not found", 404)
+        db.session.commit()
+        invalidate_memberships(user.user_id, *tenant_ids)
+
+        return jsonify({"deleted": deleted_ids}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while deleting the properties")
+        return error_response("An error occurred while deleting the properties.", 500)
+
 # Create tenancy for a property
 @properties_bp.route("/<int:property_id>/tenancies", methods=["POST"])
 @jwt_required()
+@idempotent
 def create_property_tenancy(property_id):
     """
     Create a new tenancy for a specific property.
@@ -185,13 +519,11 @@ def create_property_tenancy(property_id):
         JSON: Details of the newly created tenancy or an error message.
     """
     try:
-        # Authenticate user
-        user = get_current_user()
+        # Authenticate user and check the property belongs to them, in one query
+        user, property = get_current_landlord_property(property_id)
         if not user or user.role != "Landlord":
             return error_response("Unauthorized", 403)
 
-        # Check if property exists and belongs to the landlord
-        property = Property.query.filter_by(property_id=property_id, landlord_id=user.user_id).first()
         if not property:
             return error_response("Property not found", 404)
 
@@ -202,12 +534,7 @@ def create_property_tenancy(property_id):
             return error_response("Missing required fields", 400)
 
         try:
-            lease_start_date = datetime.strptime(data["lease_start_date"], "%Y-%m-%d").date()
-            lease_end_date = None  # Initialize as None by default
-            
-            # Only try to parse lease_end_date if it's provided and not empty
-            if data.get("lease_end_date"):
-                lease_end_date = datetime.strptime(data["lease_end_date"], "%Y-%m-%d").date()
+            lease_start_date, lease_end_date = parse_lease_dates(data)
         except ValueError:
             return error_response("Invalid date format. Use YYYY-MM-DD", 400)
 
@@ -228,7 +555,8 @@ def create_property_tenancy(property_id):
         )
 
         db.session.add(new_tenancy)
-        db.session.commit()
+        db.session.flush()  # Get the tenancy_id for the response
+        record_tenancies_created(user.user_id, [(new_tenancy.rent_due, new_tenancy.lease_end_date)])
 
         response_data = {
             "tenancy_id": new_tenancy.tenancy_id,
@@ -241,16 +569,124 @@ def create_property_tenancy(property_id):
                 "group_name": group_chat.group_name
             }
         }
+        response = store_idempotent_response((jsonify(response_data), 201))
+        db.session.commit()
+        invalidate_memberships(user.user_id)  # The landlord joins the new group chat
 
-        return jsonify(response_data), 201
+        return response
 
     except Exception as e:
         db.session.rollback()
+        current_app.logger.exception("Error while creating the tenancy")
         return error_response("An error occurred while creating the tenancy.", 500)
     
 
+# Create tenancies in bulk
+@properties_bp.route("/tenancies/batch", methods=["POST"])
+@jwt_required()
+@idempotent
+def create_tenancies_batch():
+    """
+    Create many tenancies, possibly across properties, in a single transaction.
+
+    Ownership of every referenced property is checked with one query, and the
+    group chats and tenancies are each written with one multi-row
+    INSERT ... RETURNING instead of a flush per tenancy.
+
+    Request Body:
+        tenancies (list): Tenancies to create, each with property_id, rent_due,
+            lease_start_date (YYYY-MM-DD) and optional lease_end_date (YYYY-MM-DD).
+
+    Returns:
+        JSON: The created tenancies in request order or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    data = request.json
+    items = data.get("tenancies") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return error_response("Missing tenancies", 400)
+
+    max_size = current_app.config["TENANCY_BATCH_MAX_SIZE"]
+    if len(items) > max_size:
+        return error_response(f"A batch can contain at most {max_size} tenancies", 400)
+
+    # Validate every payload before touching the database
+    required_fields = ["property_id", "rent_due", "lease_start_date"]
+    tenancy_rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(field in item for field in required_fields):
+            return error_response(f"Missing required fields in tenancy {index}", 400)
+        try:
+            lease_start_date, lease_end_date = parse_lease_dates(item)
+        except (TypeError, ValueError):
+            return error_response(f"Invalid date format in tenancy {index}. Use YYYY-MM-DD", 400)
+        try:
+            tenancy_rows.append({
+                "property_id": int(item["property_id"]),
+                "rent_due": float(item["rent_due"]),
+                "lease_start_date": lease_start_date,
+                "lease_end_date": lease_end_date,
+            })
+        except (TypeError, ValueError):
+            return error_response(f"Invalid property_id or rent_due in tenancy {index}", 400)
+
+    try:
+        # Check ownership of all referenced properties at once
+        property_ids = {row["property_id"] for row in tenancy_rows}
+        addresses = find_owned_property_addresses(user.user_id, property_ids)
+        if len(addresses) != len(property_ids):
+            return error_response("Property not found", 404)
+
+        group_names = [f"Property Chat - {addresses[row['property_id']]}" for row in tenancy_rows]
+        group_chat_ids = db.session.scalars(
+            insert(GroupChat).returning(GroupChat.group_chat_id, sort_by_parameter_order=True),
+            [{"group_name": group_name} for group_name in group_names]
+        ).all()
+
+        for row, group_chat_id in zip(tenancy_rows, group_chat_ids):
+            row["group_chat_id"] = group_chat_id
+        tenancy_ids = db.session.scalars(
+            insert(Tenancy).returning(Tenancy.tenancy_id, sort_by_parameter_order=True),
+            tenancy_rows
+        ).all()
+
+        record_tenancies_created(
+            user.user_id, [(row["rent_due"], row["lease_end_date"]) for row in tenancy_rows]
+        )
+        record_changes(user.user_id, "tenancy", "insert", tenancy_ids)
+
+        tenancies_data = [
+            {
+                "tenancy_id": tenancy_id,
+                "property_id": row["property_id"],
+                "rent_due": row["rent_due"],
+                "lease_start_date": row["lease_start_date"].isoformat(),
+                "lease_end_date": row["lease_end_date"].isoformat() if row["lease_end_date"] else None,
+                "group_chat": {
+                    "group_chat_id": row["group_chat_id"],
+                    "group_name": group_name
+                }
+            }
+            for tenancy_id, row, group_name in zip(tenancy_ids, tenancy_rows, group_names)
+        ]
+        response = store_idempotent_response((jsonify({"tenancies": tenancies_data}), 201))
+        db.session.commit()
+        invalidate_memberships(user.user_id)
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while creating the tenancies")
+        return error_response("An error occurred while creating the tenancies.", 500)
+
+    return response
+
+
 @properties_bp.route("/<int:property_id>/tenancies", methods=["GET"])
 @jwt_required()
+@read_from_replica
 def get_property_tenancies(property_id):
     """
     Retrieve all tenancies associated with a specific property.
@@ -262,13 +698,12 @@ def get_property_tenancies(property_id):
         JSON: List of tenancies associated with the property or an error message.
     """
     try:
-        # Authenticate user
-        user = get_current_user()
+        # Authenticate user and load the property in one query
+        user, property = get_user_and_property(int(get_jwt_identity()), property_id)
         if not user:
             return error_response("Unauthorized", 403)
 
         # Check if property exists
-        property = db.session.get(Property, property_id)
         if not property:
             return error_response("Property not found", 404)
 
@@ -276,12 +711,12 @@ def get_property_tenancies(property_id):
         if property.landlord_id != user.user_id:
             return error_response("Unauthorized access to property", 403)
 
-        # Get all tenancies for the property
-        tenancies = Tenancy.query.filter_by(property_id=property_id).all()
+        # Get all tenancies for the property with their group chat
+        tenancies = list_property_tenancies(property_id)
 
         # Format response
         tenancies_data = []
-        for tenancy in tenancies:
+        for tenancy, group_chat_name in tenancies:
             tenancy_data = {
                 "tenancy_id": tenancy.tenancy_id,
                 "property_id": tenancy.property_id,
@@ -289,8 +724,8 @@ def get_property_tenancies(property_id):
                 "lease_start_date": tenancy.lease_start_date.isoformat(),
                 "lease_end_date": tenancy.lease_end_date.isoformat() if tenancy.lease_end_date else None,
                 "group_chat": {
-                    "group_chat_id": tenancy.group_chat.group_chat_id,
-                    "name": tenancy.group_chat.group_name
+                    "group_chat_id": tenancy.group_chat_id,
+                    "name": group_chat_name
                 }
             }
             tenancies_data.append(tenancy_data)
@@ -298,5 +733,5 @@ def get_property_tenancies(property_id):
         return jsonify(tenancies_data), 200
 
     except Exception as e:
-        print(f"Error retrieving tenancies: {str(e)}")
+        current_app.logger.exception("Error while retrieving tenancies")
         return error_response("An error occurred while retrieving tenancies.", 500)
\ No newline at end of file
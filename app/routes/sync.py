@@ -0,0 +1,52 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.db_routing import read_from_replica
+from app.sharding import use_landlord_shard
+from app.routes.properties import error_response, get_current_user
+from app.services.change_feed import SyncCursorError, get_changes, latest_version
+
+# Blueprint for incremental portfolio sync
+sync_bp = Blueprint("sync", __name__)
+sync_bp.before_request(use_landlord_shard)  # The change log lives on the landlord's shard
+
+# Get the changes to the portfolio since the last sync
+@sync_bp.route("", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def sync_portfolio():
+    """
+    Get the properties, tenancies and tenancy tenants of the authenticated
+    landlord that changed since a cursor.
+
+    Without `since`, only the current cursor is returned: take it before
+    downloading the full portfolio, then pass it to the next sync. Rows that
+    changed several times are returned once, in their current state.
+
+    Query Parameters:
+        since (int): The cursor returned by the previous sync.
+        limit (int): The number of changes to read (default: SYNC_MAX_PAGE_SIZE).
+
+    Returns:
+        JSON: Upserted and deleted rows per entity, the next cursor and whether
+        more changes follow, or an error message. 410 means the cursor expired
+        and the client must download the full portfolio again.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    since = request.args.get("since", type=int)
+    max_page_size = current_app.config["SYNC_MAX_PAGE_SIZE"]
+    limit = request.args.get("limit", default=max_page_size, type=int)
+    if (since is not None and since < 0) or limit < 1:
+        return error_response("Invalid since or limit", 400)
+
+    try:
+        if since is None:
+            return jsonify({"cursor": latest_version(user.user_id), "has_more": False}), 200
+        return jsonify(get_changes(user.user_id, since, min(limit, max_page_size))), 200
+    except SyncCursorError as e:
+        return error_response(str(e), 410)
+    except Exception as e:
+        current_app.logger.exception("Error while syncing the portfolio")
+        return error_response("An error occurred while syncing the portfolio.", 500)
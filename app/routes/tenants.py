@@ -1,65 +1,245 @@
-#TODO: UNCOMMENT WHEN START api DEVELOPMENT
-# from flask import Blueprint, request, jsonify
-# from app.models.tenant import Tenant
-# from app.extensions import db, mail
-# from flask_mail import Message
-
-# # Create Blueprint for tenants
-# tenants = Blueprint("tenants", __name__)
-
-# # Get all tenants
-# @tenants.route("/", methods=["GET"])
-# def get_tenants():
-#     tenants = Tenant.query.all()
-#     return jsonify([tenant.to_dict() for tenant in tenants])
-
-# # Add a new tenant
-# @tenants.route("/", methods=["POST"])
-# def add_tenant():
-#     data = request.json
-#     if not data or "name" not in data or "email" not in data or "rent_due" not in data:
-#         return jsonify({"error": "Invalid tenant data"}), 400
-
-#     new_tenant = Tenant(name=data["name"], email=data["email"], rent_due=data["rent_due"])
-#     db.session.add(new_tenant)
-#     db.session.commit()
-#     return jsonify(new_tenant.to_dict()), 201
-
-# # Function to send an invitation email
-# @tenants.route("/<int:tenant_id>/send_invitation_email", methods=["POST"])
-# def send_invitation_email(tenant_id):
-#     tenant = Tenant.query.get(tenant_id)
-#     if not tenant:
-#         return jsonify({"error": "Tenant not found"}), 404
-    
-#     try:
-#         msg = Message(
-#             subject="You're Invited to Join [App Name]",
-#             sender="elizaveta.firsovaaa@gmail.com",  # Replace with your email
-#             recipients=[tenant.email]
-#         )
-#         msg.body = f"""
-#         Hi {tenant.name},
-
-#         You have been added as a tenant by your landlord to manage your rent and communication through [App Name].
-
-#         Please click the link below to register and set up your account:
-#         rentapp://api/auth/tenant_registration_page?email={tenant.email}
-
-#         If you did not expect this email, please contact your landlord.
-
-#         Best regards,
-#         The [App Name] Team
-#         """
-#         mail.send(msg)
-
-#         tenant.status = "invited"
-#         db.session.commit()
-
-#         return jsonify({"message": "Email sent and status updated"}), 200
-#     except Exception as e:
-#         print(f"Error sending email: {e}")
-#         return jsonify({"error": "Failed to send email"}), 500
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.db_routing import current_shard, read_from_replica
+from app.extensions import db
+from app.routes.properties import error_response, get_current_user
+from app.services.outbox import enqueue_email, enqueue_emails
+from app.services.repository import find_owned_tenancy_ids, find_registered_emails, list_tenant_tenancies
+from app.services.tenant_provisioning import (
+    activate_tenant_accounts, create_tenant_accounts, delete_tenant_accounts, link_tenants
+)
+from app.sharding import use_landlord_shard
 
+# Blueprint for tenant-related endpoints
+tenants_bp = Blueprint("tenants", __name__)
+tenants_bp.before_request(use_landlord_shard)  # Tenancy links live on the landlord's shard
 
+INVITATION_SUBJECT = "You're Invited to Join {app_name}"
+INVITATION_BODY = """Hi {name},
 
+You have been added as a tenant by your landlord to manage your rent and communication through {app_name}.
+
+Please click the link below to register and set up your account:
+rentapp://api/auth/tenant_registration_page?email={email}
+
+If you did not expect this email, please contact your landlord.
+
+Best regards,
+The {app_name} Team
+"""
+
+PROVISIONED_SUBJECT = "Your {app_name} Account"
+PROVISIONED_BODY = """Hi {name},
+
+Your landlord has created a {app_name} account for you to manage your rent and communication.
+
+Please click the link below to choose your password. The link works once and expires in {hours} hours:
+rentapp://api/auth/set_password_page?token={token}
+
+If you did not expect this email, please contact your landlord.
+
+Best regards,
+The {app_name} Team
+"""
+
+# Invite a tenant
+@tenants_bp.route("/invitations", methods=["POST"])
+@jwt_required()
+def send_invitation_email():
+    """
+    Invite a tenant to register, on behalf of the authenticated landlord.
+
+    The email is queued in the outbox and sent by the outbox workers, so the
+    request returns as soon as the outbox row is committed.
+
+    Request Body:
+        email (str): Address of the tenant to invite.
+        name (str): Name to greet the tenant with (optional).
+
+    Returns:
+        JSON: The queued invitation or an error message.
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    data = request.json
+    if not data or not data.get("email"):
+        return error_response("Missing tenant email", 400)
+
+    email = data["email"].lower()
+    app_name = current_app.config["APP_NAME"]
+
+    try:
+        invitation = enqueue_email(
+            recipient=email,
+            subject=INVITATION_SUBJECT.format(app_name=app_name),
+            body=INVITATION_BODY.format(name=data.get("name") or "there", app_name=app_name, email=email)
+        )
+        db.session.commit()
+
+        return jsonify({
+            "message": "Invitation queued",
+            "outbox_id": invitation.outbox_id,
+            "email": email
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while queueing the invitation")
+        return error_response("An error occurred while queueing the invitation.", 500)
+
+
+# Create tenant accounts in bulk
+@tenants_bp.route("/provision", methods=["POST"])
+@jwt_required()
+def provision_tenant_accounts():
+    """
+    Create accounts for many tenants of the authenticated landlord and add them
+    to their tenancies.
+
+    Each tenant gets a one-time link to set a password by email through the
+    outbox, and can't sign in before using it. All accounts are created, or
+    none is if any address is already registered. On a sharded landlord the
+    accounts commit, marked pending, before the tenancy links, and are deleted
+    again if the links fail. The emails are queued once both have committed.
+
+    Request Body:
+        tenants (list): Tenants to create, each with first_name, last_name, email
+            and the tenancy_id of one of the landlord's tenancies.
+
+    Returns:
+        JSON: The created tenants in request order, or an error message (with the
+        already registered emails on a 409).
+    """
+    user = get_current_user()
+    if not user or user.role != "Landlord":
+        return error_response("Unauthorized", 403)
+
+    data = request.json
+    items = data.get("tenants") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return error_response("Missing tenants", 400)
+
+    max_size = current_app.config["TENANT_PROVISIONING_MAX_SIZE"]
+    if len(items) > max_size:
+        return error_response(f"A batch can contain at most {max_size} tenants", 400)
+
+    # Validate every payload before touching the database
+    tenants = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not all(
+            isinstance(item.get(field), str) and item[field].strip() for field in ("first_name", "last_name", "email")
+        ):
+            return error_response(f"Missing name or email in tenant {index}", 400)
+        tenancy_id = item.get("tenancy_id")
+        if not isinstance(tenancy_id, int) or isinstance(tenancy_id, bool):
+            return error_response(f"Invalid tenancy_id in tenant {index}", 400)
+        tenants.append({
+            "first_name": item["first_name"].strip(),
+            "last_name": item["last_name"].strip(),
+            "email": item["email"].strip().lower(),
+            "tenancy_id": tenancy_id,
+        })
+
+    emails = [tenant["email"] for tenant in tenants]
+    if len(set(emails)) != len(emails):
+        return error_response("Duplicate emails in the batch", 400)
+
+    try:
+        # Check ownership of all referenced tenancies at once
+        tenancy_ids = {tenant["tenancy_id"] for tenant in tenants}
+        if len(find_owned_tenancy_ids(user.user_id, tenancy_ids)) != len(tenancy_ids):
+            return error_response("Tenancy not found", 404)
+
+        registered = find_registered_emails(emails)
+        if registered:
+            return jsonify({"error": "Email already registered", "emails": sorted(registered)}), 409
+
+        created = create_tenant_accounts(tenants)
+        if current_shard():
+            # The accounts are on the default database and the tenancy links on the
+            # landlord's shard. The accounts commit first, marked pending, and are
+            # deleted again if the links fail; nothing is emailed until both committed
+            db.session.commit()
+            try:
+                link_tenants(user.user_id, created)
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                current_app.logger.exception("Error while linking provisioned tenants")
+                delete_tenant_accounts([account["user_id"] for account in created])
+                db.session.commit()
+                return error_response("An error occurred while provisioning tenants.", 500)
+        else:
+            link_tenants(user.user_id, created)
+
+        setup_tokens = activate_tenant_accounts(created)
+        app_name = current_app.config["APP_NAME"]
+        hours = current_app.config["PASSWORD_SETUP_TOKEN_HOURS"]
+        enqueue_emails([
+            (
+                account["email"],
+                PROVISIONED_SUBJECT.format(app_name=app_name),
+                PROVISIONED_BODY.format(name=tenant["first_name"], app_name=app_name, hours=hours, token=setup_token)
+            )
+            for tenant, account, setup_token in zip(tenants, created, setup_tokens)
+        ])
+        db.session.commit()
+
+    except IntegrityError:
+        # An address was registered by a concurrent request
+        db.session.rollback()
+        return error_response("Email already registered", 409)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error while provisioning tenants")
+        return error_response("An error occurred while provisioning tenants.", 500)
+
+    return jsonify({"tenants": [
+        {"user_id": account["user_id"], "email": account["email"], "tenancy_id": account["tenancy_id"]}
+        for account in created
+    ]}), 201
+
+
+# Get the tenancies of the authenticated tenant
+@tenants_bp.route("/me/tenancies", methods=["GET"])
+@jwt_required()
+@read_from_replica
+def get_my_tenancies():
+    """
+    Get the tenancies the authenticated tenant belongs to, with their property and group chat.
+
+    Returns:
+        JSON: List of tenancies, most recent lease first, or an error message.
+    """
+    try:
+        user = get_current_user()
+        if not user or user.role != "Tenant":
+            return error_response("Unauthorized", 403)
+
+        # Tenancy, property and group chat come back from a single joined query
+        rows = list_tenant_tenancies(user.user_id)
+
+        tenancies_data = [
+            {
+                "tenancy_id": tenancy.tenancy_id,
+                "property_id": tenancy.property_id,
+                "address": address,
+                "rent_due": float(tenancy.rent_due),
+                "lease_start_date": tenancy.lease_start_date.isoformat(),
+                "lease_end_date": tenancy.lease_end_date.isoformat() if tenancy.lease_end_date else None,
+                "group_chat": {
+                    "group_chat_id": tenancy.group_chat_id,
+                    "name": group_name
+                }
+            }
+            for tenancy, address, group_name in rows
+        ]
+
+        return jsonify(tenancies_data), 200
+
+    except Exception as e:
+        current_app.logger.exception("Error while retrieving tenancies")
+        return error_response("An error occurred while retrieving tenancies.", 500)
@@ -0,0 +1,254 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload
+from app.extensions import db
+from app.models.changeLog import ChangeLog
+from app.models.changeLogHead import ChangeLogHead
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+
+# Entities in the change feed, and the key of the response each one is returned under
+ENTITIES = {"property": "properties", "tenancy": "tenancies", "tenancy_tenant": "tenancy_tenants"}
+
+
+class SyncCursorError(Exception):
+    """Raised when changes after a cursor can't be returned; the client has to resync in full."""
+
+
+# Dialects whose INSERT can skip a row that already exists
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _insert_missing_head(dialect_name, landlord_id):
+    """
+    INSERT of an empty head row that does nothing if a concurrent transaction
+    inserted it first; there it waits for that transaction to end.
+    """
+    conflict_insert = _CONFLICT_INSERTS.get(dialect_name)
+    if conflict_insert is None:
+        return insert(ChangeLogHead).values(landlord_id=landlord_id, last_version=0)
+    return (
+        conflict_insert(ChangeLogHead)
+        .values(landlord_id=landlord_id, last_version=0)
+        .on_conflict_do_nothing(index_elements=[ChangeLogHead.landlord_id])
+    )
+
+
+def _allocate_versions(execute, dialect_name, landlord_id, count):
+    """
+    Reserve the next count versions of the landlord's feed.
+
+    The head row stays locked until the transaction ends, so a landlord's
+    changes commit in version order and a reader never skips a version that
+    commits late.
+    """
+    bump = (
+        update(ChangeLogHead)
+        .where(ChangeLogHead.landlord_id == landlord_id)
+        .values(last_version=ChangeLogHead.last_version + count)
+    )
+    if execute(bump).rowcount == 0:
+        # First change of a landlord without a head, e.g. registered before the feed
+        # existed; two first writes both get here, and both bump the one row inserted
+        execute(_insert_missing_head(dialect_name, landlord_id))
+        execute(bump)
+    last_version = execute(
+        select(ChangeLogHead.last_version).where(ChangeLogHead.landlord_id == landlord_id)
+    ).scalar_one()
+    return range(last_version - count + 1, last_version + 1)
+
+
+def _write_changes(execute, dialect_name, landlord_id, entity, operation, keys):
+    versions = _allocate_versions(execute, dialect_name, landlord_id, len(keys))
+    execute(insert(ChangeLog), [
+        {
+            "landlord_id": landlord_id,
+            "version": version,
+            "entity": entity,
+            "entity_id": entity_id,
+            "tenant_id": tenant_id,
+            "operation": operation,
+        }
+        for version, (entity_id, tenant_id) in zip(versions, keys)
+    ])
+
+
+def record_changes(landlord_id, entity, operation, entity_ids):
+    """
+    Log changes made by bulk statements, which the ORM events below can't see.
+
+    Call inside the transaction that makes the changes, before committing.
+
+    Args:
+        landlord_id (int): Owner of the changed rows.
+        entity (str): "property", "tenancy" or "tenancy_tenant".
+        operation (str): "insert", "update" or "delete".
+        entity_ids (list): IDs of the changed rows; (tenancy_id, tenant_id) pairs for tenancy_tenant.
+    """
+    if entity_ids:
+        keys = [key if isinstance(key, tuple) else (key, None) for key in entity_ids]
+        dialect_name = db.session.get_bind(mapper=ChangeLogHead).dialect.name
+        _write_changes(db.session.execute, dialect_name, landlord_id, entity, operation, keys)
+
+
+# ORM writes of the synced entities are logged in the flush that makes them
+
+def _change_key(entity, target):
+    if entity == "property":
+        return target.property_id, None
+    if entity == "tenancy":
+        return target.tenancy_id, None
+    return target.tenancy_id, target.tenant_id
+
+
+def _change_landlord(connection, entity, target):
+    if entity == "property":
+        return target.landlord_id
+    if entity == "tenancy":
+        return connection.scalar(select(Property.landlord_id).where(Property.property_id == target.property_id))
+    return connection.scalar(
+        select(Property.landlord_id)
+        .join(Tenancy, Tenancy.property_id == Property.property_id)
+        .where(Tenancy.tenancy_id == target.tenancy_id)
+    )
+
+
+def _log_change(entity, operation):
+    def log_change(mapper, connection, target):
+        # Updates fire for every dirty object, including ones with only relationship changes
+        session = Session.object_session(target)
+        if operation == "update" and session is not None and not session.is_modified(target, include_collections=False):
+            return
+        landlord_id = _change_landlord(connection, entity, target)
+        if landlord_id is not None:
+            _write_changes(
+                connection.execute, connection.dialect.name, landlord_id, entity, operation,
+                [_change_key(entity, target)]
+            )
+    return log_change
+
+
+for _model, _entity in ((Property, "property"), (Tenancy, "tenancy"), (TenancyTenants, "tenancy_tenant")):
+    for _operation in ("insert", "update", "delete"):
+        event.listen(_model, f"after_{_operation}", _log_change(_entity, _operation))
+
+
+def latest_version(landlord_id):
+    """The version of the landlord's latest change, or 0 if nothing was logged yet."""
+    return db.session.scalar(
+        select(ChangeLogHead.last_version).where(ChangeLogHead.landlord_id == landlord_id)
+    ) or 0
+
+
+def _check_cursor(landlord_id, since):
+    head = latest_version(landlord_id)
+    if since > head:
+        raise SyncCursorError("Unknown sync cursor")
+    if since < head and db.session.get(ChangeLog, (landlord_id, since + 1)) is None:
+        raise SyncCursorError("Sync cursor expired")
+
+
+def get_changes(landlord_id, since, limit):
+    """
+    Get what changed in a landlord's portfolio after a cursor.
+
+    Reads up to limit versions after the cursor from the (landlord_id, version)
+    primary key. Several changes of one row collapse into one: rows that still
+    exist are returned in their current state, others as deleted.
+
+    Args:
+        landlord_id (int): The landlord whose portfolio is synced.
+        since (int): The cursor returned by the previous sync.
+        limit (int): Maximum number of changes read.
+
+    Returns:
+        dict: Upserted and deleted rows per entity, the next cursor and whether more changes follow.
+
+    Raises:
+        SyncCursorError: If the cursor is unknown or the changes after it were purged.
+    """
+    _check_cursor(landlord_id, since)
+    changes = db.session.scalars(
+        select(ChangeLog)
+        .where(ChangeLog.landlord_id == landlord_id, ChangeLog.version > since)
+        .order_by(ChangeLog.version)
+        .limit(limit)
+    ).all()
+
+    changed = {entity: set() for entity in ENTITIES}
+    for change in changes:
+        changed[change.entity].add((change.entity_id, change.tenant_id))
+
+    property_ids = {entity_id for entity_id, _ in changed["property"]}
+    properties = db.session.scalars(
+        select(Property)
+        .options(selectinload(Property.tenancies))
+        .where(Property.landlord_id == landlord_id, Property.property_id.in_(property_ids))
+    ).all() if property_ids else []
+
+    tenancy_ids = {entity_id for entity_id, _ in changed["tenancy"]}
+    tenancies = db.session.scalars(
+        select(Tenancy)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(Property.landlord_id == landlord_id, Tenancy.tenancy_id.in_(tenancy_ids))
+    ).all() if tenancy_ids else []
+
+    tenancy_tenant_keys = changed["tenancy_tenant"]
+    tenancy_tenants = db.session.scalars(
+        select(TenancyTenants)
+        .join(Tenancy, Tenancy.tenancy_id == TenancyTenants.tenancy_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(
+            Property.landlord_id == landlord_id,
+            tuple_(TenancyTenants.tenancy_id, TenancyTenants.tenant_id).in_(tenancy_tenant_keys)
+        )
+    ).all() if tenancy_tenant_keys else []
+
+    upserted = {
+        "property": {(row.property_id, None): row.to_dict() for row in properties},
+        "tenancy": {(row.tenancy_id, None): row.to_dict() for row in tenancies},
+        "tenancy_tenant": {
+            (row.tenancy_id, row.tenant_id): {"tenancy_id": row.tenancy_id, "tenant_id": row.tenant_id}
+            for row in tenancy_tenants
+        },
+    }
+    result = {}
+    for entity, response_key in ENTITIES.items():
+        keys = sorted(changed[entity])
+        result[response_key] = {
+            "upserted": [upserted[entity][key] for key in keys if key in upserted[entity]],
+            "deleted": [
+                key[0] if entity != "tenancy_tenant" else {"tenancy_id": key[0], "tenant_id": key[1]}
+                for key in keys if key not in upserted[entity]
+            ],
+        }
+    result["cursor"] = changes[-1].version if changes else since
+    result["has_more"] = len(changes) == limit
+    return result
+
+
+def purge_change_log(retention_days=None, now=None):
+    """
+    Delete changes older than the retention period on the current shard.
+
+    Clients whose cursor is older than the oldest change kept get a
+    SyncCursorError and resync in full.
+
+    Args:
+        retention_days (int): Keep changes this many days (default: SYNC_RETENTION_DAYS).
+        now (datetime): The current UTC time (default: now).
+
+    Returns:
+        int: The number of changes deleted.
+    """
+    if retention_days is None:
+        retention_days = current_app.config["SYNC_RETENTION_DAYS"]
+    now = now or datetime.utcnow()
+    result = db.session.execute(
+        delete(ChangeLog).where(ChangeLog.created_at < now - timedelta(days=retention_days))
+    )
+    db.session.commit()
+    return result.rowcount
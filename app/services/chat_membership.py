@@ -0,0 +1,109 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, select, union
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+
+
+def load_group_chat_ids(user_id):
+    """Group chats of the tenancies the user rents, or owns as landlord, in one query."""
+    return frozenset(db.session.scalars(union(
+        select(Tenancy.group_chat_id)
+        .join(TenancyTenants, TenancyTenants.tenancy_id == Tenancy.tenancy_id)
+        .where(TenancyTenants.tenant_id == user_id),
+        select(Tenancy.group_chat_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(Property.landlord_id == user_id)
+    )))
+
+
+class MembershipCache:
+    """
+    Per-process cache of user_id -> ids of the group chats the user belongs to,
+    so chat authorization doesn't query the join tables for every message.
+
+    Entries are dropped when this process commits a change to the user's
+    memberships, and expire after CHAT_MEMBERSHIP_CACHE_TTL seconds to bound
+    staleness from changes made by other processes.
+    """
+
+    def __init__(self, max_entries=10000):
+        self._entries = {}
+        self._invalidated_at = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, user_id):
+        ttl = current_app.config["CHAT_MEMBERSHIP_CACHE_TTL"]
+        entry = self._entries.get(user_id)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+
+        loaded_at = time.monotonic()
+        group_chat_ids = load_group_chat_ids(user_id)
+        with self._lock:
+            if len(self._entries) >= self._max_entries:
+                self._entries.clear()
+                self._invalidated_at.clear()
+            # Don't cache a result loaded before an invalidation that raced with it
+            if self._invalidated_at.get(user_id, 0) < loaded_at:
+                self._entries[user_id] = (loaded_at, group_chat_ids)
+        return group_chat_ids
+
+    def invalidate(self, *user_ids):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._invalidated_at) >= self._max_entries:
+                self._invalidated_at.clear()
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                self._invalidated_at[user_id] = now
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidated_at.clear()
+
+
+membership_cache = MembershipCache()
+
+
+def is_chat_member(user_id, group_chat_id):
+    """Check whether the user belongs to the group chat, from the cache when possible."""
+    return group_chat_id in membership_cache.get(user_id)
+
+
+def invalidate_memberships(*user_ids):
+    """
+    Drop cached memberships after writes the ORM events can't see, such as
+    bulk inserts or new tenancies (which add a chat for the landlord).
+    """
+    membership_cache.invalidate(*user_ids)
+
+
+# Invalidate tenants whose TenancyTenants rows change, once the change is committed
+
+def _queue_invalidation(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("membership_invalidations", set()).add(target.tenant_id)
+
+
+event.listen(TenancyTenants, "after_insert", _queue_invalidation)
+event.listen(TenancyTenants, "after_delete", _queue_invalidation)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    user_ids = session.info.pop("membership_invalidations", None)
+    if user_ids:
+        membership_cache.invalidate(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("membership_invalidations", None)
@@ -0,0 +1,132 @@
+import threading
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import and_, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from app.db_routing import current_shard, shard_bind
+from app.extensions import db
+from app.models.leaseExpiryNotification import LeaseExpiryNotification
+from app.models.scanCheckpoint import ScanCheckpoint
+from app.models.tenancy import Tenancy
+from app.sharding import for_each_shard
+
+CHECKPOINT_NAME = "lease_expiry"
+
+
+def scan_expiring_leases(horizon_days=None, batch_size=None, today=None):
+    """
+    Record a notification for every lease ending within the horizon.
+
+    Every run walks the leases ending between today and the horizon end in
+    (lease_end_date, tenancy_id) order using the composite index, one batch at
+    a time, so its cost follows the number of expiring leases, not the size of
+    the tenancy table. Leases created or shortened since the last run are
+    therefore seen, and ones already notified are skipped. The position is
+    saved with every batch, so a run interrupted today picks up where it
+    stopped; it is cleared once the run completes.
+
+    Args:
+        horizon_days (int): How many days ahead to look (default: LEASE_EXPIRY_HORIZON_DAYS).
+        batch_size (int): Leases per batch (default: LEASE_EXPIRY_BATCH_SIZE).
+        today (date): The scan date (default: today).
+
+    Returns:
+        dict: Number of leases scanned and notifications recorded.
+    """
+    horizon_days = horizon_days if horizon_days is not None else current_app.config["LEASE_EXPIRY_HORIZON_DAYS"]
+    batch_size = batch_size or current_app.config["LEASE_EXPIRY_BATCH_SIZE"]
+    today = today or date.today()
+    horizon_end = today + timedelta(days=horizon_days)
+
+    # Each shard walks its own tenancies, so keeps its own checkpoint
+    checkpoint_name = f"{CHECKPOINT_NAME}:{shard_bind(current_shard())}" if current_shard() else CHECKPOINT_NAME
+    checkpoint = db.session.get(ScanCheckpoint, checkpoint_name)
+    if checkpoint is None:
+        checkpoint = ScanCheckpoint(name=checkpoint_name)
+        db.session.add(checkpoint)
+
+    # Only resume an interrupted run of the same day; leases that already ended are not "approaching"
+    if checkpoint.run_date == today and checkpoint.last_date is not None:
+        last_date, last_id = checkpoint.last_date, checkpoint.last_id
+    else:
+        last_date, last_id = today, 0
+        checkpoint.run_date = today
+
+    scanned = recorded = 0
+    while True:
+        batch = db.session.execute(
+            select(Tenancy.tenancy_id, Tenancy.lease_end_date)
+            .where(
+                Tenancy.lease_end_date <= horizon_end,
+                or_(
+                    Tenancy.lease_end_date > last_date,
+                    and_(Tenancy.lease_end_date == last_date, Tenancy.tenancy_id > last_id)
+                )
+            )
+            .order_by(Tenancy.lease_end_date, Tenancy.tenancy_id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+
+        # Skip leases notified by an earlier run
+        already_notified = set(db.session.execute(
+            select(LeaseExpiryNotification.tenancy_id, LeaseExpiryNotification.lease_end_date).where(
+                tuple_(LeaseExpiryNotification.tenancy_id, LeaseExpiryNotification.lease_end_date).in_(
+                    [tuple(row) for row in batch]
+                )
+            )
+        ).tuples())
+        notifications = [
+            {"tenancy_id": tenancy_id, "lease_end_date": lease_end_date}
+            for tenancy_id, lease_end_date in batch
+            if (tenancy_id, lease_end_date) not in already_notified
+        ]
+        if notifications:
+            db.session.execute(insert(LeaseExpiryNotification), notifications)
+
+        last_id, last_date = batch[-1]
+        checkpoint.last_date, checkpoint.last_id = last_date, last_id
+        db.session.commit()
+
+        scanned += len(batch)
+        recorded += len(notifications)
+        if len(batch) < batch_size:
+            break
+
+    # The run is complete, so the next one starts again from today
+    checkpoint.last_date = checkpoint.last_id = None
+    db.session.commit()
+    return {"scanned": scanned, "notified": recorded}
+
+
+def start_lease_expiry_scheduler(app, interval):
+    """
+    Run the lease-expiry scan every `interval` seconds on a daemon thread.
+
+    The checkpoint is shared through the database, but concurrent scans would
+    race on it, so enable the scheduler in a single process only.
+
+    Returns:
+        threading.Event: Set it to stop the scheduler.
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    for _ in for_each_shard():
+                        scan_expiring_leases()
+                except IntegrityError:
+                    # Another process recorded the same notifications first
+                    db.session.rollback()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Lease expiry scan failed")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name="lease-expiry-scheduler", daemon=True)
+    thread.start()
+    return stop
@@ -0,0 +1,200 @@
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import delete, func, insert, select
+from app.extensions import db
+from app.models.ledgerEntry import LedgerEntry
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyBalance import TenancyBalance
+
+# The sign each entry type applies to the amount given; adjustments keep the sign they are given
+ENTRY_SIGNS = {"charge": 1, "payment": -1, "adjustment": None}
+MAX_AMOUNT = Decimal("9999999999.99")
+
+
+def parse_amount(value):
+    """
+    Parse a money amount to a Decimal with two decimal places.
+
+    Raises:
+        ValueError: If the value isn't a finite number of at most 2 decimal places in range.
+    """
+    if isinstance(value, bool):
+        raise ValueError("Invalid amount")
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("Invalid amount")
+    if not amount.is_finite() or abs(amount) > MAX_AMOUNT or amount != amount.quantize(Decimal("0.01")):
+        raise ValueError("Invalid amount")
+    return amount.quantize(Decimal("0.01"))
+
+
+def _balance_for_update(tenancy_id, landlord_id):
+    """Load the tenancy's balance row with a row lock, creating it if missing."""
+    balance = db.session.get(TenancyBalance, tenancy_id, with_for_update=True)
+    if balance is None:
+        balance = TenancyBalance(tenancy_id=tenancy_id, landlord_id=landlord_id, balance=Decimal("0"))
+        db.session.add(balance)
+    return balance
+
+
+def _append(tenancy_id, landlord_id, entry):
+    db.session.add(entry)
+    db.session.flush()
+    balance = _balance_for_update(tenancy_id, landlord_id)
+    balance.balance = Decimal(balance.balance or 0) + Decimal(entry.amount)
+    balance.last_entry_id = entry.entry_id
+    return entry
+
+
+def record_ledger_entry(tenancy_id, landlord_id, entry_type, amount, effective_date,
+                        description=None, created_by=None):
+    """
+    Append a charge, payment or adjustment to a tenancy's ledger and update its balance.
+
+    Call inside a transaction and commit afterwards; the entry and the new
+    balance are written together.
+
+    Args:
+        tenancy_id (int): The tenancy charged or paid.
+        landlord_id (int): Owner of the tenancy's property.
+        entry_type (str): "charge", "payment" or "adjustment".
+        amount: The amount; positive for charges and payments, signed for adjustments.
+        effective_date (date): When the charge is due or the payment was made.
+        description (str): Optional note shown on the statement.
+        created_by (int): The user recording the entry.
+
+    Returns:
+        LedgerEntry: The new entry.
+
+    Raises:
+        ValueError: If the type or amount is invalid.
+    """
+    if entry_type not in ENTRY_SIGNS:
+        raise ValueError(f"entry_type must be one of: {', '.join(ENTRY_SIGNS)}")
+    amount = parse_amount(amount)
+    sign = ENTRY_SIGNS[entry_type]
+    if amount == 0 or (sign is not None and amount < 0):
+        raise ValueError("amount must be positive" if sign is not None else "amount must not be zero")
+
+    return _append(tenancy_id, landlord_id, LedgerEntry(
+        tenancy_id=tenancy_id,
+        entry_type=entry_type,
+        amount=amount * sign if sign is not None else amount,
+        effective_date=effective_date,
+        description=description,
+        created_by=created_by
+    ))
+
+
+def reverse_ledger_entry(entry, landlord_id, effective_date, description=None, created_by=None):
+    """
+    Undo a ledger entry by appending an entry of the opposite amount.
+
+    Call inside a transaction and commit afterwards. The unique reverses_entry_id
+    column stops an entry from being reversed twice, even by concurrent requests.
+
+    Returns:
+        LedgerEntry: The reversing entry.
+
+    Raises:
+        ValueError: If the entry is itself a reversal or was already reversed.
+    """
+    if entry.reverses_entry_id is not None:
+        raise ValueError("A reversal can't be reversed")
+    already_reversed = db.session.scalar(
+        select(LedgerEntry.entry_id).where(LedgerEntry.reverses_entry_id == entry.entry_id)
+    )
+    if already_reversed is not None:
+        raise ValueError("Entry already reversed")
+
+    return _append(entry.tenancy_id, landlord_id, LedgerEntry(
+        tenancy_id=entry.tenancy_id,
+        entry_type=entry.entry_type,
+        amount=-Decimal(entry.amount),
+        effective_date=effective_date,
+        description=description or f"Reversal of entry {entry.entry_id}",
+        reverses_entry_id=entry.entry_id,
+        created_by=created_by
+    ))
+
+
+def get_ledger_page(tenancy_id, before_id=None, limit=50):
+    """
+    Get a page of a tenancy's ledger entries, newest first.
+
+    Returns:
+        list: LedgerEntry objects, keyed for paging by entry_id.
+    """
+    query = select(LedgerEntry).where(LedgerEntry.tenancy_id == tenancy_id)
+    if before_id is not None:
+        query = query.where(LedgerEntry.entry_id < before_id)
+    return db.session.scalars(query.order_by(LedgerEntry.entry_id.desc()).limit(limit)).all()
+
+
+def get_balance(tenancy_id):
+    """The tenancy's current balance, from its snapshot row."""
+    balance = db.session.get(TenancyBalance, tenancy_id)
+    return Decimal(balance.balance) if balance else Decimal("0")
+
+
+def list_arrears(landlord_id, min_balance=Decimal("0.01"), limit=100):
+    """
+    Get the landlord's tenancies owing at least min_balance, largest balance first.
+
+    Reads the balance snapshots through the (landlord_id, balance) index, so the
+    cost doesn't grow with the number of ledger entries.
+
+    Returns:
+        list: (TenancyBalance, property_id, address) rows.
+    """
+    return db.session.execute(
+        select(TenancyBalance, Tenancy.property_id, Property.address)
+        .join(Tenancy, Tenancy.tenancy_id == TenancyBalance.tenancy_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(TenancyBalance.landlord_id == landlord_id, TenancyBalance.balance >= min_balance)
+        .order_by(TenancyBalance.balance.desc(), TenancyBalance.tenancy_id)
+        .limit(limit)
+    ).all()
+
+
+def rebuild_balances(tenancy_id=None):
+    """
+    Recompute balance snapshots from the ledger, e.g. after a bulk import or to repair drift.
+
+    Args:
+        tenancy_id (int): Only rebuild this tenancy's balance (default: all tenancies).
+
+    Returns:
+        int: The number of balances rebuilt.
+    """
+    totals = (
+        select(
+            LedgerEntry.tenancy_id, Property.landlord_id,
+            func.sum(LedgerEntry.amount), func.max(LedgerEntry.entry_id)
+        )
+        .join(Tenancy, Tenancy.tenancy_id == LedgerEntry.tenancy_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .group_by(LedgerEntry.tenancy_id, Property.landlord_id)
+    )
+    delete_query = delete(TenancyBalance)
+    if tenancy_id is not None:
+        totals = totals.where(LedgerEntry.tenancy_id == tenancy_id)
+        delete_query = delete_query.where(TenancyBalance.tenancy_id == tenancy_id)
+
+    rows = [
+        {
+            "tenancy_id": row_tenancy_id,
+            "landlord_id": landlord_id,
+            "balance": Decimal(total or 0),
+            "last_entry_id": last_entry_id,
+        }
+        for row_tenancy_id, landlord_id, total, last_entry_id in db.session.execute(totals)
+    ]
+
+    # Replace the snapshots in one transaction so readers never see a partial rebuild
+    db.session.execute(delete_query)
+    if rows:
+        db.session.execute(insert(TenancyBalance), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, or_, select
+from app.extensions import db
+from app.models.message import Message
+from app.models.messageArchive import MessageArchive
+from app.models.tenancy import Tenancy
+
+ARCHIVED_COLUMNS = ["message_id", "group_chat_id", "sender_id", "content", "timestamp"]
+
+
+def archive_messages(max_age_days=None, ended_tenancy_days=None, batch_size=None, now=None):
+    """
+    Move cold messages from the message table to message_archive, one batch per transaction.
+
+    A message is cold once it is older than max_age_days, or once the tenancy
+    of its group chat ended more than ended_tenancy_days ago. Each batch is
+    copied and deleted in the same transaction, so a message is always in
+    exactly one of the two tables and an interrupted run can simply be rerun.
+
+    Args:
+        max_age_days (int): Archive messages older than this (default: MESSAGE_ARCHIVE_AFTER_DAYS).
+        ended_tenancy_days (int): Archive chats of tenancies ended this long ago
+            (default: MESSAGE_ARCHIVE_ENDED_TENANCY_DAYS).
+        batch_size (int): Messages moved per transaction (default: MESSAGE_ARCHIVE_BATCH_SIZE).
+        now (datetime): The current UTC time (default: now).
+
+    Returns:
+        int: The number of messages archived.
+    """
+    config = current_app.config
+    max_age_days = max_age_days if max_age_days is not None else config["MESSAGE_ARCHIVE_AFTER_DAYS"]
+    if ended_tenancy_days is None:
+        ended_tenancy_days = config["MESSAGE_ARCHIVE_ENDED_TENANCY_DAYS"]
+    batch_size = batch_size or config["MESSAGE_ARCHIVE_BATCH_SIZE"]
+    now = now or datetime.utcnow()
+
+    ended_chats = select(Tenancy.group_chat_id).where(
+        Tenancy.lease_end_date < now.date() - timedelta(days=ended_tenancy_days)
+    )
+    cold = or_(Message.timestamp < now - timedelta(days=max_age_days), Message.group_chat_id.in_(ended_chats))
+
+    archived = 0
+    while True:
+        message_ids = db.session.scalars(
+            select(Message.message_id).where(cold).order_by(Message.message_id).limit(batch_size)
+        ).all()
+        if not message_ids:
+            return archived
+
+        db.session.execute(insert(MessageArchive).from_select(
+            ARCHIVED_COLUMNS + ["archived_at"],
+            select(*(getattr(Message, column) for column in ARCHIVED_COLUMNS), literal(now))
+            .where(Message.message_id.in_(message_ids))
+        ))
+        db.session.execute(delete(Message).where(Message.message_id.in_(message_ids)))
+        db.session.commit()
+        archived += len(message_ids)
+
+
+def _history_page(model, group_chat_id, before_id, limit):
+    query = select(
+        model.message_id, model.group_chat_id, model.sender_id, model.content, model.timestamp
+    ).where(model.group_chat_id == group_chat_id)
+    if before_id is not None:
+        query = query.where(model.message_id < before_id)
+    return db.session.execute(query.order_by(model.message_id.desc()).limit(limit)).all()
+
+
+def get_chat_history(group_chat_id, before_id=None, limit=50):
+    """
+    Get a page of a group chat's messages, newest first, across the hot and archived tables.
+
+    Pages are keyed by message id. Archived messages are always older than the
+    messages left in the message table, so the archive is only read once a
+    page runs past the oldest hot message.
+
+    Args:
+        group_chat_id (int): The group chat.
+        before_id (int): Only return messages older than this message id.
+        limit (int): Page size.
+
+    Returns:
+        list: Message rows with message_id, group_chat_id, sender_id, content and timestamp.
+    """
+    messages = _history_page(Message, group_chat_id, before_id, limit)
+    if len(messages) < limit:
+        oldest_id = messages[-1].message_id if messages else before_id
+        messages += _history_page(MessageArchive, group_chat_id, oldest_id, limit - len(messages))
+    return messages
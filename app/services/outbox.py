@@ -0,0 +1,210 @@
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, insert, or_, select, update
+from app.extensions import db, mail
+from app.models.emailOutbox import EmailOutbox
+
+# SMTP errors are OSErrors; these ones reject a single message and leave the connection usable
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def enqueue_email(recipient, subject, body):
+    """
+    Queue an email in the outbox. It is sent once the caller's transaction commits.
+
+    Returns:
+        EmailOutbox: The pending outbox row.
+    """
+    email = EmailOutbox(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(email)
+    return email
+
+
+def enqueue_emails(emails):
+    """
+    Queue many emails in the outbox with one multi-row INSERT. They are sent
+    once the caller's transaction commits.
+
+    Args:
+        emails (list): (recipient, subject, body) tuples.
+    """
+    now = datetime.utcnow()
+    if emails:
+        db.session.execute(insert(EmailOutbox), [
+            {
+                "recipient": recipient,
+                "subject": subject,
+                "body": body,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            for recipient, subject, body in emails
+        ])
+
+
+def _claimable(now):
+    """Rows that are due, or were claimed by a worker that never finished them."""
+    claim_expired = now - timedelta(seconds=current_app.config["OUTBOX_CLAIM_TIMEOUT_SECONDS"])
+    return or_(
+        and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == "sending", EmailOutbox.claimed_at < claim_expired)
+    )
+
+
+def claim_batch(batch_size=None):
+    """
+    Claim up to `batch_size` due emails for the calling worker.
+
+    The claim is a single guarded UPDATE tagged with a fresh token, so concurrent
+    workers never claim the same row, on any database.
+
+    Returns:
+        list: The claimed EmailOutbox rows.
+    """
+    batch_size = batch_size or current_app.config["OUTBOX_BATCH_SIZE"]
+    now = datetime.utcnow()
+    candidate_ids = db.session.scalars(
+        select(EmailOutbox.outbox_id)
+        .where(_claimable(now))
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.outbox_id)
+        .limit(batch_size)
+    ).all()
+    if not candidate_ids:
+        db.session.commit()
+        return []
+
+    token = str(uuid.uuid4())
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.outbox_id.in_(candidate_ids), _claimable(now))
+        .values(status="sending", claim_token=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return db.session.scalars(
+        select(EmailOutbox).where(EmailOutbox.claim_token == token).order_by(EmailOutbox.outbox_id)
+    ).all()
+
+
+def _mark_failed_attempt(email, error, now):
+    max_attempts = current_app.config["OUTBOX_MAX_ATTEMPTS"]
+    email.attempts += 1
+    email.last_error = str(error)[:1000]
+    email.claim_token = None
+    if email.attempts >= max_attempts:
+        email.status = "failed"
+    else:
+        backoff = current_app.config["OUTBOX_RETRY_BASE_SECONDS"] * 2 ** (email.attempts - 1)
+        email.status = "pending"
+        email.next_attempt_at = now + timedelta(seconds=backoff)
+
+
+def send_batch(emails):
+    """
+    Send claimed emails over a single SMTP connection and record the outcome.
+
+    A rejected message is retried on its own; if the connection fails, every
+    email not yet sent is retried. Retries back off exponentially until
+    OUTBOX_MAX_ATTEMPTS, after which the email is marked failed.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    sent = 0
+    pending = list(emails)
+    try:
+        with mail.connect() as connection:
+            while pending:
+                email = pending[0]
+                try:
+                    connection.send(Message(
+                        subject=email.subject,
+                        recipients=[email.recipient],
+                        body=email.body,
+                        sender=current_app.config["MAIL_DEFAULT_SENDER"]
+                    ))
+                except Exception as e:
+                    if isinstance(e, OSError) and not isinstance(e, MESSAGE_ERRORS):
+                        raise
+                    _mark_failed_attempt(email, e, datetime.utcnow())
+                else:
+                    email.status = "sent"
+                    email.sent_at = datetime.utcnow()
+                    email.claim_token = None
+                    sent += 1
+                pending.pop(0)
+    except OSError as e:
+        # The connection failed, so nothing left in the batch was sent
+        now = datetime.utcnow()
+        for email in pending:
+            _mark_failed_attempt(email, e, now)
+    db.session.commit()
+    return sent
+
+
+def drain_outbox(batch_size=None):
+    """
+    Send due emails batch by batch until none are left.
+
+    Returns:
+        int: The number of emails sent.
+    """
+    sent = 0
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return sent
+        sent += send_batch(emails)
+
+
+class OutboxWorkerPool:
+    """
+    Threads that each claim a batch, send it over one SMTP connection and
+    poll again, until stopped.
+    """
+
+    def __init__(self, app, threads=4, poll_interval=2.0, batch_size=None):
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._workers = []
+
+    def start(self):
+        for index in range(self.threads):
+            worker = threading.Thread(target=self._run, name=f"outbox-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    emails = claim_batch(self.batch_size)
+                    if emails:
+                        send_batch(emails)
+                        continue
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Outbox worker failed to send a batch")
+                finally:
+                    db.session.remove()
+            self._stop.wait(self.poll_interval)
@@ -0,0 +1,104 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, update
+from app.extensions import bcrypt, db
+from app.models.passwordSetupToken import PasswordSetupToken
+from app.models.user import User
+
+PASSWORD_SETUP_TOKEN_BYTES = 32
+
+# Starts the password of an account that has none yet; never a bcrypt hash, so no password matches it
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+
+class PasswordSetupError(Exception):
+    """Raised when a set-password token can't be used; the message is safe to return to clients."""
+
+
+def unusable_password():
+    """A unique placeholder for users.password until the user sets one."""
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+
+
+def has_usable_password(user):
+    return not user.password.startswith(UNUSABLE_PASSWORD_PREFIX)
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_password_setup_tokens(user_ids):
+    """
+    Issue a one-time set-password token for each user. The caller commits.
+
+    Only a hash of each token is stored, so the tokens can be sent but not
+    read back. They expire after PASSWORD_SETUP_TOKEN_HOURS.
+
+    Args:
+        user_ids (list): IDs of the users.
+
+    Returns:
+        list: The tokens, in the order of user_ids.
+    """
+    tokens = [secrets.token_urlsafe(PASSWORD_SETUP_TOKEN_BYTES) for _ in user_ids]
+    if user_ids:
+        expires_at = datetime.utcnow() + timedelta(hours=current_app.config["PASSWORD_SETUP_TOKEN_HOURS"])
+        db.session.execute(insert(PasswordSetupToken), [
+            {"token_hash": _token_hash(token), "user_id": user_id, "expires_at": expires_at}
+            for user_id, token in zip(user_ids, tokens)
+        ])
+    return tokens
+
+
+def set_password_with_token(token, password):
+    """
+    Set the password of the user a set-password token was issued to, and use up the token.
+
+    Returns:
+        int: The ID of the user.
+
+    Raises:
+        PasswordSetupError: If the token is unknown, used or expired.
+    """
+    now = datetime.utcnow()
+    # Guarded update, so two concurrent requests can't both use the token
+    user_id = db.session.execute(
+        update(PasswordSetupToken)
+        .where(
+            PasswordSetupToken.token_hash == _token_hash(token),
+            PasswordSetupToken.used_at.is_(None),
+            PasswordSetupToken.expires_at > now
+        )
+        .values(used_at=now)
+        .returning(PasswordSetupToken.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if user_id is None:
+        db.session.rollback()
+        raise PasswordSetupError("Invalid or expired token")
+
+    db.session.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(password=bcrypt.generate_password_hash(password).decode("utf-8"))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return user_id
+
+
+def purge_expired_password_setup_tokens():
+    """
+    Delete set-password tokens that have expired.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    result = db.session.execute(
+        delete(PasswordSetupToken).where(PasswordSetupToken.expires_at < datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,149 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import delete, func, insert, or_, select
+from app.extensions import db
+from app.models.landlord import Landlord
+from app.models.landlordSummary import LandlordSummary
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.sharding import on_current_shard
+
+
+def is_active_tenancy(lease_end_date, today=None):
+    """A tenancy counts as active until its lease end date has passed."""
+    today = today or date.today()
+    return lease_end_date is None or lease_end_date >= today
+
+
+def _summary_for_update(landlord_id):
+    """Load the landlord's summary row with a row lock, creating it if missing."""
+    summary = db.session.get(LandlordSummary, landlord_id, with_for_update=True)
+    if summary is None:
+        summary = LandlordSummary(
+            landlord_id=landlord_id,
+            property_count=0,
+            status_counts={},
+            active_tenancy_count=0,
+            monthly_rent_due=Decimal("0")
+        )
+        db.session.add(summary)
+    return summary
+
+
+def record_property_created(landlord_id, status):
+    """
+    Count a new property in the landlord's summary.
+
+    Call inside the transaction that inserts the property, before committing.
+    """
+    summary = _summary_for_update(landlord_id)
+    counts = dict(summary.status_counts or {})
+    counts[status] = counts.get(status, 0) + 1
+    summary.status_counts = counts
+    summary.property_count = (summary.property_count or 0) + 1
+
+
+def record_tenancies_created(landlord_id, tenancies):
+    """
+    Add new tenancies to the landlord's active tenancy count and monthly rent.
+
+    Args:
+        landlord_id (int): Owner of the tenancies' properties.
+        tenancies (list): (rent_due, lease_end_date) pairs of the new tenancies.
+    """
+    today = date.today()
+    active = [rent_due for rent_due, lease_end_date in tenancies if is_active_tenancy(lease_end_date, today)]
+    if not active:
+        return
+    summary = _summary_for_update(landlord_id)
+    summary.active_tenancy_count = (summary.active_tenancy_count or 0) + len(active)
+    summary.monthly_rent_due = Decimal(summary.monthly_rent_due or 0) + sum(
+        Decimal(str(rent_due)) for rent_due in active
+    )
+
+
+def record_properties_deleted(landlord_id, statuses, tenancies):
+    """
+    Take deleted properties and their tenancies out of the landlord's summary.
+
+    Call inside the transaction that deletes the properties, before committing.
+
+    Args:
+        landlord_id (int): Owner of the properties.
+        statuses (list): The status of each deleted property.
+        tenancies (list): (rent_due, lease_end_date) pairs of the deleted properties' tenancies.
+    """
+    summary = _summary_for_update(landlord_id)
+    counts = dict(summary.status_counts or {})
+    for status in statuses:
+        counts[status] = counts.get(status, 0) - 1
+        if counts[status] <= 0:
+            del counts[status]
+    summary.status_counts = counts
+    summary.property_count = max((summary.property_count or 0) - len(statuses), 0)
+
+    today = date.today()
+    active = [rent_due for rent_due, lease_end_date in tenancies if is_active_tenancy(lease_end_date, today)]
+    summary.active_tenancy_count = max((summary.active_tenancy_count or 0) - len(active), 0)
+    summary.monthly_rent_due = max(
+        Decimal(summary.monthly_rent_due or 0) - sum(Decimal(str(rent_due)) for rent_due in active), Decimal("0")
+    )
+
+
+def rebuild_summaries(landlord_id=None):
+    """
+    Recompute portfolio summaries from the property and tenancy tables.
+
+    The incremental updates can't see leases ending as time passes, so this is
+    meant to run periodically (e.g. nightly) as well as after bulk imports.
+    Only landlords on the current shard are rebuilt.
+
+    Args:
+        landlord_id (int): Only rebuild this landlord's summary (default: all landlords).
+
+    Returns:
+        int: The number of summaries rebuilt.
+    """
+    landlord_ids = select(Landlord.landlord_id).where(on_current_shard(Landlord.landlord_id))
+    status_query = select(Property.landlord_id, Property.status, func.count()).group_by(
+        Property.landlord_id, Property.status
+    )
+    tenancy_query = (
+        select(Property.landlord_id, func.count(), func.sum(Tenancy.rent_due))
+        .join(Tenancy, Tenancy.property_id == Property.property_id)
+        .where(or_(Tenancy.lease_end_date.is_(None), Tenancy.lease_end_date >= date.today()))
+        .group_by(Property.landlord_id)
+    )
+    if landlord_id is not None:
+        landlord_ids = landlord_ids.where(Landlord.landlord_id == landlord_id)
+        status_query = status_query.where(Property.landlord_id == landlord_id)
+        tenancy_query = tenancy_query.where(Property.landlord_id == landlord_id)
+
+    rows = {
+        row_landlord_id: {
+            "landlord_id": row_landlord_id,
+            "property_count": 0,
+            "status_counts": {},
+            "active_tenancy_count": 0,
+            "monthly_rent_due": Decimal("0"),
+        }
+        for row_landlord_id in db.session.scalars(landlord_ids)
+    }
+    for row_landlord_id, status, count in db.session.execute(status_query):
+        if row_landlord_id in rows:
+            rows[row_landlord_id]["status_counts"][status] = count
+            rows[row_landlord_id]["property_count"] += count
+    for row_landlord_id, count, rent_total in db.session.execute(tenancy_query):
+        if row_landlord_id in rows:
+            rows[row_landlord_id]["active_tenancy_count"] = count
+            rows[row_landlord_id]["monthly_rent_due"] = Decimal(rent_total or 0)
+
+    # Replace the summaries in one transaction so readers never see a partial rebuild
+    delete_query = delete(LandlordSummary)
+    if landlord_id is not None:
+        delete_query = delete_query.where(LandlordSummary.landlord_id == landlord_id)
+    db.session.execute(delete_query)
+    if rows:
+        db.session.execute(insert(LandlordSummary), list(rows.values()))
+    db.session.commit()
+    return len(rows)
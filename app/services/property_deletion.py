@@ -0,0 +1,68 @@
+from sqlalchemy import delete, select
+from app.extensions import db
+from app.models.groupChat import GroupChat
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.services.change_feed import record_changes
+from app.services.portfolio_summary import record_properties_deleted
+
+
+def delete_properties(landlord_id, property_ids):
+    """
+    Delete properties of a landlord together with their tenancies and chat history.
+
+    The property delete cascades in the database to tenancies, their tenants,
+    ledgers, balances and lease notifications, and the group chat delete
+    cascades to messages and archived messages. No child row is loaded, so
+    the number of statements doesn't grow with a property's history. The
+    summary and change log are updated in the same transaction.
+
+    Call inside a transaction and commit afterwards.
+
+    Args:
+        landlord_id (int): Owner of the properties.
+        property_ids (list): IDs of the properties to delete.
+
+    Returns:
+        tuple: (deleted property IDs, IDs of tenants who lost a tenancy). Both are
+        empty, and nothing is deleted, if any of the properties isn't the landlord's.
+    """
+    properties = db.session.execute(
+        select(Property.property_id, Property.status).where(
+            Property.landlord_id == landlord_id, Property.property_id.in_(property_ids)
+        )
+    ).all()
+    if not properties or len(properties) != len(set(property_ids)):
+        return [], []
+    deleted_ids = sorted(property_id for property_id, _ in properties)
+
+    tenancies = db.session.execute(
+        select(Tenancy.tenancy_id, Tenancy.group_chat_id, Tenancy.rent_due, Tenancy.lease_end_date)
+        .where(Tenancy.property_id.in_(deleted_ids))
+    ).all()
+    tenancy_ids = [tenancy.tenancy_id for tenancy in tenancies]
+    tenancy_tenants = db.session.execute(
+        select(TenancyTenants.tenancy_id, TenancyTenants.tenant_id).where(TenancyTenants.tenancy_id.in_(tenancy_ids))
+    ).all() if tenancy_ids else []
+
+    record_properties_deleted(
+        landlord_id, [status for _, status in properties],
+        [(tenancy.rent_due, tenancy.lease_end_date) for tenancy in tenancies]
+    )
+    # The database cascades aren't seen by the ORM events, so the deletes are logged here
+    record_changes(landlord_id, "tenancy_tenant", "delete", [tuple(row) for row in tenancy_tenants])
+    record_changes(landlord_id, "tenancy", "delete", tenancy_ids)
+    record_changes(landlord_id, "property", "delete", deleted_ids)
+
+    db.session.execute(
+        delete(Property).where(Property.property_id.in_(deleted_ids)),
+        execution_options={"synchronize_session": False}
+    )
+    # Tenancies reference their chat, so the chats go once the tenancies are gone
+    if tenancies:
+        db.session.execute(
+            delete(GroupChat).where(GroupChat.group_chat_id.in_([tenancy.group_chat_id for tenancy in tenancies])),
+            execution_options={"synchronize_session": False}
+        )
+    return deleted_ids, sorted({tenant_id for _, tenant_id in tenancy_tenants})
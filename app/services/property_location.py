@@ -0,0 +1,176 @@
+import math
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import selectinload
+from app.extensions import db
+from app.models.property import Property
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEGREE_LATITUDE = 111_320
+
+# A search covers at most this many geohash cells per axis
+MAX_CELLS_PER_AXIS = 3
+
+
+def validate_coordinates(latitude, longitude):
+    """
+    Check a latitude/longitude pair.
+
+    Returns:
+        tuple: (latitude, longitude) as floats.
+
+    Raises:
+        ValueError: If either value isn't a number or is out of range.
+    """
+    if isinstance(latitude, bool) or isinstance(longitude, bool):
+        raise ValueError("Coordinates must be numbers")
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError("Coordinates must be numbers")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordinates out of range")
+    return latitude, longitude
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a point as a geohash; points in the same cell share its prefix."""
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    characters, bits, value, even = [], 0, 0, True
+    while len(characters) < precision:
+        interval, coordinate = (longitude_range, longitude) if even else (latitude_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            characters.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(characters)
+
+
+def cell_size(precision):
+    """The (height, width) in degrees of a geohash cell of the given precision."""
+    longitude_bits = (5 * precision + 1) // 2
+    latitude_bits = 5 * precision // 2
+    return 180 / 2 ** latitude_bits, 360 / 2 ** longitude_bits
+
+
+def distance_m(latitude1, longitude1, latitude2, longitude2):
+    """Great-circle (haversine) distance between two points in meters."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_m):
+    """
+    The box around a circle, clamped to valid coordinates.
+
+    Returns:
+        tuple: (min_latitude, min_longitude, max_latitude, max_longitude).
+    """
+    d_latitude = radius_m / METERS_PER_DEGREE_LATITUDE
+    d_longitude = radius_m / (METERS_PER_DEGREE_LATITUDE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - d_latitude, -90.0), max(longitude - d_longitude, -180.0),
+        min(latitude + d_latitude, 90.0), min(longitude + d_longitude, 180.0),
+    )
+
+
+def covering_cells(min_latitude, min_longitude, max_latitude, max_longitude):
+    """
+    The geohash prefixes of the cells covering a box, at the finest precision
+    where the box spans at most MAX_CELLS_PER_AXIS cells per axis.
+    """
+    precision = GEOHASH_PRECISION
+    while precision > 1:
+        height, width = cell_size(precision)
+        rows = math.floor(max_latitude / height) - math.floor(min_latitude / height) + 1
+        columns = math.floor(max_longitude / width) - math.floor(min_longitude / width) + 1
+        if rows <= MAX_CELLS_PER_AXIS and columns <= MAX_CELLS_PER_AXIS:
+            break
+        precision -= 1
+
+    height, width = cell_size(precision)
+    cells = set()
+    for row in range(math.floor(min_latitude / height), math.floor(max_latitude / height) + 1):
+        for column in range(math.floor(min_longitude / width), math.floor(max_longitude / width) + 1):
+            # Encode the middle of each cell, clamped to the valid range
+            cell_latitude = min(max((row + 0.5) * height, -90.0), 90.0)
+            cell_longitude = min(max((column + 0.5) * width, -180.0), 180.0)
+            cells.add(encode_geohash(cell_latitude, cell_longitude, precision))
+    return sorted(cells)
+
+
+def set_property_location(property, latitude, longitude):
+    """
+    Set or clear the coordinates of a property and the geohash indexed for radius search.
+
+    Raises:
+        ValueError: If only one coordinate is given, or they aren't valid coordinates.
+    """
+    if latitude is None and longitude is None:
+        property.latitude = property.longitude = property.geohash = None
+        return
+    if latitude is None or longitude is None:
+        raise ValueError("Latitude and longitude must be given together")
+    property.latitude, property.longitude = validate_coordinates(latitude, longitude)
+    property.geohash = encode_geohash(property.latitude, property.longitude)
+
+
+def find_properties_near(landlord_id, latitude, longitude, radius_m, limit):
+    """
+    Get a landlord's properties within a radius of a point, nearest first.
+
+    The geohash cells covering the search box become range scans on the
+    (landlord_id, geohash) index, which narrows the candidates to a few cells
+    around the point; the box and the exact distance then filter them.
+
+    Args:
+        landlord_id (int): The landlord whose properties are searched.
+        latitude (float): Latitude of the center.
+        longitude (float): Longitude of the center.
+        radius_m (float): Search radius in meters.
+        limit (int): Maximum number of properties returned.
+
+    Returns:
+        list: (Property, distance in meters) tuples, nearest first.
+    """
+    min_latitude, min_longitude, max_latitude, max_longitude = bounding_box(latitude, longitude, radius_m)
+    # "~" sorts after every geohash character, so [cell, cell + "~") holds the cell's points.
+    # The landlord is repeated in each branch so every branch is a seek on the index.
+    cell_ranges = [
+        and_(Property.landlord_id == landlord_id, Property.geohash >= cell, Property.geohash < cell + "~")
+        for cell in covering_cells(min_latitude, min_longitude, max_latitude, max_longitude)
+    ]
+    candidates = db.session.execute(
+        select(Property.property_id, Property.latitude, Property.longitude).where(
+            or_(*cell_ranges),
+            Property.latitude.between(min_latitude, max_latitude),
+            Property.longitude.between(min_longitude, max_longitude),
+        )
+    ).all()
+
+    distances = {}
+    for property_id, property_latitude, property_longitude in candidates:
+        distance = distance_m(latitude, longitude, property_latitude, property_longitude)
+        if distance <= radius_m:
+            distances[property_id] = distance
+    nearest = sorted(distances, key=lambda property_id: (distances[property_id], property_id))[:limit]
+
+    # Only the properties returned are loaded in full, with their tenancies
+    properties = db.session.scalars(
+        select(Property).options(selectinload(Property.tenancies)).where(Property.property_id.in_(nearest))
+    ).all()
+    position = {property_id: index for index, property_id in enumerate(nearest)}
+    properties.sort(key=lambda property: position[property.property_id])
+    return [(property, distances[property.property_id]) for property in properties]
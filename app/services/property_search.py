@@ -0,0 +1,41 @@
+from sqlalchemy import column, func, literal_column, table
+from app.extensions import db
+from app.models.property import Property
+
+# Trigram indexes can only match terms of at least this many characters
+MIN_INDEXED_TERM_LENGTH = 3
+
+property_fts = table("property_fts", column("rowid"), column("rank"))
+
+
+def search_properties(query, term):
+    """
+    Restrict a property query to addresses containing the search term, best matches first.
+
+    On Postgres the match uses the pg_trgm GIN index and is ranked by trigram
+    similarity; on SQLite it uses the property_fts FTS5 table ranked by bm25.
+    Terms too short for a trigram index fall back to a case-insensitive LIKE.
+
+    Args:
+        query (Query): A query over Property, e.g. already filtered by landlord.
+        term (str): Part of the address typed by the user.
+
+    Returns:
+        Query: The filtered and ranked query, ready for pagination.
+    """
+    term = term.strip()
+    dialect = db.session.get_bind(mapper=Property).dialect.name
+
+    if dialect == "sqlite" and len(term) >= MIN_INDEXED_TERM_LENGTH:
+        # Quote the term as an FTS5 phrase so it is matched as a substring
+        phrase = '"{}"'.format(term.replace('"', '""'))
+        return (
+            query.join(property_fts, property_fts.c.rowid == Property.property_id)
+            .filter(literal_column("property_fts").op("MATCH")(phrase))
+            .order_by(property_fts.c.rank, Property.property_id)
+        )
+
+    query = query.filter(Property.address.icontains(term, autoescape=True))
+    if dialect == "postgresql":
+        return query.order_by(func.similarity(Property.address, term).desc(), Property.property_id)
+    return query.order_by(Property.property_id)
@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import delete, update
+from app.extensions import db
+from app.models.refreshToken import RefreshToken
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token can't be exchanged; the message is safe to return to clients."""
+
+
+def _issue_refresh_token(user_id, family_id, session_started_at, now):
+    session_ends_at = session_started_at + timedelta(days=current_app.config["JWT_SESSION_MAX_DAYS"])
+    expires_at = min(now + current_app.config["JWT_REFRESH_TOKEN_EXPIRES"], session_ends_at)
+    if expires_at <= now:
+        raise RefreshTokenError("Session expired")
+
+    jti = str(uuid.uuid4())
+    db.session.add(RefreshToken(
+        jti=jti,
+        family_id=family_id,
+        user_id=user_id,
+        session_started_at=session_started_at,
+        issued_at=now,
+        expires_at=expires_at
+    ))
+    return create_refresh_token(
+        identity=str(user_id),
+        additional_claims={"jti": jti, "sid": family_id},
+        expires_delta=expires_at - now
+    )
+
+
+def start_session(user_id):
+    """
+    Issue the tokens for a new login. The caller commits.
+
+    Returns:
+        dict: A fresh access token and the first refresh token of a new family.
+    """
+    now = datetime.utcnow()
+    family_id = str(uuid.uuid4())
+    return {
+        "token": create_access_token(identity=str(user_id), fresh=True, additional_claims={"sid": family_id}),
+        "refresh_token": _issue_refresh_token(user_id, family_id, now, now)
+    }
+
+
+def rotate_refresh_token(jwt_payload):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    Each refresh token can be exchanged once. Presenting one that was already
+    exchanged means it leaked, so its whole family is revoked. The new refresh
+    token slides the session forward by JWT_REFRESH_TOKEN_EXPIRES, but never
+    past JWT_SESSION_MAX_DAYS after the login.
+
+    Args:
+        jwt_payload (dict): The decoded refresh token, as returned by get_jwt().
+
+    Returns:
+        dict: The new access and refresh tokens.
+
+    Raises:
+        RefreshTokenError: If the token is unknown, revoked, reused or its session is over.
+    """
+    now = datetime.utcnow()
+    jti = jwt_payload["jti"]
+    # Guarded update, so two concurrent exchanges can't both succeed
+    claimed = db.session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.rotated_at.is_(None), RefreshToken.revoked_at.is_(None))
+        .values(rotated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    token = db.session.get(RefreshToken, jti, populate_existing=True)
+    if token is None or str(token.user_id) != jwt_payload["sub"]:
+        db.session.rollback()
+        raise RefreshTokenError("Invalid refresh token")
+    if not claimed:
+        if token.revoked_at is None:
+            revoke_family(token.family_id)
+            db.session.commit()
+            raise RefreshTokenError("Refresh token reuse detected")
+        db.session.rollback()
+        raise RefreshTokenError("Refresh token revoked")
+
+    try:
+        tokens = {
+            "token": create_access_token(identity=jwt_payload["sub"], fresh=False,
+                                         additional_claims={"sid": token.family_id}),
+            "refresh_token": _issue_refresh_token(token.user_id, token.family_id, token.session_started_at, now)
+        }
+    except RefreshTokenError:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return tokens
+
+
+def revoke_family(family_id):
+    """Revoke every refresh token of a login session. The caller commits."""
+    db.session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def purge_expired_refresh_tokens():
+    """
+    Delete refresh tokens that have expired.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    result = db.session.execute(delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow()))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,145 @@
+from itertools import chain
+import numpy as np
+from sqlalchemy import Float, cast, extract, func, select
+from app.extensions import db
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+
+# Month index used for leases without an end date, far beyond any projection window
+OPEN_ENDED_MONTH = 10 ** 6
+
+
+def month_index(year, month):
+    """Number of months since year 0, so consecutive months differ by one."""
+    return year * 12 + month - 1
+
+
+def month_label(index):
+    """Format a month index as YYYY-MM."""
+    year, month = divmod(int(index), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def _month_index_expr(column):
+    return extract("year", column) * 12 + extract("month", column) - 1
+
+
+def load_tenancy_arrays(landlord_id):
+    """
+    Load the columns needed for a projection of the landlord's tenancies in one query.
+
+    Month indexes are computed by the database so the rows convert straight
+    into NumPy arrays without per-row date handling in Python.
+
+    Returns:
+        tuple: (property_ids, rent_due, start_months, end_months) arrays.
+    """
+    # Run through the session's connection so rows skip ORM result processing
+    rows = db.session.connection(bind_arguments={"mapper": Tenancy}).execute(
+        select(
+            Tenancy.property_id,
+            cast(Tenancy.rent_due, Float),
+            _month_index_expr(Tenancy.lease_start_date),
+            func.coalesce(_month_index_expr(Tenancy.lease_end_date), OPEN_ENDED_MONTH),
+        )
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(Property.landlord_id == landlord_id)
+    ).fetchall()
+
+    columns = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=4 * len(rows)).reshape(-1, 4)
+    return (
+        columns[:, 0].astype(np.int64),
+        columns[:, 1],
+        columns[:, 2].astype(np.int64),
+        columns[:, 3].astype(np.int64),
+    )
+
+
+def project_rent_roll(property_ids, rent_due, start_months, end_months, first_month, months):
+    """
+    Project monthly rent income, occupancy and lease expiries without looping over tenancies.
+
+    A tenancy counts for every month its lease overlaps, including the months it
+    starts and ends in. Each tenancy contributes +1/-1 markers at the edges of its
+    clipped interval, and a cumulative sum over the markers gives the value for
+    every month, so the cost is O(tenancies + months).
+
+    Args:
+        property_ids (ndarray): Property of each tenancy.
+        rent_due (ndarray): Monthly rent of each tenancy.
+        start_months (ndarray): Month index of each lease start.
+        end_months (ndarray): Month index of each lease end (OPEN_ENDED_MONTH if open-ended).
+        first_month (int): Month index of the first projected month.
+        months (int): Number of months to project.
+
+    Returns:
+        dict: Arrays of length `months` for rent_roll, active_tenancies,
+        occupied_properties, expiring_leases and expiring_rent.
+    """
+    start = np.clip(start_months - first_month, 0, months)
+    stop = np.clip(end_months - first_month + 1, 0, months)  # Exclusive
+    in_window = start < stop
+    start, stop = start[in_window], stop[in_window]
+    rent = rent_due[in_window]
+
+    def accumulate(weights=None):
+        added = np.bincount(start, weights=weights, minlength=months + 1)
+        removed = np.bincount(stop, weights=weights, minlength=months + 1)
+        return np.cumsum(added - removed)[:months]
+
+    rent_roll = accumulate(rent)
+    active_tenancies = accumulate().astype(np.int64)
+
+    # Count each property once per month, however many tenancies overlap in it
+    _, property_index = np.unique(property_ids[in_window], return_inverse=True)
+    markers = np.zeros((property_index.max() + 1 if property_index.size else 0, months + 1), dtype=np.int32)
+    np.add.at(markers, (property_index, start), 1)
+    np.add.at(markers, (property_index, stop), -1)
+    occupied_properties = (np.cumsum(markers, axis=1)[:, :months] > 0).sum(axis=0)
+
+    expiring = (end_months >= first_month) & (end_months < first_month + months)
+    expiry_offsets = end_months[expiring] - first_month
+    expiring_leases = np.bincount(expiry_offsets, minlength=months)
+    expiring_rent = np.bincount(expiry_offsets, weights=rent_due[expiring], minlength=months)
+
+    return {
+        "rent_roll": rent_roll,
+        "active_tenancies": active_tenancies,
+        "occupied_properties": occupied_properties,
+        "expiring_leases": expiring_leases,
+        "expiring_rent": expiring_rent,
+    }
+
+
+def project_landlord_rent_roll(landlord_id, first_month, months):
+    """
+    Project the landlord's portfolio month by month.
+
+    Args:
+        landlord_id (int): The landlord whose tenancies are projected.
+        first_month (int): Month index of the first projected month.
+        months (int): Number of months to project.
+
+    Returns:
+        list: One dictionary per month, ready for a JSON response.
+    """
+    property_count = db.session.scalar(
+        select(func.count()).select_from(Property).where(Property.landlord_id == landlord_id)
+    )
+    projection = project_rent_roll(*load_tenancy_arrays(landlord_id), first_month, months)
+
+    return [
+        {
+            "month": month_label(first_month + offset),
+            "rent_roll": round(float(projection["rent_roll"][offset]), 2),
+            "active_tenancies": int(projection["active_tenancies"][offset]),
+            "occupied_properties": int(projection["occupied_properties"][offset]),
+            "occupancy_rate": (
+                round(int(projection["occupied_properties"][offset]) / property_count, 4)
+                if property_count else 0.0
+            ),
+            "expiring_leases": int(projection["expiring_leases"][offset]),
+            "expiring_rent": round(float(projection["expiring_rent"][offset]), 2),
+        }
+        for offset in range(months)
+    ]
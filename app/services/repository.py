@@ -0,0 +1,214 @@
+from sqlalchemy import and_, func, lambda_stmt, select
+from sqlalchemy.orm import contains_eager
+from app.db_routing import current_shard
+from app.extensions import db
+from app.models.groupChat import GroupChat
+from app.models.landlordSummary import LandlordSummary
+from app.models.leaseExpiryNotification import LeaseExpiryNotification
+from app.models.ledgerEntry import LedgerEntry
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.models.user import User
+from app.services.property_search import search_properties
+
+# Data access shared by the routes. Hot lookups are built with lambda_stmt, so the
+# compiled statement is cached on the lambda's code and each call only binds new values.
+
+
+def get_user(user_id):
+    """Get a user by ID, from the session's identity map when already loaded."""
+    return db.session.get(User, user_id)
+
+
+def find_user_by_email(email):
+    """Get the user registered with an email address (already normalized to lowercase)."""
+    return db.session.scalars(lambda_stmt(lambda: select(User).where(User.email == email))).first()
+
+
+def find_registered_emails(emails):
+    """
+    Get which of many email addresses (already normalized to lowercase) are registered,
+    in one query on the case-insensitive email index.
+
+    Returns:
+        set: The registered addresses.
+    """
+    return set(db.session.scalars(select(func.lower(User.email)).where(func.lower(User.email).in_(emails))))
+
+
+def get_landlord_with_property(user_id, property_id):
+    """
+    Load a user and one of their properties in a single query (two on a shard).
+
+    The property is only returned if the user is a landlord who owns it, so
+    callers check the role on the user and ownership by the property being set.
+
+    Returns:
+        tuple: (user, property), where user is None if the user doesn't exist
+            and property is None unless the user is a landlord who owns it.
+    """
+    if current_shard():
+        # Users live on the default database, so the property is read from the shard separately
+        user = get_user(user_id)
+        if user is None or user.role != "Landlord":
+            return user, None
+        property = db.session.get(Property, property_id)
+        return user, property if property is not None and property.landlord_id == user_id else None
+
+    row = db.session.execute(lambda_stmt(
+        lambda: select(User, Property)
+        .outerjoin(Property, and_(
+            Property.property_id == property_id,
+            Property.landlord_id == User.user_id,
+            User.role == "Landlord"
+        ))
+        .where(User.user_id == user_id)
+    )).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def get_user_and_property(user_id, property_id):
+    """
+    Load a user and a property, regardless of who owns it, in a single query (two on a shard).
+
+    Returns:
+        tuple: (user, property), where either is None if it doesn't exist.
+    """
+    if current_shard():
+        return get_user(user_id), db.session.get(Property, property_id)
+
+    row = db.session.execute(lambda_stmt(
+        lambda: select(User, Property)
+        .outerjoin(Property, Property.property_id == property_id)
+        .where(User.user_id == user_id)
+    )).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def find_owned_property_addresses(landlord_id, property_ids):
+    """
+    Get which of many properties the landlord owns, in one query.
+
+    Returns:
+        dict: property_id -> address of the owned properties.
+    """
+    return dict(db.session.execute(
+        select(Property.property_id, Property.address).where(
+            Property.landlord_id == landlord_id, Property.property_id.in_(property_ids)
+        )
+    ).all())
+
+
+def find_owned_tenancy_ids(landlord_id, tenancy_ids):
+    """
+    Get which of many tenancies are on the landlord's properties, in one query.
+
+    Returns:
+        set: The owned tenancy IDs.
+    """
+    return set(db.session.scalars(
+        select(Tenancy.tenancy_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(Property.landlord_id == landlord_id, Tenancy.tenancy_id.in_(tenancy_ids))
+    ))
+
+
+def get_tenancy_landlord(tenancy_id):
+    """The landlord ID of a tenancy's property, or None if the tenancy doesn't exist."""
+    return db.session.scalar(lambda_stmt(
+        lambda: select(Property.landlord_id)
+        .join(Tenancy, Tenancy.property_id == Property.property_id)
+        .where(Tenancy.tenancy_id == tenancy_id)
+    ))
+
+
+def is_tenancy_tenant(user_id, tenancy_id):
+    """Whether the user is one of the tenancy's tenants."""
+    return db.session.get(TenancyTenants, (tenancy_id, user_id)) is not None
+
+
+def get_ledger_entry(entry_id):
+    """Get a ledger entry by ID."""
+    return db.session.get(LedgerEntry, entry_id)
+
+
+def get_landlord_summary(landlord_id):
+    """
+    Get the dashboard summary of a landlord's portfolio, by primary key.
+
+    Returns:
+        LandlordSummary: The stored summary, or an empty one if nothing was recorded yet.
+    """
+    return db.session.get(LandlordSummary, landlord_id) or LandlordSummary(landlord_id=landlord_id)
+
+
+def list_tenant_tenancies(tenant_id):
+    """
+    Get the tenancies a tenant belongs to, with their property address and group chat name.
+
+    Returns:
+        list: (Tenancy, address, group chat name) rows, most recent lease first.
+    """
+    return db.session.execute(lambda_stmt(
+        lambda: select(Tenancy, Property.address, GroupChat.group_name)
+        .join(TenancyTenants, TenancyTenants.tenancy_id == Tenancy.tenancy_id)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .join(GroupChat, GroupChat.group_chat_id == Tenancy.group_chat_id)
+        .where(TenancyTenants.tenant_id == tenant_id)
+        .order_by(Tenancy.lease_start_date.desc(), Tenancy.tenancy_id)
+    )).all()
+
+
+def list_property_tenancies(property_id):
+    """
+    Get the tenancies of a property with the name of their group chat.
+
+    Returns:
+        list: (Tenancy, group chat name) rows, in creation order.
+    """
+    return db.session.execute(lambda_stmt(
+        lambda: select(Tenancy, GroupChat.group_name)
+        .join(GroupChat, GroupChat.group_chat_id == Tenancy.group_chat_id)
+        .where(Tenancy.property_id == property_id)
+        .order_by(Tenancy.tenancy_id)
+    )).all()
+
+
+def paginate_landlord_properties(landlord_id, page, per_page, status=None, search_term=None):
+    """
+    Get a page of a landlord's properties, optionally filtered by status and address search.
+
+    Returns:
+        Pagination: The page of properties with the total count.
+    """
+    query = Property.query.filter_by(landlord_id=landlord_id)
+    if status:
+        query = query.filter(Property.status == status)
+    if search_term and search_term.strip():
+        query = search_properties(query, search_term)
+    return query.paginate(page=page, per_page=per_page, error_out=False)
+
+
+def paginate_expiring_leases(landlord_id, today, page, per_page):
+    """
+    Get a page of the lease-expiry notifications of a landlord's tenancies still ending from today.
+
+    Notifications of leases extended since are left out, as they no longer end on that date.
+
+    Returns:
+        Pagination: The notifications, soonest first, with their tenancy loaded.
+    """
+    query = (
+        select(LeaseExpiryNotification)
+        .join(LeaseExpiryNotification.tenancy)
+        .join(Property, Property.property_id == Tenancy.property_id)
+        .where(
+            Property.landlord_id == landlord_id,
+            LeaseExpiryNotification.lease_end_date >= today,
+            LeaseExpiryNotification.lease_end_date == Tenancy.lease_end_date
+        )
+        .order_by(LeaseExpiryNotification.lease_end_date, LeaseExpiryNotification.tenancy_id)
+        .options(contains_eager(LeaseExpiryNotification.tenancy))
+    )
+    return db.paginate(query, page=page, per_page=per_page, error_out=False, count=True)
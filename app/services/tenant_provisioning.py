@@ -0,0 +1,148 @@
+from sqlalchemy import delete, insert, select, update
+from app.db_routing import current_shard
+from app.extensions import db
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.models.tenant import Tenant
+from app.models.tenantShard import TenantShard
+from app.models.user import User
+from app.services.change_feed import record_changes
+from app.services.password_setup import issue_password_setup_tokens, unusable_password
+from app.sharding import assign_tenant_shard, use_shard
+
+
+def create_tenant_accounts(tenants):
+    """
+    Create tenant accounts, on the default database.
+
+    Each account gets an unusable password until the tenant sets their own.
+    The users and tenants are each written with one multi-row INSERT. The
+    case-insensitive unique index on users.email rejects addresses registered
+    concurrently, as an IntegrityError.
+
+    On a shard other than 0 the accounts are marked pending: commit them, then
+    add them to their tenancies with link_tenants and commit that on the
+    shard, then call activate_tenant_accounts. Check beforehand that the
+    addresses aren't registered.
+
+    Args:
+        tenants (list): Dicts with first_name, last_name, email (lowercase) and tenancy_id.
+
+    Returns:
+        list: Dicts with the new user_id, email and tenancy_id of each tenant.
+    """
+    user_ids = db.session.scalars(
+        insert(User).returning(User.user_id, sort_by_parameter_order=True),
+        [
+            {
+                "first_name": tenant["first_name"],
+                "last_name": tenant["last_name"],
+                "email": tenant["email"],
+                "password": unusable_password(),
+                "role": "Tenant",
+            }
+            for tenant in tenants
+        ]
+    ).all()
+    db.session.execute(insert(Tenant), [{"tenant_id": user_id} for user_id in user_ids])
+    # The tenants are served from the landlord's shard, where their tenancies are
+    assign_tenant_shard(user_ids, current_shard(), pending=True)
+
+    return [
+        {"user_id": user_id, "email": tenant["email"], "tenancy_id": tenant["tenancy_id"]}
+        for tenant, user_id in zip(tenants, user_ids)
+    ]
+
+
+def link_tenants(landlord_id, accounts):
+    """
+    Add new tenant accounts to their tenancies, on the landlord's shard, with
+    one multi-row INSERT. Check beforehand that the tenancies are the
+    landlord's. The caller commits.
+
+    Args:
+        landlord_id (int): Owner of the tenancies.
+        accounts (list): Accounts returned by create_tenant_accounts.
+    """
+    links = [(account["tenancy_id"], account["user_id"]) for account in accounts]
+    db.session.execute(
+        insert(TenancyTenants), [{"tenancy_id": tenancy_id, "tenant_id": tenant_id} for tenancy_id, tenant_id in links]
+    )
+    record_changes(landlord_id, "tenancy_tenant", "insert", links)
+
+
+def activate_tenant_accounts(accounts):
+    """
+    Clear the pending mark of linked tenant accounts and issue their
+    set-password tokens. Queue the emails in the same transaction; the caller
+    commits.
+
+    Returns:
+        list: The set-password tokens, in the order of accounts.
+    """
+    user_ids = [account["user_id"] for account in accounts]
+    db.session.execute(
+        update(TenantShard).where(TenantShard.tenant_id.in_(user_ids)).values(pending=False),
+        execution_options={"synchronize_session": False}
+    )
+    return issue_password_setup_tokens(user_ids)
+
+
+def delete_tenant_accounts(user_ids):
+    """
+    Delete pending tenant accounts whose tenancy links failed to commit. The
+    caller commits.
+    """
+    # Tenants and their shard links cascade in the database
+    db.session.execute(
+        delete(User).where(User.user_id.in_(user_ids)), execution_options={"synchronize_session": False}
+    )
+    db.session.info.setdefault("shard_invalidations", set()).update(user_ids)
+
+
+def purge_pending_tenant_accounts(older_than):
+    """
+    Delete tenant accounts left pending by a provisioning request that died
+    between its commits, with any tenancy links it committed on the shard.
+
+    No email was sent for them, and until they are deleted their addresses
+    can't be provisioned again.
+
+    Args:
+        older_than (datetime): Only accounts marked pending before this (UTC) are deleted.
+
+    Returns:
+        int: The number of accounts deleted.
+    """
+    pending = db.session.execute(
+        select(TenantShard.tenant_id, TenantShard.shard)
+        .where(TenantShard.pending.is_(True), TenantShard.assigned_at < older_than)
+    ).all()
+    by_shard = {}
+    for tenant_id, shard in pending:
+        by_shard.setdefault(shard, []).append(tenant_id)
+
+    for shard, tenant_ids in by_shard.items():
+        with use_shard(shard):
+            links = db.session.execute(
+                select(TenancyTenants.tenancy_id, TenancyTenants.tenant_id, Property.landlord_id)
+                .join(Tenancy, Tenancy.tenancy_id == TenancyTenants.tenancy_id)
+                .join(Property, Property.property_id == Tenancy.property_id)
+                .where(TenancyTenants.tenant_id.in_(tenant_ids))
+            ).all()
+            if links:
+                by_landlord = {}
+                for tenancy_id, tenant_id, landlord_id in links:
+                    by_landlord.setdefault(landlord_id, []).append((tenancy_id, tenant_id))
+                for landlord_id, keys in by_landlord.items():
+                    record_changes(landlord_id, "tenancy_tenant", "delete", keys)
+                db.session.execute(
+                    delete(TenancyTenants).where(TenancyTenants.tenant_id.in_(tenant_ids)),
+                    execution_options={"synchronize_session": False}
+                )
+                db.session.commit()
+            # The shard's links go first, so a failure here leaves the account to retry
+            delete_tenant_accounts(tenant_ids)
+            db.session.commit()
+    return len(pending)
@@ -0,0 +1,160 @@
+import calendar
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import and_, delete, or_, select
+from app.extensions import db
+from app.models.revokedToken import RevokedToken
+
+
+def _epoch(value):
+    """Seconds since the epoch for a naive UTC datetime."""
+    return calendar.timegm(value.utctimetuple())
+
+
+# Ids can commit out of order, so each refresh also re-reads this many ids below the watermark
+REFRESH_ID_WINDOW = 100
+
+
+class TokenDenylist:
+    """
+    Per-process copy of the revoked_token table, checked on every authenticated request.
+
+    Revocations are stored durably, and each process pulls only the rows added
+    since its last refresh (by increasing revocation_id, with a small window
+    below the last one seen) at most every
+    JWT_DENYLIST_REFRESH_SECONDS. The per-request check is a couple of dict
+    lookups; revocations made by this process apply immediately, those made
+    elsewhere within one refresh interval.
+    """
+
+    def __init__(self):
+        self._jtis = {}            # jti -> expiry (epoch seconds, None if unknown)
+        self._user_cutoffs = {}    # identity -> tokens issued at or before this are revoked
+        self._last_revocation_id = 0
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jwt_payload):
+        refreshed_at = self._refreshed_at
+        if refreshed_at is None or time.monotonic() - refreshed_at >= current_app.config["JWT_DENYLIST_REFRESH_SECONDS"]:
+            self.refresh()
+
+        if jwt_payload.get("jti") in self._jtis:
+            return True
+        cutoff = self._user_cutoffs.get(str(jwt_payload.get("sub")))
+        return cutoff is not None and jwt_payload.get("iat", 0) <= cutoff
+
+    def refresh(self):
+        """Load revocations added since the last refresh; skipped if another thread is already at it."""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            rows = db.session.execute(
+                select(RevokedToken.revocation_id, RevokedToken.jti, RevokedToken.user_id,
+                       RevokedToken.revoked_at, RevokedToken.expires_at)
+                # A primary key range scan; re-applying a revocation is harmless
+                .where(RevokedToken.revocation_id > self._last_revocation_id - REFRESH_ID_WINDOW)
+                .order_by(RevokedToken.revocation_id)
+            ).all()
+            for revocation_id, jti, user_id, revoked_at, expires_at in rows:
+                self._apply(jti, user_id, revoked_at, expires_at)
+                self._last_revocation_id = max(self._last_revocation_id, revocation_id)
+            self._prune()
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def add(self, revocation):
+        """Apply a revocation committed by this process without waiting for a refresh."""
+        # Under the lock, so a refresh never prunes the dict while it grows
+        with self._lock:
+            self._apply(revocation.jti, revocation.user_id, revocation.revoked_at, revocation.expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+            self._user_cutoffs.clear()
+            self._last_revocation_id = 0
+            self._refreshed_at = None
+
+    def _apply(self, jti, user_id, revoked_at, expires_at):
+        if jti is not None:
+            self._jtis[jti] = _epoch(expires_at) if expires_at else None
+        else:
+            identity = str(user_id)
+            self._user_cutoffs[identity] = max(self._user_cutoffs.get(identity, 0), _epoch(revoked_at))
+
+    def _prune(self):
+        # Expired tokens are rejected by signature validation anyway
+        now = time.time()
+        expired = [jti for jti, expires in self._jtis.items() if expires is not None and expires < now]
+        for jti in expired:
+            del self._jtis[jti]
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """token_in_blocklist_loader callback for JWTManager."""
+    return current_app.extensions["token_denylist"].is_revoked(jwt_payload)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def revoke_token(jwt_payload):
+    """
+    Revoke a single token, e.g. on logout.
+
+    Args:
+        jwt_payload (dict): The decoded token, as returned by get_jwt().
+    """
+    revocation = RevokedToken(
+        jti=jwt_payload["jti"],
+        user_id=int(jwt_payload["sub"]),
+        revoked_at=_utcnow(),
+        expires_at=datetime.fromtimestamp(jwt_payload["exp"], timezone.utc).replace(tzinfo=None)
+        if jwt_payload.get("exp") else None
+    )
+    db.session.add(revocation)
+    db.session.commit()
+    current_app.extensions["token_denylist"].add(revocation)
+
+
+def _token_lifetime():
+    """The longest any access or refresh token can live."""
+    return max(current_app.config["JWT_ACCESS_TOKEN_EXPIRES"], current_app.config["JWT_REFRESH_TOKEN_EXPIRES"])
+
+
+def revoke_user_tokens(user_id):
+    """Revoke every token issued to the user so far, e.g. when disabling the account."""
+    now = _utcnow()
+    # Every token the cutoff covers has expired by then
+    revocation = RevokedToken(jti=None, user_id=user_id, revoked_at=now, expires_at=now + _token_lifetime())
+    db.session.add(revocation)
+    db.session.commit()
+    current_app.extensions["token_denylist"].add(revocation)
+
+
+def purge_expired_revocations():
+    """
+    Delete revocations whose tokens have all expired.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    now = _utcnow()
+    result = db.session.execute(
+        delete(RevokedToken).where(or_(
+            RevokedToken.expires_at < now,
+            # User-wide cutoffs written before they had an expiry
+            and_(
+                RevokedToken.jti.is_(None),
+                RevokedToken.expires_at.is_(None),
+                RevokedToken.revoked_at < now - _token_lifetime()
+            )
+        ))
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,190 @@
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import MetaData, event, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db_routing import SHARDED_TABLES, current_shard, shard_bind
+from app.extensions import db
+from app.models.landlordShard import LandlordShard
+from app.models.tenantShard import TenantShard
+
+
+class ShardDirectory:
+    """
+    Per-process cache of user_id -> shard, read from the landlord_shard and
+    tenant_shard tables.
+
+    Landlords without a row live on the default database (shard 0), so
+    portfolios created before sharding was enabled keep working unchanged.
+    Tenants are served from the shard of the landlord whose tenancies they
+    belong to, and likewise default to shard 0. That answer is cached as well,
+    so unsharded users don't pay a lookup per request; `assign_landlord_shard`
+    and `assign_tenant_shard` drop it once the assignment commits. Assignments
+    only change otherwise when a portfolio is moved, which must be followed by
+    `clear()` (or a restart) in every process.
+    """
+
+    def __init__(self, max_entries=100000):
+        self._shards = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def shard_for(self, user_id):
+        shard = self._shards.get(user_id)
+        if shard is not None:
+            return shard
+        shard = db.session.scalar(union_all(
+            select(LandlordShard.shard).where(LandlordShard.landlord_id == user_id),
+            select(TenantShard.shard).where(TenantShard.tenant_id == user_id)
+        )) or 0
+        with self._lock:
+            if len(self._shards) >= self._max_entries:
+                self._shards.clear()
+            self._shards[user_id] = shard
+        return shard
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._shards.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._shards.clear()
+
+
+shard_directory = ShardDirectory()
+
+
+def shard_count():
+    """The number of shards, including the default database."""
+    return current_app.config["SHARD_COUNT"]
+
+
+def assign_landlord_shard(landlord_id):
+    """
+    Place a new landlord on a shard, spreading landlords by id.
+
+    Call inside the transaction that creates the landlord, before committing.
+
+    Returns:
+        int: The landlord's shard.
+    """
+    if shard_count() == 1:
+        return 0
+    shard = landlord_id % shard_count()
+    db.session.add(LandlordShard(landlord_id=landlord_id, shard=shard))
+    db.session.info.setdefault("shard_invalidations", set()).add(landlord_id)
+    return shard
+
+
+def assign_tenant_shard(tenant_ids, shard, pending=False):
+    """
+    Serve new tenants from the shard of the landlord whose tenancies they join.
+
+    A tenant is served from one shard, so all of their tenancies must be on
+    it. Call inside the transaction that creates the tenants, before committing.
+
+    Args:
+        tenant_ids (list): IDs of tenants that have no tenancies yet.
+        shard (int): The landlord's shard.
+        pending (bool): Whether their tenancy links are still to be committed on the shard.
+    """
+    if shard == 0 or not tenant_ids:
+        return
+    db.session.execute(
+        insert(TenantShard),
+        [{"tenant_id": tenant_id, "shard": shard, "pending": pending} for tenant_id in tenant_ids]
+    )
+    db.session.info.setdefault("shard_invalidations", set()).update(tenant_ids)
+
+
+# Drop cached shards of users assigned in a transaction, once it commits
+
+@event.listens_for(Session, "after_commit")
+def _apply_shard_invalidations(session):
+    user_ids = session.info.pop("shard_invalidations", None)
+    if user_ids:
+        shard_directory.invalidate(*user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_shard_invalidations(session):
+    session.info.pop("shard_invalidations", None)
+
+
+@contextmanager
+def use_shard(shard):
+    """Send statements on sharded tables to the given shard while the block runs."""
+    previous = g.get("shard")
+    g.shard = shard
+    try:
+        yield shard
+    finally:
+        g.shard = previous
+
+
+def for_each_shard():
+    """Select each shard in turn, e.g. to run a maintenance job across all of them."""
+    for shard in range(shard_count()):
+        with use_shard(shard):
+            yield shard
+
+
+def on_current_shard(landlord_id_column):
+    """A filter keeping landlords whose portfolio lives on the current shard."""
+    shard = current_shard()
+    if shard == 0:
+        return landlord_id_column.not_in(select(LandlordShard.landlord_id).where(LandlordShard.shard != 0))
+    return landlord_id_column.in_(select(LandlordShard.landlord_id).where(LandlordShard.shard == shard))
+
+
+def use_landlord_shard():
+    """
+    Select the shard of the authenticated user's portfolio for the request (a before_request hook).
+
+    Landlords use their own shard and tenants the shard of their landlord.
+    Users without an assignment, and requests without a token, use the default database.
+    """
+    if shard_count() == 1:
+        return
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    g.shard = shard_directory.shard_for(int(identity)) if identity is not None else 0
+
+
+def create_shard_schema(engine):
+    """
+    Create the sharded tables on a shard database.
+
+    Foreign keys to tables that only exist on the default database, such as
+    users and landlord, are left out; the app checks those references.
+    """
+    metadata = MetaData()
+    for table in db.metadata.sorted_tables:
+        if table.name in SHARDED_TABLES:
+            copy = table.to_metadata(metadata)
+            # Keep the table's DDL listeners, e.g. the address search index on property
+            for name in ("before_create", "after_create", "before_drop", "after_drop"):
+                for listener in getattr(table.dispatch, name):
+                    event.listen(copy, name, listener)
+    for table in metadata.tables.values():
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] not in SHARDED_TABLES:
+                table.constraints.discard(constraint)
+                for foreign_key in constraint.elements:
+                    foreign_key.parent.foreign_keys.discard(foreign_key)
+                    table.foreign_keys.discard(foreign_key)
+    metadata.create_all(engine)
+    return metadata
+
+
+def shard_engines():
+    """The engine of each shard, by shard number."""
+    return {
+        shard: db.engines[shard_bind(shard)] if shard else db.engines[None]
+        for shard in range(shard_count())
+    }
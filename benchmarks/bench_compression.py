@@ -0,0 +1,81 @@
+"""
+Benchmark response compression on a 1,000-property page.
+
+Reports, per encoding and level, the CPU time to compress the page and the
+bytes saved, for a buffered body and for the same body streamed in chunks.
+
+Usage:
+    python -m benchmarks.bench_compression [--properties 1000] [--chunks 100]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.compression import brotli, compress_body, compress_chunks
+
+STATUSES = ["vacant", "occupied", "under maintenance"]
+STREETS = ["High Street", "Station Road", "Church Lane", "Park Avenue", "Victoria Road", "Mill Lane"]
+
+
+def make_page(properties, rng):
+    return {
+        "total": properties * 7,
+        "page": 1,
+        "per_page": properties,
+        "properties": [
+            {
+                "property_id": property_id,
+                "landlord_id": 42,
+                "address": f"{rng.randint(1, 400)} {rng.choice(STREETS)}, Flat {rng.randint(1, 30)}",
+                "status": rng.choice(STATUSES),
+                "tenancies": sorted(rng.sample(range(1, 50_000), rng.randint(0, 4))),
+            }
+            for property_id in range(1, properties + 1)
+        ],
+    }
+
+
+def timed(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def report(label, body, function, repeat):
+    seconds, compressed = timed(function, repeat)
+    saved = 1 - len(compressed) / len(body)
+    print(f"{label:<28} {seconds * 1000:8.2f} ms {len(compressed):10d} bytes {saved:8.1%} saved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=100, help="Chunks the streamed body is split into.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = json.dumps(make_page(args.properties, random.Random(42))).encode()
+    size = -(-len(body) // args.chunks)
+    chunks = [body[offset:offset + size] for offset in range(0, len(body), size)]
+    print(f"{args.properties} properties, {len(body)} bytes uncompressed, streamed in {len(chunks)} chunks")
+
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", quality) for quality in (1, 4, 11)]
+    else:
+        print("brotli is not installed; only gzip is measured")
+
+    for encoding, level in settings:
+        report(f"{encoding} {level} buffered", body, lambda: compress_body(body, encoding, level), args.repeat)
+        report(
+            f"{encoding} {level} streamed", body,
+            lambda: b"".join(compress_chunks(iter(chunks), encoding, level)), args.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
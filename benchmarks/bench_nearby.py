@@ -0,0 +1,88 @@
+"""
+Benchmark the property radius search at 100k properties.
+
+Spreads one landlord's properties over a country-sized area and times the
+geohash-indexed search against a bounding-box-only query and a full scan,
+on an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_nearby [--properties 100000] [--radius 2000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import time
+
+
+def timed(label, function, queries):
+    started = time.perf_counter()
+    found = sum(function(point) for point in queries)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed / len(queries) * 1000:8.2f} ms/query {found / len(queries):8.1f} found")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--radius", type=float, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["FLASK_ENV"] = "testing"
+    from sqlalchemy import insert, select
+    from app import create_app
+    from app.extensions import db
+    from app.models import Landlord, Property, User
+    from app.services.property_location import (
+        bounding_box, distance_m, encode_geohash, find_properties_near
+    )
+
+    # Roughly the extent of Great Britain
+    rng = random.Random(42)
+    points = [(rng.uniform(50.0, 55.5), rng.uniform(-5.5, 1.5)) for _ in range(args.properties)]
+    queries = [(rng.uniform(50.0, 55.5), rng.uniform(-5.5, 1.5)) for _ in range(args.queries)]
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [{
+            "user_id": 1, "first_name": "Bench", "last_name": "Landlord",
+            "email": "bench@example.com", "password": "x", "role": "Landlord"
+        }])
+        db.session.execute(insert(Landlord), [{"landlord_id": 1}])
+        db.session.execute(insert(Property), [
+            {
+                "property_id": index + 1, "landlord_id": 1, "address": f"{index + 1} Bench Street",
+                "latitude": latitude, "longitude": longitude, "geohash": encode_geohash(latitude, longitude),
+            }
+            for index, (latitude, longitude) in enumerate(points)
+        ])
+        db.session.commit()
+
+        def geohash_search(point):
+            return len(find_properties_near(1, *point, args.radius, limit=10_000))
+
+        def bounding_box_search(point):
+            min_latitude, min_longitude, max_latitude, max_longitude = bounding_box(*point, args.radius)
+            rows = db.session.execute(select(Property.latitude, Property.longitude).where(
+                Property.landlord_id == 1,
+                Property.latitude.between(min_latitude, max_latitude),
+                Property.longitude.between(min_longitude, max_longitude),
+            )).all()
+            return sum(distance_m(*point, *row) <= args.radius for row in rows)
+
+        def full_scan(point):
+            rows = db.session.execute(
+                select(Property.latitude, Property.longitude).where(Property.landlord_id == 1)
+            ).all()
+            return sum(distance_m(*point, *row) <= args.radius for row in rows)
+
+        print(f"{args.properties} properties, radius {args.radius:g} m, {args.queries} queries")
+        expected = timed("geohash cells + box + distance", geohash_search, queries)
+        assert timed("bounding box only (no index)", bounding_box_search, queries) == expected
+        timed("full scan", full_scan, queries[:10])
+
+
+if __name__ == "__main__":
+    main()
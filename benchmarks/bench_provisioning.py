@@ -0,0 +1,58 @@
+"""
+Benchmark bulk tenant provisioning.
+
+Provisions a batch of tenants through POST /api/tenants/provision on an
+in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_provisioning [--tenants 200]
+"""
+import argparse
+import os
+import time
+from datetime import date
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ["FLASK_ENV"] = "testing"
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-long-enough-0123456789")
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+    from app import create_app
+    from app.extensions import db
+    from app.models import GroupChat, Landlord, Property, Tenancy, User
+
+    app = create_app()
+    app.config["TENANT_PROVISIONING_MAX_SIZE"] = args.tenants
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [{
+            "user_id": 1, "first_name": "Bench", "last_name": "Landlord",
+            "email": "bench@example.com", "password": "x", "role": "Landlord"
+        }])
+        db.session.execute(insert(Landlord), [{"landlord_id": 1}])
+        db.session.execute(insert(Property), [{"property_id": 1, "landlord_id": 1, "address": "1 Bench Street"}])
+        db.session.execute(insert(GroupChat), [{"group_chat_id": 1, "group_name": "Bench"}])
+        db.session.execute(insert(Tenancy), [{
+            "tenancy_id": 1, "property_id": 1, "rent_due": 1000, "lease_start_date": date.today(), "group_chat_id": 1
+        }])
+        db.session.commit()
+        token = create_access_token(identity="1")
+
+    payload = {"tenants": [
+        {"first_name": "Bench", "last_name": f"Tenant {index}", "email": f"tenant{index}@example.com", "tenancy_id": 1}
+        for index in range(args.tenants)
+    ]}
+    client = app.test_client()
+    started = time.perf_counter()
+    response = client.post("/api/tenants/provision", json=payload, headers={"Authorization": f"Bearer {token}"})
+    elapsed = time.perf_counter() - started
+    print(f"Provision {args.tenants} tenants ({response.status_code}) {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark the rent-roll projection at 100k tenancies.
+
+Compares the vectorized projection with a row-by-row Python loop, and times
+the full endpoint path (bulk load from the database plus projection) against
+an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.bench_rent_roll [--tenancies 100000] [--months 12]
+"""
+import argparse
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+
+def make_tenancies(count, properties, first_month, rng):
+    property_ids = rng.integers(1, properties + 1, count)
+    rent_due = rng.uniform(500, 5000, count).round(2)
+    start_months = first_month + rng.integers(-36, 12, count)
+    end_months = start_months + rng.integers(6, 36, count)
+    open_ended = rng.random(count) < 0.2
+    return property_ids, rent_due, start_months, end_months, open_ended
+
+
+def row_by_row(property_ids, rent_due, start_months, end_months, first_month, months):
+    rent_roll = [0.0] * months
+    active = [0] * months
+    occupied = [set() for _ in range(months)]
+    for property_id, rent, start, end in zip(
+        property_ids.tolist(), rent_due.tolist(), start_months.tolist(), end_months.tolist()
+    ):
+        for offset in range(months):
+            if start <= first_month + offset <= end:
+                rent_roll[offset] += rent
+                active[offset] += 1
+                occupied[offset].add(property_id)
+    return rent_roll, active, [len(properties) for properties in occupied]
+
+
+def timed(label, function, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return result
+
+
+def bench_database(args, tenancies, first_month):
+    os.environ["FLASK_ENV"] = "testing"
+    from sqlalchemy import insert
+    from app import create_app
+    from app.extensions import db
+    from app.models import GroupChat, Landlord, Property, Tenancy, User
+    from app.services.rent_roll import month_label, project_landlord_rent_roll
+
+    property_ids, rent_due, start_months, end_months, open_ended = tenancies
+
+    def to_date(index):
+        year, month = divmod(int(index), 12)
+        return date(year, month + 1, 1)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [{
+            "user_id": 1, "first_name": "Bench", "last_name": "Landlord",
+            "email": "bench@example.com", "password": "x", "role": "Landlord"
+        }])
+        db.session.execute(insert(Landlord), [{"landlord_id": 1}])
+        db.session.execute(insert(Property), [
+            {"property_id": property_id, "landlord_id": 1, "address": f"{property_id} Bench Street"}
+            for property_id in range(1, args.properties + 1)
+        ])
+        db.session.execute(insert(GroupChat), [
+            {"group_chat_id": index + 1, "group_name": "Bench"} for index in range(args.tenancies)
+        ])
+        db.session.execute(insert(Tenancy), [
+            {
+                "property_id": int(property_ids[index]),
+                "rent_due": float(rent_due[index]),
+                "lease_start_date": to_date(start_months[index]),
+                "lease_end_date": None if open_ended[index] else to_date(end_months[index]),
+                "group_chat_id": index + 1,
+            }
+            for index in range(args.tenancies)
+        ])
+        db.session.commit()
+
+        timed(
+            f"endpoint path, SQLite ({month_label(first_month)})",
+            lambda: project_landlord_rent_roll(1, first_month, args.months),
+            repeat=3,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenancies", type=int, default=100_000)
+    parser.add_argument("--properties", type=int, default=60_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--skip-db", action="store_true", help="Only benchmark the in-memory projection.")
+    args = parser.parse_args()
+
+    from app.services.rent_roll import OPEN_ENDED_MONTH, month_index, project_rent_roll
+
+    today = date.today()
+    first_month = month_index(today.year, today.month)
+    rng = np.random.default_rng(42)
+    tenancies = make_tenancies(args.tenancies, args.properties, first_month, rng)
+    property_ids, rent_due, start_months, end_months, open_ended = tenancies
+    end_months = np.where(open_ended, OPEN_ENDED_MONTH, end_months)
+
+    print(f"{args.tenancies} tenancies over {args.properties} properties, {args.months} months")
+    vectorized = timed(
+        "vectorized projection",
+        lambda: project_rent_roll(property_ids, rent_due, start_months, end_months, first_month, args.months),
+    )
+    looped = timed(
+        "row-by-row Python loop",
+        lambda: row_by_row(property_ids, rent_due, start_months, end_months, first_month, args.months),
+        repeat=1,
+    )
+    assert np.allclose(vectorized["rent_roll"], looped[0])
+    assert vectorized["active_tenancies"].tolist() == looped[1]
+    assert vectorized["occupied_properties"].tolist() == looped[2]
+
+    if not args.skip_db:
+        bench_database(args, tenancies, first_month)
+
+
+if __name__ == "__main__":
+    main()
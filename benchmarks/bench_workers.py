@@ -0,0 +1,185 @@
+"""
+Benchmark gunicorn worker models on the mobile endpoint mix.
+
+Starts gunicorn with gunicorn.conf.py for each worker model against a seeded
+file-backed SQLite database, drives it with concurrent keep-alive clients
+cycling through profile, property list, summary, tenancies and rent-roll
+requests, and reports throughput and latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_workers [--duration 10] [--clients 32] [--properties 500]
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(database_url, properties):
+    os.environ["DEV_DATABASE_URL"] = database_url
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+    from app import create_app
+    from app.extensions import db
+    from app.models import GroupChat, Landlord, LandlordSummary, Property, Tenancy, User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [{
+            "user_id": 1, "first_name": "Bench", "last_name": "Landlord",
+            "email": "bench@example.com", "password": "x", "role": "Landlord"
+        }])
+        db.session.execute(insert(Landlord), [{"landlord_id": 1}])
+        db.session.execute(insert(LandlordSummary), [{"landlord_id": 1, "property_count": properties}])
+        db.session.execute(insert(Property), [
+            {"property_id": property_id, "landlord_id": 1, "address": f"{property_id} Bench Street"}
+            for property_id in range(1, properties + 1)
+        ])
+        db.session.execute(insert(GroupChat), [
+            {"group_chat_id": property_id, "group_name": "Bench"} for property_id in range(1, properties + 1)
+        ])
+        db.session.execute(insert(Tenancy), [
+            {
+                "property_id": property_id, "rent_due": 1000, "group_chat_id": property_id,
+                "lease_start_date": date.today() - timedelta(days=200),
+                "lease_end_date": date.today() + timedelta(days=property_id % 400),
+            }
+            for property_id in range(1, properties + 1)
+        ])
+        db.session.commit()
+        return create_access_token(identity="1")
+
+
+def endpoint_mix(properties):
+    return [
+        "/api/users/profile",
+        "/api/properties?per_page=20",
+        "/api/properties/summary",
+        f"/api/properties/{properties // 2}/tenancies",
+        "/api/properties/rent-roll?months=12",
+    ]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def drive(port, token, paths, duration, clients):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def client(offset):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed, index = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def run_model(label, settings, args, env, token, paths):
+    port = free_port()
+    server_env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_MAX_REQUESTS="0", **settings)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=ROOT, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        drive(port, token, paths, 1, args.clients)  # Warm up
+        latencies, errors = drive(port, token, paths, args.duration, args.clients)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(
+        f"{label:<28} {len(latencies) / args.duration:9.0f} req/s"
+        f" {statistics.median(latencies) * 1000 if latencies else 0:8.1f} ms p50"
+        f" {p95 * 1000:8.1f} ms p95 {errors:6d} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--properties", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    env = dict(
+        os.environ, FLASK_ENV="development", LOG_ACCESS_SAMPLE_RATE="0",
+        JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "bench-secret-key-long-enough-0123456789")
+    )
+    os.environ.update(env)
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        env["DEV_DATABASE_URL"] = database_url
+        token = seed(database_url, args.properties)
+        paths = endpoint_mix(args.properties)
+
+        models = [
+            ("sync", {"GUNICORN_WORKER_CLASS": "sync", "GUNICORN_WORKERS": str(args.workers), "GUNICORN_THREADS": "1"}),
+            ("gthread x4", {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_WORKERS": str(args.workers),
+                            "GUNICORN_THREADS": "4"}),
+            ("gthread x4, 2x cores", {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_WORKERS": str(2 * args.workers + 1),
+                                      "GUNICORN_THREADS": "4"}),
+        ]
+        print(f"{args.clients} clients for {args.duration:.0f}s, {args.workers} cores, endpoints: {', '.join(paths)}")
+        for label, settings in models:
+            run_model(label, settings, args, env, token, paths)
+
+
+if __name__ == "__main__":
+    main()
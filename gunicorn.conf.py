@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+# Usage: gunicorn -c gunicorn.conf.py wsgi:app
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Requests spend much of their time waiting on the database, so each worker
+# process runs a few threads; processes scale with the cores available.
+cpu_count = multiprocessing.cpu_count()
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(2 * cpu_count + 1, 12))))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Load the app once in the master so workers share its memory pages
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# The app writes its own JSON access log
+accesslog = None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from app import reinit_after_fork
+    from wsgi import app
+
+    reinit_after_fork(app)
@@ -3,8 +3,14 @@ from app import create_app
 from app.extensions import db, bcrypt
 from app.models.user import User
 from app.models.landlord import Landlord
+from app.models.tenant import Tenant
+from app.models.landlordSummary import LandlordSummary
 from app.models.property import Property
 from app.models.tenancyTenants import TenancyTenants
+from app.models.changeLog import ChangeLog
+from app.models.message import Message
+from app.models.messageArchive import MessageArchive
+from app.models.changeLogHead import ChangeLogHead
 from flask_jwt_extended import create_access_token
 import os
 from dotenv import load_dotenv
@@ -43,11 +49,16 @@ def session(app):
 
         db.session.bind = connection
 
-        # Clear all relevant tables before each test
+        # Clear all relevant tables before each test, children first since foreign keys are enforced
+        db.session.query(TenancyTenants).delete()
+        db.session.query(MessageArchive).delete()
+        db.session.query(Message).delete()
+        db.session.query(ChangeLog).delete()
+        db.session.query(ChangeLogHead).delete()
+        db.session.query(LandlordSummary).delete()
         db.session.query(Property).delete()
         db.session.query(Landlord).delete()
         db.session.query(User).delete()
-        db.session.query(TenancyTenants).delete()
 
         yield db.session
 
@@ -66,6 +77,10 @@ def test_tenant_1(session):
         role="Tenant"
     )
     session.add(user)
+    session.flush()  # Get the user_id
+
+    tenant = Tenant(tenant_id=user.user_id)
+    session.add(tenant)
     session.commit()
     return user
 
@@ -1,4 +1,12 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from app.models.passwordSetupToken import PasswordSetupToken
+from app.models.refreshToken import RefreshToken
+from app.models.revokedToken import RevokedToken
 from app.models.user import User
+from app.services.password_setup import issue_password_setup_tokens
+from app.services.token_denylist import purge_expired_revocations
 
 
 def test_register_user_success(client, session):
@@ -34,6 +42,22 @@ def test_register_user_existing_email(client, test_tenant_1):
     assert response.json["error"] == "Email already registered"
 
 
+def test_register_user_concurrent_duplicate(client, test_tenant_1, monkeypatch):
+    """Test registration losing a race with another registration of the same email."""
+    # The other request registers between the lookup and the commit
+    monkeypatch.setattr("app.routes.auth.find_user_by_email", lambda email: None)
+    payload = {
+        "first_name": "Another",
+        "last_name": "User",
+        "email": test_tenant_1.email.upper(),
+        "password": "password123",
+        "role": "Tenant"
+    }
+    response = client.post("/api/auth/register", json=payload)
+    assert response.status_code == 400
+    assert response.json["error"] == "Email already registered"
+
+
 def test_register_user_missing_fields(client):
     """Test registration with missing fields."""
     payload = {
@@ -55,6 +79,7 @@ def test_login_user_success(client, test_tenant_1):
     response = client.post("/api/auth/login", json=payload)
     assert response.status_code == 200
     assert "token" in response.json
+    assert "refresh_token" in response.json
     assert response.json["user"]["email"] == test_tenant_1.email
     assert response.json["user"]["role"] == "Tenant"
 
@@ -90,3 +115,201 @@ def test_login_user_missing_fields(client):
     response = client.post("/api/auth/login", json=payload)
     assert response.status_code == 400
     assert response.json["error"] == "Missing email or password"
+
+
+@pytest.fixture(scope="function")
+def denylist(app, session):
+    """Start from an empty revoked_token table and in-memory denylist."""
+    session.query(RevokedToken).delete()
+    session.commit()
+    app.extensions["token_denylist"].clear()
+    yield app.extensions["token_denylist"]
+    session.query(RevokedToken).delete()
+    session.commit()
+    app.extensions["token_denylist"].clear()
+
+
+def test_logout_revokes_token(client, denylist, auth_token, test_tenant_1):
+    """Test that a logged out token is rejected while other tokens keep working."""
+    other_token = create_access_token(identity=str(test_tenant_1.user_id))
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 200
+    assert response.json["message"] == "Logged out"
+
+    response = client.get("/api/tenants/me/tenancies", headers=headers)
+    assert response.status_code == 401
+    response = client.get("/api/tenants/me/tenancies", headers={"Authorization": f"Bearer {other_token}"})
+    assert response.status_code == 200
+
+
+def test_revoke_user_revokes_all_tokens(app, client, denylist, auth_token, test_tenant_1):
+    """Test that revoking a user rejects every token issued to them."""
+    result = app.test_cli_runner().invoke(args=["auth", "revoke-user", str(test_tenant_1.user_id)])
+    assert result.exit_code == 0
+
+    response = client.get("/api/tenants/me/tenancies", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 401
+
+
+def test_user_cutoffs_are_purged_once_expired(app, session, denylist, test_tenant_1):
+    """Test that user-wide cutoffs are purged once every token they cover has expired."""
+    now = datetime.utcnow()
+    lifetime = app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+    app.test_cli_runner().invoke(args=["auth", "revoke-user", str(test_tenant_1.user_id)])
+    session.add_all([
+        RevokedToken(jti=None, user_id=test_tenant_1.user_id, revoked_at=now - 2 * lifetime,
+                     expires_at=now - lifetime),
+        # Written before cutoffs had an expiry
+        RevokedToken(jti=None, user_id=test_tenant_1.user_id, revoked_at=now - 2 * lifetime),
+    ])
+    session.commit()
+
+    with app.app_context():
+        assert purge_expired_revocations() == 2
+
+    cutoff = session.query(RevokedToken).one()
+    assert cutoff.expires_at >= now + lifetime - timedelta(minutes=1)
+
+
+def test_revocations_from_other_processes_are_picked_up(app, client, session, denylist, auth_token,
+                                                       test_tenant_1, monkeypatch, mocker):
+    """Test that the denylist only reads the table once the refresh interval has passed."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get("/api/tenants/me/tenancies", headers=headers).status_code == 200
+
+    # Revoked by another process, so this process only learns about it from the table
+    session.add(RevokedToken(
+        jti=decode_token(auth_token)["jti"],
+        user_id=test_tenant_1.user_id,
+        revoked_at=datetime.utcnow()
+    ))
+    session.commit()
+    refresh = mocker.spy(denylist, "refresh")
+    assert client.get("/api/tenants/me/tenancies", headers=headers).status_code == 200
+    assert refresh.call_count == 0
+
+    monkeypatch.setitem(app.config, "JWT_DENYLIST_REFRESH_SECONDS", 0)
+    assert client.get("/api/tenants/me/tenancies", headers=headers).status_code == 401
+    assert refresh.call_count == 1
+
+
+def test_revocations_committed_out_of_order_are_picked_up(app, client, session, denylist, auth_token,
+                                                          test_tenant_1, monkeypatch):
+    """Test that a revocation whose id is below the watermark is still read on the next refresh."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    monkeypatch.setitem(app.config, "JWT_DENYLIST_REFRESH_SECONDS", 0)
+    session.add(RevokedToken(
+        revocation_id=10, jti="other", user_id=test_tenant_1.user_id, revoked_at=datetime.utcnow()
+    ))
+    session.commit()
+    assert client.get("/api/tenants/me/tenancies", headers=headers).status_code == 200
+
+    # Allocated before the row above, but committed after the refresh that read it
+    session.add(RevokedToken(
+        revocation_id=9, jti=decode_token(auth_token)["jti"], user_id=test_tenant_1.user_id,
+        revoked_at=datetime.utcnow()
+    ))
+    session.commit()
+    assert client.get("/api/tenants/me/tenancies", headers=headers).status_code == 401
+
+
+@pytest.fixture(scope="function")
+def login(client, session, denylist, test_tenant_1):
+    """Log the test tenant in and return the issued tokens."""
+    session.query(RefreshToken).delete()
+    session.commit()
+    response = client.post("/api/auth/login", json={"email": test_tenant_1.email, "password": "password123"})
+    return response.json
+
+
+def refresh(client, refresh_token):
+    return client.post("/api/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+
+def test_refresh_rotates_tokens(client, login):
+    """Test that a refresh token is exchanged for new tokens that work."""
+    response = refresh(client, login["refresh_token"])
+
+    assert response.status_code == 200
+    assert response.json["refresh_token"] != login["refresh_token"]
+    assert decode_token(response.json["token"])["fresh"] is False
+    response = client.get("/api/tenants/me/tenancies", headers={"Authorization": f"Bearer {response.json['token']}"})
+    assert response.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_family(client, session, login):
+    """Test that presenting a rotated refresh token revokes every token of the session."""
+    rotated = refresh(client, login["refresh_token"]).json
+
+    response = refresh(client, login["refresh_token"])
+    assert response.status_code == 401
+    assert response.json["error"] == "Refresh token reuse detected"
+
+    response = refresh(client, rotated["refresh_token"])
+    assert response.status_code == 401
+    assert response.json["error"] == "Refresh token revoked"
+    assert all(token.revoked_at for token in session.query(RefreshToken))
+
+
+def test_refresh_does_not_extend_past_session_max(app, client, session, login, monkeypatch):
+    """Test that the sliding session ends JWT_SESSION_MAX_DAYS after the login."""
+    token = session.query(RefreshToken).one()
+    token.session_started_at = datetime.utcnow() - timedelta(days=app.config["JWT_SESSION_MAX_DAYS"] - 1)
+    session.commit()
+
+    response = refresh(client, login["refresh_token"])
+
+    assert response.status_code == 200
+    lifetime = decode_token(response.json["refresh_token"])["exp"] - decode_token(response.json["token"])["iat"]
+    assert lifetime <= timedelta(days=1).total_seconds()
+
+
+def test_logout_revokes_refresh_tokens(client, login):
+    """Test that logging out also ends the refresh token's session."""
+    client.post("/api/auth/logout", headers={"Authorization": f"Bearer {login['token']}"})
+
+    response = refresh(client, login["refresh_token"])
+
+    assert response.status_code == 401
+    assert response.json["error"] == "Refresh token revoked"
+
+
+@pytest.fixture(scope="function")
+def setup_token(app, session, test_tenant_1):
+    """Issue a set-password token for the test tenant."""
+    with app.app_context():
+        token, = issue_password_setup_tokens([test_tenant_1.user_id])
+        session.commit()
+    return token
+
+
+def test_set_password_works_once(client, session, setup_token, test_tenant_1):
+    """Test that a set-password token sets the password, and can't be used again."""
+    response = client.post("/api/auth/set-password", json={"token": setup_token, "password": "new-password"})
+    assert response.status_code == 200
+    assert session.query(PasswordSetupToken).one().used_at is not None
+    response = client.post("/api/auth/login", json={"email": test_tenant_1.email, "password": "new-password"})
+    assert response.status_code == 200
+
+    response = client.post("/api/auth/set-password", json={"token": setup_token, "password": "other-password"})
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid or expired token"
+
+
+def test_set_password_token_expires(client, session, setup_token):
+    """Test that a set-password token can't be used after PASSWORD_SETUP_TOKEN_HOURS."""
+    session.query(PasswordSetupToken).update({"expires_at": datetime.utcnow() - timedelta(minutes=1)})
+    session.commit()
+
+    response = client.post("/api/auth/set-password", json={"token": setup_token, "password": "new-password"})
+
+    assert response.status_code == 400
+    assert response.json["error"] == "Invalid or expired token"
+
+
+def test_set_password_token_is_stored_hashed(session, setup_token):
+    """Test that only a hash of the token is stored."""
+    assert session.query(PasswordSetupToken).filter_by(token_hash=setup_token).count() == 0
+    assert session.query(PasswordSetupToken).count() == 1
@@ -0,0 +1,92 @@
+from flask_jwt_extended import JWTManager
+from app.extensions import BatchJWTManager
+
+
+def batch(client, token, requests):
+    return client.post("/api/batch", json={"requests": requests}, headers={"Authorization": f"Bearer {token}"})
+
+
+class TestRunBatch:
+    """Tests for POST /api/batch endpoint."""
+
+    def test_success(self, client, landlord_token, test_landlord_1, test_property_1):
+        """Test that the home screen calls run in order and return together."""
+        response = batch(client, landlord_token, [
+            {"path": "/api/users/profile"},
+            {"path": "/api/properties?per_page=5"},
+            {"method": "GET", "path": f"/api/properties/{test_property_1.property_id}/tenancies"},
+        ])
+
+        assert response.status_code == 200
+        profile, properties, tenancies = response.json["responses"]
+        assert profile == {"status": 200, "body": {"user": str(test_landlord_1.user_id)}}
+        assert properties["status"] == 200
+        assert properties["body"]["per_page"] == 5
+        assert properties["body"]["properties"][0]["address"] == test_property_1.address
+        assert tenancies == {"status": 200, "body": []}
+
+    def test_token_is_verified_once(self, client, landlord_token, test_property_1, mocker):
+        """Test that sub-requests reuse the token verified for the batch."""
+        # The override hooks a private flask_jwt_extended method, pinned in requirements.txt;
+        # this fails if an upgrade stops calling it
+        override = mocker.spy(BatchJWTManager, "_decode_jwt_from_config")
+        decode = mocker.spy(JWTManager, "_decode_jwt_from_config")
+
+        response = batch(client, landlord_token, [
+            {"path": "/api/users/profile"},
+            {"path": f"/api/properties/{test_property_1.property_id}"},
+        ])
+
+        assert [sub_response["status"] for sub_response in response.json["responses"]] == [200, 200]
+        assert override.call_count == 3
+        assert decode.call_count == 1
+
+    def test_sub_request_errors_are_returned_per_request(self, client, landlord_token):
+        """Test that a failing sub-request doesn't fail the batch."""
+        response = batch(client, landlord_token, [
+            {"path": "/api/properties/999999"},
+            {"path": "/api/users/profile"},
+            {"path": "/api/does-not-exist"},
+        ])
+
+        assert response.status_code == 200
+        missing, profile, not_found = response.json["responses"]
+        assert missing == {"status": 404, "body": {"error": "Property not found"}}
+        assert profile["status"] == 200
+        assert not_found["status"] == 404
+
+    def test_only_get_requests(self, client, landlord_token):
+        """Test that write methods are rejected."""
+        response = batch(client, landlord_token, [{"method": "POST", "path": "/api/properties"}])
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Request 0 uses an unsupported method"
+
+    def test_nested_batch(self, client, landlord_token):
+        """Test that a batch can't contain another batch."""
+        response = batch(client, landlord_token, [{"path": "/api/batch"}])
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Request 0 has an invalid path"
+
+    def test_too_many_requests(self, app, client, landlord_token, monkeypatch):
+        """Test the batch size limit."""
+        monkeypatch.setitem(app.config, "BATCH_MAX_REQUESTS", 2)
+
+        response = batch(client, landlord_token, [{"path": "/api/users/profile"}] * 3)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "A batch can contain at most 2 requests"
+
+    def test_missing_requests(self, client, landlord_token):
+        """Test a batch without sub-requests."""
+        response = batch(client, landlord_token, [])
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Missing requests"
+
+    def test_requires_authentication(self, client):
+        """Test that the batch itself needs a token."""
+        response = client.post("/api/batch", json={"requests": [{"path": "/api/users/profile"}]})
+
+        assert response.status_code == 401
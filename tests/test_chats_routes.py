@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta
+import pytest
+from app.models.groupChat import GroupChat
+from app.models.message import Message
+from app.models.messageArchive import MessageArchive
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.services.chat_membership import membership_cache
+from app.services.message_archive import archive_messages
+
+
+@pytest.fixture(scope="function")
+def chats(session, test_tenant_1, test_property_1):
+    """
+    Create an active tenancy chat with two old and three recent messages,
+    and a chat of a tenancy that ended a year ago with one recent message.
+    """
+    session.query(MessageArchive).delete()
+    session.query(Message).delete()
+    session.query(Tenancy).delete()
+    now = datetime.utcnow()
+    today = date.today()
+    chats = []
+    for name, lease_end_date in [("Active", None), ("Ended", today - timedelta(days=365))]:
+        group_chat = GroupChat(group_name=name)
+        session.add(group_chat)
+        session.flush()
+        session.add(Tenancy(
+            property_id=test_property_1.property_id,
+            rent_due=1000.00,
+            lease_start_date=today - timedelta(days=800),
+            lease_end_date=lease_end_date,
+            group_chat_id=group_chat.group_chat_id
+        ))
+        chats.append(group_chat)
+    session.flush()
+    session.add(TenancyTenants(
+        tenancy_id=session.query(Tenancy).filter_by(group_chat_id=chats[0].group_chat_id).one().tenancy_id,
+        tenant_id=test_tenant_1.user_id
+    ))
+    timestamps = [now - timedelta(days=700), now - timedelta(days=400)] + [now - timedelta(hours=h) for h in (3, 2, 1)]
+    for index, timestamp in enumerate(timestamps):
+        session.add(Message(
+            group_chat_id=chats[0].group_chat_id, sender_id=test_tenant_1.user_id,
+            content=f"Message {index}", timestamp=timestamp
+        ))
+    session.add(Message(
+        group_chat_id=chats[1].group_chat_id, sender_id=test_tenant_1.user_id,
+        content="Ended tenancy message", timestamp=now - timedelta(days=1)
+    ))
+    session.commit()
+    membership_cache.clear()
+    return chats
+
+
+class TestArchiveMessages:
+    """Tests for moving cold messages to the archive table."""
+
+    def test_archives_old_and_ended_tenancy_messages(self, session, chats):
+        """Test that old messages and chats of ended tenancies are moved in batches."""
+        archived = archive_messages(max_age_days=365, ended_tenancy_days=90, batch_size=2)
+
+        assert archived == 3
+        assert sorted(message.content for message in session.query(Message)) == [
+            "Message 2", "Message 3", "Message 4"
+        ]
+        assert sorted(message.content for message in session.query(MessageArchive)) == [
+            "Ended tenancy message", "Message 0", "Message 1"
+        ]
+        # Nothing left to move on a second run
+        assert archive_messages(max_age_days=365, ended_tenancy_days=90) == 0
+
+    def test_cli(self, app, session, chats):
+        """Test the archive command."""
+        result = app.test_cli_runner().invoke(args=["messages", "archive", "--days", "365"])
+
+        assert result.exit_code == 0
+        assert "Archived 3 messages." in result.output
+
+
+class TestGetChatMessages:
+    """Tests for GET /api/chats/<group_chat_id>/messages endpoint."""
+
+    def test_history_spans_archive(self, client, session, auth_token, chats):
+        """Test that paging back continues from hot messages into archived ones."""
+        archive_messages(max_age_days=365, ended_tenancy_days=90)
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        url = f"/api/chats/{chats[0].group_chat_id}/messages"
+
+        first_page = client.get(f"{url}?limit=2", headers=headers)
+        assert first_page.status_code == 200
+        assert [message["content"] for message in first_page.json["messages"]] == ["Message 4", "Message 3"]
+
+        second_page = client.get(f"{url}?limit=2&before={first_page.json['next_before']}", headers=headers)
+        assert [message["content"] for message in second_page.json["messages"]] == ["Message 2", "Message 1"]
+
+        last_page = client.get(f"{url}?limit=2&before={second_page.json['next_before']}", headers=headers)
+        assert [message["content"] for message in last_page.json["messages"]] == ["Message 0"]
+        assert last_page.json["next_before"] is None
+
+    def test_landlord_reads_ended_chat(self, client, landlord_token, chats):
+        """Test that a fully archived chat is still readable by its members."""
+        archive_messages(max_age_days=365, ended_tenancy_days=90)
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get(f"/api/chats/{chats[1].group_chat_id}/messages", headers=headers)
+
+        assert response.status_code == 200
+        assert [message["content"] for message in response.json["messages"]] == ["Ended tenancy message"]
+
+    def test_not_a_member(self, client, auth_token, chats):
+        """Test that users can't read chats they don't belong to."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get(f"/api/chats/{chats[1].group_chat_id}/messages", headers=headers)
+
+        assert response.status_code == 403
+
+    def test_invalid_limit(self, client, auth_token, chats):
+        """Test a non-positive page size."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get(f"/api/chats/{chats[0].group_chat_id}/messages?limit=0", headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Invalid limit"
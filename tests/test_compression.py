@@ -0,0 +1,88 @@
+import gzip
+import json
+import zlib
+import pytest
+from app.compression import compress_chunks
+from app.models.property import Property
+
+
+@pytest.fixture(scope="function")
+def many_properties(session, test_landlord_1):
+    """Enough properties for the list response to pass the compression threshold."""
+    session.add_all([
+        Property(address=f"{number} Compression Street", landlord_id=test_landlord_1.user_id)
+        for number in range(30)
+    ])
+    session.commit()
+
+
+def test_large_response_is_gzipped(client, landlord_token, many_properties):
+    """Test that a large JSON response is compressed when the client accepts gzip."""
+    headers = {"Authorization": f"Bearer {landlord_token}", "Accept-Encoding": "gzip"}
+
+    response = client.get("/api/properties?per_page=30", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    body = json.loads(gzip.decompress(response.data))
+    assert body["total"] == 30
+
+
+def test_not_compressed_without_accept_encoding(client, landlord_token, many_properties):
+    """Test that clients that don't accept gzip get the identity body."""
+    headers = {"Authorization": f"Bearer {landlord_token}"}
+
+    response = client.get("/api/properties?per_page=30", headers=headers)
+
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json["total"] == 30
+
+
+def test_small_response_is_not_compressed(client, landlord_token, test_property_1):
+    """Test that bodies below COMPRESSION_MIN_SIZE are sent as is."""
+    headers = {"Authorization": f"Bearer {landlord_token}", "Accept-Encoding": "gzip"}
+
+    response = client.get(f"/api/properties/{test_property_1.property_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+
+def test_route_can_disable_compression(app, client, test_tenant_1, monkeypatch):
+    """Test that login responses, which carry tokens, are never compressed."""
+    monkeypatch.setitem(app.config, "COMPRESSION_MIN_SIZE", 0)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": test_tenant_1.email, "password": "password123"},
+        headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+
+def test_streamed_chunks_are_decodable_as_they_arrive():
+    """Test that each compressed chunk can be decoded before the stream ends."""
+    closed = []
+
+    class Body:
+        def __iter__(self):
+            yield '{"rows": ['
+            yield b'"a", "b"'
+            yield "]}"
+
+        def close(self):
+            closed.append(True)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = compress_chunks(Body(), "gzip", 6)
+
+    assert decompressor.decompress(next(chunks)) == b'{"rows": ['
+    decoded = b'{"rows": [' + b"".join(decompressor.decompress(chunk) for chunk in chunks)
+    assert json.loads(decoded) == {"rows": ["a", "b"]}
+    assert decompressor.eof
+    assert closed == [True]
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import insert
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.db_routing import recent_writers
+from app.extensions import db
+from app.models.landlord import Landlord
+from app.models.property import Property
+from app.models.user import User
+
+
+def seed(engine, address):
+    """Create the same landlord in a database with one property at the given address."""
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__).values(
+            user_id=1, first_name="Replica", last_name="Landlord",
+            email="replica@example.com", password="hashed", role="Landlord"
+        ))
+        connection.execute(insert(Landlord.__table__).values(landlord_id=1))
+        connection.execute(insert(Property.__table__).values(
+            property_id=1, landlord_id=1, address=address, status="vacant"
+        ))
+
+
+@pytest.fixture
+def replica_app(monkeypatch, tmp_path):
+    """App with an in-memory primary and a file-backed replica holding different data."""
+    monkeypatch.setenv("REPLICA_DATABASE_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines["replica"])
+        seed(db.engines[None], "Primary Street")
+        seed(db.engines["replica"], "Replica Street")
+        token = create_access_token(identity="1")
+    recent_writers.clear()
+    yield app, {"Authorization": f"Bearer {token}"}
+    recent_writers.clear()
+    with app.app_context():
+        db.drop_all()
+        db.metadata.drop_all(db.engines["replica"])
+    # init_app registers a metadata per bind on the shared db object; drop it so
+    # apps created by other test modules don't expect a replica bind
+    db.metadatas.pop("replica", None)
+
+
+def test_get_routes_read_from_replica(replica_app):
+    """GET routes marked for the replica return the replica's rows."""
+    app, headers = replica_app
+    client = app.test_client()
+
+    response = client.get("/api/properties", headers=headers)
+    assert response.status_code == 200
+    assert response.json["properties"][0]["address"] == "Replica Street"
+
+    response = client.get("/api/properties/1", headers=headers)
+    assert response.status_code == 200
+    assert response.json["address"] == "Replica Street"
+
+
+def test_writes_go_to_primary(replica_app):
+    """Writes land on the primary and leave the replica untouched."""
+    app, headers = replica_app
+    client = app.test_client()
+
+    response = client.put("/api/properties/1", json={"address": "Updated Street"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json["address"] == "Updated Street"
+
+    with app.app_context():
+        with db.engines["replica"].connect() as connection:
+            address = connection.execute(db.select(Property.address)).scalar_one()
+    assert address == "Replica Street"
+
+
+def test_read_your_writes_uses_primary(replica_app):
+    """A user who just wrote keeps reading from the primary within the sticky window."""
+    app, headers = replica_app
+    client = app.test_client()
+
+    client.post("/api/properties", json={"address": "New Street"}, headers=headers)
+    response = client.get("/api/properties", headers=headers)
+
+    assert response.status_code == 200
+    assert [p["address"] for p in response.json["properties"]] == ["Primary Street", "New Street"]
+
+
+def test_sticky_window_expires(replica_app):
+    """Once the sticky window is over, reads return to the replica."""
+    app, headers = replica_app
+    app.config["SQLALCHEMY_REPLICA_STICKY_SECONDS"] = 0
+    client = app.test_client()
+
+    client.post("/api/properties", json={"address": "New Street"}, headers=headers)
+    response = client.get("/api/properties", headers=headers)
+
+    assert response.json["properties"][0]["address"] == "Replica Street"
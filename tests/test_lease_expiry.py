@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+import pytest
+from app.models.groupChat import GroupChat
+from app.models.leaseExpiryNotification import LeaseExpiryNotification
+from app.models.scanCheckpoint import ScanCheckpoint
+from app.models.tenancy import Tenancy
+from app.services.lease_expiry import scan_expiring_leases
+
+
+@pytest.fixture(scope="function")
+def tenancies(session, test_property_1):
+    """Create tenancies ending at various distances from today."""
+    session.query(LeaseExpiryNotification).delete()
+    session.query(ScanCheckpoint).delete()
+    session.query(Tenancy).delete()
+    today = date.today()
+    end_dates = [
+        today - timedelta(days=1),    # Already ended
+        today + timedelta(days=5),
+        today + timedelta(days=5),
+        today + timedelta(days=20),
+        today + timedelta(days=200),  # Beyond the horizon
+        None                          # Open-ended
+    ]
+    created = []
+    for index, lease_end_date in enumerate(end_dates):
+        group_chat = GroupChat(group_name=f"Expiry Chat {index}")
+        session.add(group_chat)
+        session.flush()
+        tenancy = Tenancy(
+            property_id=test_property_1.property_id,
+            rent_due=1000.00,
+            lease_start_date=today - timedelta(days=365),
+            lease_end_date=lease_end_date,
+            group_chat_id=group_chat.group_chat_id
+        )
+        session.add(tenancy)
+        created.append(tenancy)
+    session.commit()
+    return created
+
+
+def test_scan_records_leases_within_horizon(session, tenancies):
+    """Test that only leases ending within the horizon are notified, in small batches."""
+    result = scan_expiring_leases(horizon_days=60, batch_size=2)
+
+    assert result == {"scanned": 3, "notified": 3}
+    notified = {notification.tenancy_id for notification in session.query(LeaseExpiryNotification)}
+    assert notified == {tenancy.tenancy_id for tenancy in tenancies[1:4]}
+
+    # The completed run leaves no position to resume from
+    checkpoint = session.get(ScanCheckpoint, "lease_expiry")
+    assert checkpoint.run_date == date.today()
+    assert checkpoint.last_date is None and checkpoint.last_id is None
+
+
+def test_scan_rescans_the_horizon(session, tenancies):
+    """Test that every run sees leases ending before the last one scanned, without duplicates."""
+    scan_expiring_leases(horizon_days=60, batch_size=2)
+    assert scan_expiring_leases(horizon_days=60, batch_size=2) == {"scanned": 3, "notified": 0}
+
+    # A lease shortened after the run, to end before the leases already notified
+    tenancies[4].lease_end_date = date.today() + timedelta(days=2)
+    session.commit()
+
+    assert scan_expiring_leases(horizon_days=60, batch_size=2) == {"scanned": 4, "notified": 1}
+    assert session.query(LeaseExpiryNotification).count() == 4
+
+
+def test_scan_resumes_interrupted_run(session, tenancies):
+    """Test that a run interrupted today resumes after its last batch, and one from an earlier day doesn't."""
+    session.add(ScanCheckpoint(
+        name="lease_expiry", run_date=date.today(),
+        last_date=tenancies[2].lease_end_date, last_id=tenancies[2].tenancy_id
+    ))
+    session.commit()
+    assert scan_expiring_leases(horizon_days=60) == {"scanned": 1, "notified": 1}
+
+    checkpoint = session.get(ScanCheckpoint, "lease_expiry")
+    checkpoint.run_date = date.today() - timedelta(days=1)
+    checkpoint.last_date, checkpoint.last_id = tenancies[2].lease_end_date, tenancies[2].tenancy_id
+    session.commit()
+    assert scan_expiring_leases(horizon_days=60) == {"scanned": 3, "notified": 2}
+
+
+def test_scan_command(app, session, tenancies):
+    """Test the CLI command."""
+    result = app.test_cli_runner().invoke(args=["leases", "scan-expiring", "--days", "30"])
+
+    assert "Scanned 3 leases, recorded 3 notifications." in result.output
+
+
+def test_get_expiring_leases(client, session, landlord_token, tenancies):
+    """Test that landlords see their upcoming lease ends, soonest first."""
+    scan_expiring_leases(horizon_days=60)
+
+    headers = {"Authorization": f"Bearer {landlord_token}"}
+    response = client.get("/api/properties/expiring-leases?per_page=2", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json["total"] == 3
+    assert [lease["tenancy_id"] for lease in response.json["expiring_leases"]] == [
+        tenancies[1].tenancy_id, tenancies[2].tenancy_id
+    ]
+    assert response.json["expiring_leases"][0]["lease_end_date"] == tenancies[1].lease_end_date.isoformat()
+
+
+def test_get_expiring_leases_unauthorized(client, auth_token):
+    """Test that tenants cannot list expiring leases."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get("/api/properties/expiring-leases", headers=headers)
+
+    assert response.status_code == 403
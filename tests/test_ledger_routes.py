@@ -0,0 +1,148 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from flask_jwt_extended import create_access_token
+from app.models.groupChat import GroupChat
+from app.models.ledgerEntry import LedgerEntry
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyBalance import TenancyBalance
+from app.models.tenancyTenants import TenancyTenants
+from app.services.ledger import rebuild_balances
+
+
+@pytest.fixture(scope="function")
+def tenancies(session, test_tenant_1, test_landlord_1, test_property_1):
+    """Create two tenancies on the landlord's properties; the test tenant lives in the first."""
+    session.query(TenancyBalance).delete()
+    session.query(LedgerEntry).delete()
+    session.query(Tenancy).delete()
+    second_property = Property(address="2 Ledger Lane", landlord_id=test_landlord_1.user_id)
+    session.add(second_property)
+    session.flush()
+    tenancies = []
+    for property in (test_property_1, second_property):
+        group_chat = GroupChat(group_name=property.address)
+        session.add(group_chat)
+        session.flush()
+        tenancy = Tenancy(
+            property_id=property.property_id,
+            rent_due=1000.00,
+            lease_start_date=date(2024, 1, 1),
+            group_chat_id=group_chat.group_chat_id
+        )
+        session.add(tenancy)
+        tenancies.append(tenancy)
+    session.flush()
+    session.add(TenancyTenants(tenancy_id=tenancies[0].tenancy_id, tenant_id=test_tenant_1.user_id))
+    session.commit()
+    return [tenancy.tenancy_id for tenancy in tenancies]
+
+
+def post_entry(client, token, tenancy_id, **payload):
+    return client.post(
+        f"/api/tenancies/{tenancy_id}/ledger", json=payload, headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+class TestLedger:
+    """Tests for the /api/tenancies/<tenancy_id>/ledger endpoints."""
+
+    def test_entries_update_balance(self, client, session, landlord_token, auth_token, tenancies):
+        """Test that charges and payments are appended and kept in the balance snapshot."""
+        tenancy_id = tenancies[0]
+        assert post_entry(client, landlord_token, tenancy_id, entry_type="charge", amount=1000,
+                          effective_date="2024-02-01").status_code == 201
+        response = post_entry(client, landlord_token, tenancy_id, entry_type="payment", amount="400.50")
+
+        assert response.status_code == 201
+        assert response.json["entry"]["amount"] == -400.5
+        assert response.json["balance"] == 599.5
+        assert session.get(TenancyBalance, tenancy_id).balance == Decimal("599.50")
+
+        # Tenants of the tenancy can read their statement
+        response = client.get(f"/api/tenancies/{tenancy_id}/ledger", headers={"Authorization": f"Bearer {auth_token}"})
+        assert response.status_code == 200
+        assert response.json["balance"] == 599.5
+        assert [entry["entry_type"] for entry in response.json["entries"]] == ["payment", "charge"]
+
+    def test_reversal(self, client, session, landlord_token, tenancies):
+        """Test that an entry is undone by a reversing entry, only once."""
+        tenancy_id = tenancies[0]
+        entry_id = post_entry(client, landlord_token, tenancy_id, entry_type="charge", amount=50).json["entry"]["entry_id"]
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        url = f"/api/tenancies/{tenancy_id}/ledger/{entry_id}/reverse"
+
+        response = client.post(url, headers=headers)
+        assert response.status_code == 201
+        assert response.json["entry"]["reverses_entry_id"] == entry_id
+        assert response.json["balance"] == 0
+
+        assert client.post(url, headers=headers).status_code == 409
+        assert session.query(LedgerEntry).count() == 2
+
+    def test_entries_are_append_only(self, session, landlord_token, client, tenancies):
+        """Test that the ORM refuses to change a recorded entry."""
+        post_entry(client, landlord_token, tenancies[0], entry_type="charge", amount=50)
+        entry = session.query(LedgerEntry).one()
+
+        entry.amount = 10
+        with pytest.raises(ValueError):
+            session.flush()
+        session.rollback()
+
+    @pytest.mark.parametrize("payload", [
+        {"entry_type": "refund", "amount": 10},
+        {"entry_type": "payment", "amount": -10},
+        {"entry_type": "charge", "amount": "1.001"},
+        {"entry_type": "adjustment", "amount": 0},
+        {"entry_type": "charge", "amount": "NaN"},
+        {"entry_type": "charge", "amount": 10, "effective_date": "02/01/2024"},
+    ])
+    def test_invalid_entry(self, client, session, landlord_token, tenancies, payload):
+        """Test that invalid entries are rejected without touching the balance."""
+        response = post_entry(client, landlord_token, tenancies[0], **payload)
+
+        assert response.status_code == 400
+        assert session.query(LedgerEntry).count() == 0
+        assert session.query(TenancyBalance).count() == 0
+
+    def test_other_landlord_forbidden(self, client, test_landlord_2, app, tenancies):
+        """Test that landlords can't read or write ledgers of other landlords' tenancies."""
+        token = create_access_token(identity=str(test_landlord_2.user_id))
+
+        assert post_entry(client, token, tenancies[0], entry_type="charge", amount=10).status_code == 404
+        response = client.get(f"/api/tenancies/{tenancies[0]}/ledger", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
+
+
+class TestArrears:
+    """Tests for GET /api/properties/arrears and rebuilding balances."""
+
+    def test_arrears_largest_first(self, client, session, landlord_token, tenancies):
+        """Test that only tenancies owing money are listed, largest balance first."""
+        post_entry(client, landlord_token, tenancies[0], entry_type="charge", amount=100)
+        post_entry(client, landlord_token, tenancies[1], entry_type="charge", amount=900)
+        post_entry(client, landlord_token, tenancies[1], entry_type="payment", amount=300)
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get("/api/properties/arrears", headers=headers)
+
+        assert response.status_code == 200
+        assert [(row["tenancy_id"], row["balance"]) for row in response.json["arrears"]] == [
+            (tenancies[1], 600.0), (tenancies[0], 100.0)
+        ]
+        assert response.json["arrears"][0]["address"] == "2 Ledger Lane"
+
+        response = client.get("/api/properties/arrears?min_balance=200", headers=headers)
+        assert [row["tenancy_id"] for row in response.json["arrears"]] == [tenancies[1]]
+
+    def test_rebuild_balances(self, client, session, landlord_token, tenancies):
+        """Test that balances are recomputed from the ledger."""
+        post_entry(client, landlord_token, tenancies[0], entry_type="charge", amount=100)
+        post_entry(client, landlord_token, tenancies[0], entry_type="adjustment", amount=-25)
+        session.query(TenancyBalance).delete()
+        session.commit()
+
+        assert rebuild_balances() == 1
+        assert session.get(TenancyBalance, tenancies[0]).balance == Decimal("75.00")
@@ -0,0 +1,72 @@
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from app import create_app
+from app.extensions import db
+from app.models.landlord import Landlord
+from app.models.user import User
+
+
+@pytest.fixture
+def profiled_app(monkeypatch, tmp_path):
+    """App with profiling enabled and one landlord."""
+    monkeypatch.setenv("PROFILING_TOKEN", "profile-secret")
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User).values(
+            user_id=1, first_name="Big", last_name="Landlord",
+            email="big@example.com", password="hashed", role="Landlord"
+        ))
+        db.session.execute(insert(Landlord).values(landlord_id=1))
+        db.session.commit()
+        token = create_access_token(identity="1")
+    yield app, {"Authorization": f"Bearer {token}"}, tmp_path
+    with app.app_context():
+        db.drop_all()
+
+
+def test_request_with_token_is_profiled(profiled_app):
+    """Test that a request sending the token gets a stored profile with its SQL timings."""
+    app, headers, directory = profiled_app
+
+    with app.test_client() as client:
+        response = client.get("/api/properties?per_page=5", headers={**headers, "X-Profile-Token": "profile-secret"})
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert (directory / f"{profile_id}.prof").exists()
+    report = json.loads((directory / f"{profile_id}.json").read_text())
+    assert report["endpoint"] == "properties.get_landlord_properties"
+    assert report["path"] == "/api/properties?per_page=5"
+    assert report["sql_count"] == len(report["queries"]) > 0
+    assert any("FROM property" in query["statement"] for query in report["queries"])
+    assert report["functions"]
+
+
+@pytest.mark.parametrize("token", [None, "wrong"])
+def test_request_without_valid_token_is_not_profiled(profiled_app, token):
+    """Test that requests without the right token run unprofiled."""
+    app, headers, directory = profiled_app
+    if token:
+        headers = {**headers, "X-Profile-Token": token}
+
+    with app.test_client() as client:
+        response = client.get("/api/properties", headers=headers)
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert not list(directory.iterdir())
+
+
+def test_profiling_disabled_without_token(app, client, landlord_token):
+    """Test that the header is ignored when no profiling token is configured."""
+    response = client.get(
+        "/api/properties", headers={"Authorization": f"Bearer {landlord_token}", "X-Profile-Token": ""}
+    )
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
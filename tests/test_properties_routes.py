@@ -1,7 +1,21 @@
-from datetime import date
+from datetime import date, datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app.extensions import db
 from app.models.groupChat import GroupChat
+from app.models.idempotencyKey import IdempotencyKey
+from app.models.leaseExpiryNotification import LeaseExpiryNotification
+from app.models.ledgerEntry import LedgerEntry
+from app.models.message import Message
+from app.models.messageArchive import MessageArchive
 from app.models.property import Property
 from app.models.tenancy import Tenancy
+from app.models.tenancyBalance import TenancyBalance
+from app.models.tenancyTenants import TenancyTenants
+from app.services.portfolio_summary import rebuild_summaries
+from app.services.property_deletion import delete_properties
+from app.services.property_location import set_property_location
 
 class TestCreateProperty:
     """Tests for POST /api/properties endpoint."""
@@ -27,6 +41,32 @@ class TestCreateProperty:
         assert property is not None
         assert property.address == "123 Test Street"
 
+    def test_with_location(self, client, session, landlord_token):
+        """Test that coordinates are stored with the geohash used for radius search."""
+        payload = {"address": "1 Map Street", "latitude": 57.64911, "longitude": 10.40744}
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties", json=payload, headers=headers)
+
+        assert response.status_code == 201
+        assert response.json["latitude"] == 57.64911
+        property = session.get(Property, response.json["property_id"])
+        assert property.geohash.startswith("u4pruydqqvj")
+
+    @pytest.mark.parametrize("location", [
+        {"latitude": 51.5},
+        {"latitude": 91, "longitude": 0},
+        {"latitude": "north", "longitude": 0},
+    ])
+    def test_invalid_location(self, client, session, landlord_token, location):
+        """Test that incomplete or invalid coordinates are rejected."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties", json={"address": "1 Map Street", **location}, headers=headers)
+
+        assert response.status_code == 400
+        assert session.query(Property).count() == 0
+
     def test_unauthorized_role(self, client, auth_token):
         """Test property creation by an unauthorized user (tenant)."""
         payload = {
@@ -158,6 +198,59 @@ class TestGetProperties:
         assert response.json["properties"][0]["address"] == "456 Elm Street"
         assert response.json["properties"][0]["status"] == "vacant"
 
+    def test_search_by_address(self, client, session, landlord_token, test_landlord_1, test_landlord_2):
+        """Test searching properties by part of their address."""
+        properties = [
+            Property(address="12 Harbour View Road", landlord_id=test_landlord_1.user_id),
+            Property(address="7 Mill Lane", landlord_id=test_landlord_1.user_id),
+            Property(address="99 harbour street", landlord_id=test_landlord_1.user_id),
+            Property(address="1 Harbour View Road", landlord_id=test_landlord_2.user_id)
+        ]
+        session.add_all(properties)
+        session.commit()
+
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        response = client.get("/api/properties?q=HARBOUR&per_page=1", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json["total"] == 2
+        assert len(response.json["properties"]) == 1
+
+        response = client.get("/api/properties?q=harbour", headers=headers)
+        addresses = {property["address"] for property in response.json["properties"]}
+        assert addresses == {"12 Harbour View Road", "99 harbour street"}
+
+    def test_search_reflects_updates(self, client, session, landlord_token, test_property_1):
+        """Test that the search index follows address changes."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        client.put(
+            f"/api/properties/{test_property_1.property_id}",
+            json={"address": "5 Orchard Close"},
+            headers=headers
+        )
+
+        response = client.get("/api/properties?q=orchard", headers=headers)
+        assert response.json["total"] == 1
+        response = client.get("/api/properties?q=Test Street", headers=headers)
+        assert response.json["total"] == 0
+
+    def test_search_short_term(self, client, session, landlord_token, test_landlord_1):
+        """Test that terms shorter than a trigram still match, with wildcards taken literally."""
+        properties = [
+            Property(address="Flat 4B, 10 Kings Road", landlord_id=test_landlord_1.user_id),
+            Property(address="Flat 12, 10 Kings Road", landlord_id=test_landlord_1.user_id),
+            Property(address="50% Share, 3 Queens Road", landlord_id=test_landlord_1.user_id)
+        ]
+        session.add_all(properties)
+        session.commit()
+
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        response = client.get("/api/properties?q=4b", headers=headers)
+        assert [p["address"] for p in response.json["properties"]] == ["Flat 4B, 10 Kings Road"]
+
+        response = client.get("/api/properties?q=%", headers=headers)
+        assert [p["address"] for p in response.json["properties"]] == ["50% Share, 3 Queens Road"]
+
     def test_unauthorized(self, client, auth_token):
         """Test that unauthorized users cannot access landlord properties."""
         headers = {"Authorization": f"Bearer {auth_token}"}
@@ -227,10 +320,10 @@ class TestGetProperty:
 
         headers = {"Authorization": f"Bearer {landlord_token}"}
 
-        # Patch the query filter_by method and the first method
-        mock_query = mocker.MagicMock()
-        mock_query.filter_by.return_value.first.side_effect = Exception("Database error")
-        mocker.patch("app.models.property.Property.query", new=mock_query)
+        # Patch the repository lookup used by the route
+        mocker.patch(
+            "app.routes.properties.get_landlord_with_property", side_effect=Exception("Database error")
+        )
 
         response = client.get(f"/api/properties/{property.property_id}", headers=headers)
 
@@ -259,6 +352,20 @@ class TestUpdateProperty:
         updated_property = session.get(Property, test_property_1.property_id)
         assert updated_property.address == "456 Updated Street"
 
+    def test_update_location(self, client, session, landlord_token, test_property_1):
+        """Test that coordinates sent with the address move the property, and null clears them."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        url = f"/api/properties/{test_property_1.property_id}"
+
+        response = client.put(url, json={"address": "1 Map Street", "latitude": 51.5, "longitude": -0.12}, headers=headers)
+        assert response.status_code == 200
+        assert session.get(Property, test_property_1.property_id).geohash.startswith("gcpuv")
+
+        response = client.put(url, json={"address": "1 Map Street", "latitude": None, "longitude": None}, headers=headers)
+        assert response.status_code == 200
+        session.expire_all()
+        assert session.get(Property, test_property_1.property_id).geohash is None
+
     def test_update_property_unauthorized(self, client, auth_token, session, test_property_1):
         """Test unauthorized update of a property's address."""
         payload = {"address": "456 Unauthorized Street"}
@@ -319,6 +426,155 @@ class TestUpdateProperty:
         assert response.status_code == 500
         assert response.json["error"] == "An error occurred while updating the property."
 
+def build_property_history(session, property, tenant_id, tenancies, messages):
+    """Give a property ended and current tenancies, each with a tenant, chat history and a ledger."""
+    group_chat_ids = []
+    for index in range(tenancies):
+        group_chat = GroupChat(group_name=f"{property.address} chat {index}")
+        session.add(group_chat)
+        session.flush()
+        tenancy = Tenancy(
+            property_id=property.property_id, rent_due=1000.00, lease_start_date=date(2020 + index, 1, 1),
+            lease_end_date=None if index == tenancies - 1 else date(2020 + index, 12, 31),
+            group_chat_id=group_chat.group_chat_id
+        )
+        session.add(tenancy)
+        session.flush()
+        session.add(TenancyTenants(tenancy_id=tenancy.tenancy_id, tenant_id=tenant_id))
+        session.add_all(
+            Message(group_chat_id=group_chat.group_chat_id, sender_id=tenant_id, content=f"Message {number}")
+            for number in range(messages)
+        )
+        session.add(MessageArchive(
+            message_id=1_000_000 + tenancy.tenancy_id, group_chat_id=group_chat.group_chat_id, sender_id=tenant_id,
+            content="Archived", archived_at=datetime.utcnow()
+        ))
+        session.add(LedgerEntry(
+            tenancy_id=tenancy.tenancy_id, entry_type="charge", amount=1000, effective_date=date(2020 + index, 2, 1)
+        ))
+        session.add(TenancyBalance(tenancy_id=tenancy.tenancy_id, landlord_id=property.landlord_id, balance=1000))
+        session.add(LeaseExpiryNotification(tenancy_id=tenancy.tenancy_id, lease_end_date=date(2020 + index, 12, 31)))
+        group_chat_ids.append(group_chat.group_chat_id)
+    session.commit()
+    return group_chat_ids
+
+
+class TestDeleteProperty:
+    """Tests for DELETE /api/properties/<property_id> and POST /api/properties/batch-delete."""
+
+    def test_deletes_property_history(self, client, session, landlord_token, test_tenant_1, test_property_1):
+        """Test that the property's tenancies, tenants, ledgers and chats are deleted by the cascades."""
+        property_id = test_property_1.property_id
+        group_chat_ids = build_property_history(session, test_property_1, test_tenant_1.user_id, 3, 5)
+        rebuild_summaries(test_property_1.landlord_id)
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        cursor = client.get("/api/sync", headers=headers).json["cursor"]
+
+        response = client.delete(f"/api/properties/{property_id}", headers=headers)
+
+        assert response.status_code == 200
+        session.expire_all()
+        assert session.get(Property, property_id) is None
+        assert session.query(Tenancy).filter_by(property_id=property_id).count() == 0
+        assert session.query(TenancyTenants).count() == 0
+        for model in (LedgerEntry, TenancyBalance, LeaseExpiryNotification):
+            assert session.query(model).count() == 0
+        for model in (GroupChat, Message, MessageArchive):
+            assert session.query(model).filter(model.group_chat_id.in_(group_chat_ids)).count() == 0
+
+        summary = client.get("/api/properties/summary", headers=headers).json
+        assert summary["property_count"] == 0
+        assert summary["active_tenancies"] == 0
+
+        changes = client.get("/api/sync", query_string={"since": cursor}, headers=headers).json
+        assert changes["properties"]["deleted"] == [property_id]
+        assert len(changes["tenancies"]["deleted"]) == 3
+        assert len(changes["tenancy_tenants"]["deleted"]) == 3
+
+    def test_statement_count_independent_of_history(self, app, session, test_tenant_1, test_landlord_1):
+        """Test that deleting a property takes as many statements with years of history as with none."""
+        landlord_id = test_landlord_1.user_id
+        statement_counts = []
+        for tenancies, messages in ((1, 1), (8, 50)):
+            property = Property(address=f"{tenancies} History Street", landlord_id=landlord_id)
+            session.add(property)
+            session.commit()
+            property_id = property.property_id
+            build_property_history(session, property, test_tenant_1.user_id, tenancies, messages)
+            rebuild_summaries(landlord_id)
+
+            statements = []
+            def count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                assert delete_properties(landlord_id, [property_id])[0] == [property_id]
+                session.flush()
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+            session.commit()
+            statement_counts.append(len(statements))
+
+        assert statement_counts[0] == statement_counts[1]
+
+    def test_other_landlords_property(self, client, session, test_landlord_2, test_property_1):
+        """Test that a landlord can't delete another landlord's property."""
+        token = create_access_token(identity=str(test_landlord_2.user_id))
+        response = client.delete(
+            f"/api/properties/{test_property_1.property_id}", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 404
+        assert session.get(Property, test_property_1.property_id) is not None
+
+    def test_tenant_forbidden(self, client, auth_token, test_property_1):
+        """Test that tenants can't delete properties."""
+        response = client.delete(
+            f"/api/properties/{test_property_1.property_id}", headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 403
+
+    def test_batch_delete(self, client, session, landlord_token, test_tenant_1, test_landlord_1):
+        """Test that a batch deletes every listed property in one transaction."""
+        properties = [Property(address=f"{index} Batch Street", landlord_id=test_landlord_1.user_id) for index in range(3)]
+        session.add_all(properties)
+        session.commit()
+        build_property_history(session, properties[0], test_tenant_1.user_id, 2, 3)
+        property_ids = [property.property_id for property in properties]
+
+        response = client.post(
+            "/api/properties/batch-delete", json={"property_ids": property_ids[:2]},
+            headers={"Authorization": f"Bearer {landlord_token}"}
+        )
+
+        assert response.status_code == 200
+        assert response.json["deleted"] == sorted(property_ids[:2])
+        session.expire_all()
+        assert [property.property_id for property in session.query(Property).all()] == property_ids[2:]
+
+    def test_batch_delete_is_all_or_nothing(self, client, session, landlord_token, test_property_1, test_landlord_2):
+        """Test that nothing is deleted when one of the properties belongs to someone else."""
+        other = Property(address="Other Street", landlord_id=test_landlord_2.user_id)
+        session.add(other)
+        session.commit()
+
+        response = client.post(
+            "/api/properties/batch-delete", json={"property_ids": [test_property_1.property_id, other.property_id]},
+            headers={"Authorization": f"Bearer {landlord_token}"}
+        )
+
+        assert response.status_code == 404
+        assert session.query(Property).count() == 2
+
+    @pytest.mark.parametrize("payload", [{}, {"property_ids": []}, {"property_ids": ["1"]}, {"property_ids": [True]}])
+    def test_batch_delete_invalid(self, client, landlord_token, payload):
+        """Test that a batch without valid property IDs is rejected."""
+        response = client.post(
+            "/api/properties/batch-delete", json=payload, headers={"Authorization": f"Bearer {landlord_token}"}
+        )
+        assert response.status_code == 400
+
+
 class TestCreatePropertyTenancy:
     """Tests for POST /api/properties/<property_id>/tenancies endpoint."""
 
@@ -597,4 +853,422 @@ class TestGetPropertyTenancies:
         response = client.get(f"/api/properties/{test_property_1.property_id}/tenancies")
 
         assert response.status_code == 401
-        assert response.json["msg"] == "Missing Authorization Header"
\ No newline at end of file
+        assert response.json["msg"] == "Missing Authorization Header"
+
+
+class TestCreateTenanciesBatch:
+    """Tests for POST /api/properties/tenancies/batch endpoint."""
+
+    def test_batch_success_across_properties(self, client, session, landlord_token, test_landlord_1, test_property_1):
+        """Test creating tenancies for several properties in one request."""
+        session.query(Tenancy).delete()
+        session.query(GroupChat).delete()
+        second_property = Property(address="456 Batch Street", landlord_id=test_landlord_1.user_id)
+        session.add(second_property)
+        session.commit()
+
+        payload = {
+            "tenancies": [
+                {"property_id": test_property_1.property_id, "rent_due": 1000.00, "lease_start_date": "2024-01-01"},
+                {"property_id": second_property.property_id, "rent_due": 1500.00,
+                 "lease_start_date": "2024-02-01", "lease_end_date": "2025-01-31"}
+            ]
+        }
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties/tenancies/batch", json=payload, headers=headers)
+
+        assert response.status_code == 201
+        tenancies = response.json["tenancies"]
+        assert len(tenancies) == 2
+        assert tenancies[0]["property_id"] == test_property_1.property_id
+        assert tenancies[0]["lease_end_date"] is None
+        assert tenancies[0]["group_chat"]["group_name"] == "Property Chat - 123 Test Street"
+        assert tenancies[1]["property_id"] == second_property.property_id
+        assert tenancies[1]["rent_due"] == 1500.00
+        assert tenancies[1]["lease_end_date"] == "2025-01-31"
+        assert tenancies[1]["group_chat"]["group_name"] == "Property Chat - 456 Batch Street"
+
+        # Verify each tenancy is linked to the group chat returned for it
+        session.expire_all()
+        for tenancy_data in tenancies:
+            tenancy = session.get(Tenancy, tenancy_data["tenancy_id"])
+            assert tenancy.property_id == tenancy_data["property_id"]
+            assert tenancy.group_chat.group_name == tenancy_data["group_chat"]["group_name"]
+
+    def test_batch_property_of_other_landlord(self, client, session, landlord_token, test_landlord_2, test_property_1):
+        """Test that one foreign property rejects the whole batch."""
+        session.query(Tenancy).delete()
+        session.commit()
+        foreign_property = Property(address="789 Other Street", landlord_id=test_landlord_2.user_id)
+        session.add(foreign_property)
+        session.commit()
+
+        payload = {
+            "tenancies": [
+                {"property_id": test_property_1.property_id, "rent_due": 1000.00, "lease_start_date": "2024-01-01"},
+                {"property_id": foreign_property.property_id, "rent_due": 1000.00, "lease_start_date": "2024-01-01"}
+            ]
+        }
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties/tenancies/batch", json=payload, headers=headers)
+
+        assert response.status_code == 404
+        assert response.json["error"] == "Property not found"
+        assert session.query(Tenancy).count() == 0
+
+    def test_batch_invalid_date(self, client, landlord_token, test_property_1):
+        """Test that an invalid date identifies the offending tenancy."""
+        payload = {
+            "tenancies": [
+                {"property_id": test_property_1.property_id, "rent_due": 1000.00, "lease_start_date": "2024-01-01"},
+                {"property_id": test_property_1.property_id, "rent_due": 1000.00, "lease_start_date": "01-01-2024"}
+            ]
+        }
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties/tenancies/batch", json=payload, headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Invalid date format in tenancy 1. Use YYYY-MM-DD"
+
+    def test_batch_missing_tenancies(self, client, landlord_token):
+        """Test batch creation without a tenancies list."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/properties/tenancies/batch", json={}, headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Missing tenancies"
+
+    def test_batch_unauthorized(self, client, auth_token, test_property_1):
+        """Test batch creation by a tenant."""
+        payload = {
+            "tenancies": [
+                {"property_id": test_property_1.property_id, "rent_due": 1000.00, "lease_start_date": "2024-01-01"}
+            ]
+        }
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.post("/api/properties/tenancies/batch", json=payload, headers=headers)
+
+        assert response.status_code == 403
+        assert response.json["error"] == "Unauthorized"
+
+class TestPortfolioSummary:
+    """Tests for GET /api/properties/summary endpoint."""
+
+    def test_summary_follows_writes(self, client, session, landlord_token):
+        """Test that creating properties and tenancies updates the summary."""
+        session.query(Tenancy).delete()
+        session.commit()
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        first = client.post("/api/properties", json={"address": "1 Summary Street"}, headers=headers)
+        second = client.post("/api/properties", json={"address": "2 Summary Street"}, headers=headers)
+        client.post(
+            f"/api/properties/{first.json['property_id']}/tenancies",
+            json={"rent_due": 1000.00, "lease_start_date": "2024-01-01"},
+            headers=headers
+        )
+        client.post(
+            "/api/properties/tenancies/batch",
+            json={"tenancies": [
+                {"property_id": second.json["property_id"], "rent_due": 750.50, "lease_start_date": "2024-01-01"},
+                # Already ended, so not counted as active
+                {"property_id": second.json["property_id"], "rent_due": 500.00,
+                 "lease_start_date": "2020-01-01", "lease_end_date": "2020-12-31"}
+            ]},
+            headers=headers
+        )
+
+        response = client.get("/api/properties/summary", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json["property_count"] == 2
+        assert response.json["properties_by_status"] == {"vacant": 2}
+        assert response.json["active_tenancies"] == 2
+        assert response.json["monthly_rent_due"] == 1750.50
+
+    def test_summary_empty_portfolio(self, client, landlord_token, test_landlord_1):
+        """Test the summary of a landlord without properties."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get("/api/properties/summary", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json["landlord_id"] == test_landlord_1.user_id
+        assert response.json["property_count"] == 0
+        assert response.json["properties_by_status"] == {}
+        assert response.json["monthly_rent_due"] == 0
+
+    def test_rebuild_command(self, app, client, session, landlord_token, test_landlord_1):
+        """Test that the rebuild command recomputes summaries from the tables."""
+        session.query(Tenancy).delete()
+        session.add_all([
+            Property(address="1 Rented Road", landlord_id=test_landlord_1.user_id, status="rented"),
+            Property(address="2 Vacant Road", landlord_id=test_landlord_1.user_id)
+        ])
+        session.commit()
+
+        result = app.test_cli_runner().invoke(
+            args=["portfolio", "rebuild-summaries", "--landlord-id", str(test_landlord_1.user_id)]
+        )
+        assert "Rebuilt 1 portfolio summaries." in result.output
+
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        response = client.get("/api/properties/summary", headers=headers)
+        assert response.json["property_count"] == 2
+        assert response.json["properties_by_status"] == {"rented": 1, "vacant": 1}
+        assert response.json["active_tenancies"] == 0
+
+    def test_summary_unauthorized(self, client, auth_token):
+        """Test that tenants cannot read a portfolio summary."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get("/api/properties/summary", headers=headers)
+
+        assert response.status_code == 403
+        assert response.json["error"] == "Unauthorized"
+
+class TestNearbyProperties:
+    """Tests for GET /api/properties/nearby endpoint."""
+
+    @pytest.fixture
+    def located_properties(self, session, test_landlord_1, test_landlord_2):
+        """Properties around central London at known distances, plus one of another landlord."""
+        places = [
+            ("Trafalgar Square", test_landlord_1, 51.50809, -0.12804),
+            ("Covent Garden", test_landlord_1, 51.51174, -0.12268),  # ~550 m away
+            ("Tower Bridge", test_landlord_1, 51.50546, -0.07536),  # ~3.7 km away
+            ("No coordinates", test_landlord_1, None, None),
+            ("Other landlord", test_landlord_2, 51.50809, -0.12804),
+        ]
+        properties = {}
+        for address, landlord, latitude, longitude in places:
+            property = Property(address=address, landlord_id=landlord.user_id)
+            set_property_location(property, latitude, longitude)
+            session.add(property)
+            properties[address] = property
+        session.commit()
+        return properties
+
+    def test_radius_search(self, client, landlord_token, located_properties):
+        """Test that only the landlord's properties within the radius are returned, nearest first."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get("/api/properties/nearby?lat=51.5081&lng=-0.1281&radius_m=2000", headers=headers)
+
+        assert response.status_code == 200
+        properties = response.json["properties"]
+        assert [property["address"] for property in properties] == ["Trafalgar Square", "Covent Garden"]
+        assert properties[0]["distance_m"] < 10
+        assert 500 < properties[1]["distance_m"] < 600
+
+        response = client.get("/api/properties/nearby?lat=51.5081&lng=-0.1281&radius_m=5000&limit=2", headers=headers)
+        assert [property["address"] for property in response.json["properties"]] == [
+            "Trafalgar Square", "Covent Garden"
+        ]
+
+    @pytest.mark.parametrize("query", [
+        "lng=-0.1281",
+        "lat=91&lng=0",
+        "lat=51.5&lng=-0.12&radius_m=0",
+        "lat=51.5&lng=-0.12&radius_m=100000",
+        "lat=51.5&lng=-0.12&limit=0",
+    ])
+    def test_invalid_query(self, client, landlord_token, query):
+        """Test that missing or out-of-range parameters are rejected."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get(f"/api/properties/nearby?{query}", headers=headers)
+
+        assert response.status_code == 400
+
+    def test_tenant_forbidden(self, client, auth_token):
+        """Test that tenants can't search properties."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get("/api/properties/nearby?lat=51.5&lng=-0.12", headers=headers)
+
+        assert response.status_code == 403
+
+class TestRentRollProjection:
+    """Tests for GET /api/properties/rent-roll endpoint."""
+
+    def test_projection(self, client, session, landlord_token, test_landlord_1, test_property_1):
+        """Test monthly rent, occupancy and expiries across overlapping tenancies."""
+        session.query(Tenancy).delete()
+        session.add(Property(address="2 Vacant Road", landlord_id=test_landlord_1.user_id))
+        group_chat1 = GroupChat(group_name="Roll Chat 1")
+        group_chat2 = GroupChat(group_name="Roll Chat 2")
+        session.add_all([group_chat1, group_chat2])
+        session.flush()
+        session.add_all([
+            Tenancy(
+                property_id=test_property_1.property_id,
+                rent_due=1000.00,
+                lease_start_date=date(2024, 1, 1),
+                lease_end_date=date(2024, 3, 31),
+                group_chat_id=group_chat1.group_chat_id
+            ),
+            Tenancy(
+                property_id=test_property_1.property_id,
+                rent_due=500.00,
+                lease_start_date=date(2024, 3, 1),
+                group_chat_id=group_chat2.group_chat_id
+            )
+        ])
+        session.commit()
+
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        response = client.get("/api/properties/rent-roll?start=2024-01&months=4", headers=headers)
+
+        assert response.status_code == 200
+        months = response.json["months"]
+        assert [month["month"] for month in months] == ["2024-01", "2024-02", "2024-03", "2024-04"]
+        assert [month["rent_roll"] for month in months] == [1000.0, 1000.0, 1500.0, 500.0]
+        assert [month["active_tenancies"] for month in months] == [1, 1, 2, 1]
+        assert [month["occupied_properties"] for month in months] == [1, 1, 1, 1]
+        assert months[0]["occupancy_rate"] == 0.5
+        assert [month["expiring_leases"] for month in months] == [0, 0, 1, 0]
+        assert months[2]["expiring_rent"] == 1000.0
+
+    def test_projection_without_tenancies(self, client, session, landlord_token, test_property_1):
+        """Test the projection of a portfolio without tenancies."""
+        session.query(Tenancy).delete()
+        session.commit()
+
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        response = client.get("/api/properties/rent-roll?start=2024-01&months=2", headers=headers)
+
+        assert response.status_code == 200
+        assert [month["rent_roll"] for month in response.json["months"]] == [0.0, 0.0]
+        assert response.json["months"][0]["occupancy_rate"] == 0.0
+
+    def test_invalid_start(self, client, landlord_token):
+        """Test the projection with a malformed start month."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get("/api/properties/rent-roll?start=01-2024", headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Invalid start month. Use YYYY-MM"
+
+    def test_unauthorized(self, client, auth_token):
+        """Test that tenants cannot project rent rolls."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get("/api/properties/rent-roll", headers=headers)
+
+        assert response.status_code == 403
+
+
+@pytest.fixture(scope="function")
+def idempotency_keys(session):
+    session.query(IdempotencyKey).delete()
+    session.commit()
+    return session
+
+
+class TestIdempotencyKeys:
+    """Tests for Idempotency-Key support on the create endpoints."""
+
+    def test_retried_property_is_created_once(self, client, idempotency_keys, landlord_token):
+        """Test that a retry replays the first response instead of creating a duplicate."""
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "create-1"}
+
+        first = client.post("/api/properties", json={"address": "1 Retry Road"}, headers=headers)
+        retry = client.post("/api/properties", json={"address": "1 Retry Road"}, headers=headers)
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json == first.json
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert idempotency_keys.query(Property).filter_by(address="1 Retry Road").count() == 1
+
+    def test_retried_tenancy_creates_one_group_chat(self, client, idempotency_keys, landlord_token, test_property_1):
+        """Test that retrying a tenancy creation doesn't duplicate the tenancy or its chat."""
+        idempotency_keys.query(Tenancy).delete()
+        idempotency_keys.query(GroupChat).delete()
+        idempotency_keys.commit()
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "tenancy-1"}
+        payload = {"rent_due": 1000.00, "lease_start_date": "2025-01-01"}
+        url = f"/api/properties/{test_property_1.property_id}/tenancies"
+
+        first = client.post(url, json=payload, headers=headers)
+        retry = client.post(url, json=payload, headers=headers)
+
+        assert retry.json["tenancy_id"] == first.json["tenancy_id"]
+        assert idempotency_keys.query(Tenancy).count() == 1
+        assert idempotency_keys.query(GroupChat).count() == 1
+
+    def test_response_commits_with_the_write(self, client, idempotency_keys, landlord_token, test_property_1, mocker):
+        """Test that a failure after the write committed still replays its response instead of writing again."""
+        idempotency_keys.query(Tenancy).delete()
+        idempotency_keys.commit()
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "tenancy-2"}
+        payload = {"rent_due": 1000.00, "lease_start_date": "2025-01-01"}
+        url = f"/api/properties/{test_property_1.property_id}/tenancies"
+        mocker.patch("app.routes.properties.invalidate_memberships", side_effect=RuntimeError("boom"))
+
+        failed = client.post(url, json=payload, headers=headers)
+        assert failed.status_code == 500
+
+        mocker.stopall()
+        retry = client.post(url, json=payload, headers=headers)
+        assert retry.status_code == 201
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert idempotency_keys.query(Tenancy).one().tenancy_id == retry.json["tenancy_id"]
+
+    def test_key_reused_for_different_request(self, client, idempotency_keys, landlord_token):
+        """Test that a key can't be reused with another payload."""
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "create-2"}
+        client.post("/api/properties", json={"address": "2 Retry Road"}, headers=headers)
+
+        response = client.post("/api/properties", json={"address": "3 Retry Road"}, headers=headers)
+
+        assert response.status_code == 422
+        assert response.json["error"] == "Idempotency-Key was already used for a different request"
+
+    def test_request_in_progress(self, client, idempotency_keys, landlord_token, test_landlord_1):
+        """Test that a retry arriving while the first attempt runs is rejected."""
+        now = datetime.utcnow()
+        idempotency_keys.add(IdempotencyKey(
+            user_id=test_landlord_1.user_id, key="create-3", fingerprint="0" * 64,
+            created_at=now, expires_at=now + timedelta(days=1)
+        ))
+        idempotency_keys.commit()
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "create-3"}
+
+        response = client.post("/api/properties", json={"address": "4 Retry Road"}, headers=headers)
+
+        assert response.status_code == 409
+
+    def test_expired_key_runs_again(self, client, idempotency_keys, landlord_token):
+        """Test that a key past its TTL no longer replays."""
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "create-4"}
+        client.post("/api/properties", json={"address": "5 Retry Road"}, headers=headers)
+        idempotency_keys.query(IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        idempotency_keys.commit()
+
+        response = client.post("/api/properties", json={"address": "5 Retry Road"}, headers=headers)
+
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+        assert idempotency_keys.query(Property).filter_by(address="5 Retry Road").count() == 2
+
+    def test_server_error_is_not_stored(self, client, idempotency_keys, landlord_token, mocker):
+        """Test that a failed attempt releases the key so the retry runs."""
+        headers = {"Authorization": f"Bearer {landlord_token}", "Idempotency-Key": "create-5"}
+        mocker.patch("app.routes.properties.record_property_created", side_effect=RuntimeError("boom"))
+
+        failed = client.post("/api/properties", json={"address": "6 Retry Road"}, headers=headers)
+        assert failed.status_code == 500
+        assert idempotency_keys.query(IdempotencyKey).count() == 0
+
+        mocker.stopall()
+        retry = client.post("/api/properties", json={"address": "6 Retry Road"}, headers=headers)
+        assert retry.status_code == 201
+        assert "Idempotent-Replayed" not in retry.headers
@@ -0,0 +1,35 @@
+import random
+import pytest
+from app.services.property_location import (
+    bounding_box, cell_size, covering_cells, distance_m, encode_geohash
+)
+
+
+def test_encode_geohash():
+    """Test geohashes against known values."""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert encode_geohash(-25.382708, -49.265506, 8) == "6gkzwgjz"
+    assert len(encode_geohash(0, 0)) == 12
+
+
+def test_distance():
+    """Test the haversine distance of one degree of latitude."""
+    assert distance_m(0, 0, 1, 0) == pytest.approx(111_195, rel=1e-3)
+
+
+@pytest.mark.parametrize("radius_m", [50, 2000, 40_000])
+def test_covering_cells_contain_every_point_in_radius(radius_m):
+    """Test that every point within the radius falls in one of the covering cells."""
+    rng = random.Random(radius_m)
+    for _ in range(50):
+        latitude, longitude = rng.uniform(-70, 70), rng.uniform(-170, 170)
+        cells = covering_cells(*bounding_box(latitude, longitude, radius_m))
+        assert len(cells) <= 9
+        height, width = cell_size(len(cells[0]))
+        assert height * 111_320 < 4 * radius_m or len(cells[0]) == 12
+
+        min_latitude, min_longitude, max_latitude, max_longitude = bounding_box(latitude, longitude, radius_m)
+        for _ in range(20):
+            point = (rng.uniform(min_latitude, max_latitude), rng.uniform(min_longitude, max_longitude))
+            if distance_m(latitude, longitude, *point) <= radius_m:
+                assert encode_geohash(*point).startswith(tuple(cells))
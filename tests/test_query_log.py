@@ -0,0 +1,86 @@
+import logging
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from app import create_app
+from app.extensions import db
+from app.models.landlord import Landlord
+from app.models.user import User
+from app.query_log import redact_parameters
+
+
+@pytest.fixture
+def logged_app(monkeypatch):
+    """App logging every statement as slow, with one landlord."""
+    monkeypatch.setenv("SLOW_QUERY_LOG_ENABLED", "true")
+    monkeypatch.setenv("SLOW_QUERY_THRESHOLD_MS", "0")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User).values(
+            user_id=1, first_name="Slow", last_name="Landlord",
+            email="slow@example.com", password="hashed", role="Landlord"
+        ))
+        db.session.execute(insert(Landlord).values(landlord_id=1))
+        db.session.commit()
+        token = create_access_token(identity="1")
+    yield app, {"Authorization": f"Bearer {token}"}
+    with app.app_context():
+        db.drop_all()
+
+
+def test_slow_queries_are_logged_with_endpoint_and_plan(logged_app, caplog):
+    """Test that statements are logged with their endpoint, redacted parameters and plan."""
+    app, headers = logged_app
+    caplog.set_level(logging.WARNING, logger=app.logger.name)
+
+    with app.test_client() as client:
+        response = client.get("/api/properties?status=vacant", headers=headers)
+    assert response.status_code == 200
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    listing = next(message for message in slow if "FROM property" in message)
+    assert "in properties.get_landlord_properties" in listing
+    assert "vacant" not in listing
+    assert "'str'" in listing
+
+    app.extensions["slow_query_log"].explain_pending()
+    plans = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Plan of slow query")]
+    assert any("FROM property" in plan and "property" in plan.splitlines()[-1] for plan in plans)
+
+
+def test_each_statement_is_explained_once_per_interval(logged_app):
+    """Test that repeated statements don't queue repeated EXPLAINs."""
+    app, headers = logged_app
+    slow_query_log = app.extensions["slow_query_log"]
+
+    with app.test_client() as client:
+        client.get("/api/properties", headers=headers)
+        queued = slow_query_log.pending.qsize()
+        client.get("/api/properties", headers=headers)
+
+    assert queued > 0
+    assert slow_query_log.pending.qsize() == queued
+
+
+def test_sampling(logged_app, caplog, monkeypatch):
+    """Test that unsampled slow statements are skipped."""
+    app, headers = logged_app
+    monkeypatch.setattr(app.extensions["slow_query_log"], "sample_rate", 0.0)
+    caplog.set_level(logging.WARNING, logger=app.logger.name)
+
+    with app.test_client() as client:
+        client.get("/api/properties", headers=headers)
+
+    assert not [record for record in caplog.records if record.getMessage().startswith("Slow query")]
+
+
+def test_disabled_by_default(app):
+    """Test that the log is off unless enabled in the configuration."""
+    assert "slow_query_log" not in app.extensions
+
+
+def test_redact_parameters():
+    """Test that only the types of bound values are kept."""
+    assert redact_parameters((1, "secret@example.com", None)) == ["int", "str", "NoneType"]
+    assert redact_parameters({"email": "secret@example.com"}) == {"email": "str"}
@@ -0,0 +1,118 @@
+from datetime import date
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models.groupChat import GroupChat
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.services.repository import (
+    find_owned_tenancy_ids, get_landlord_with_property, get_tenancy_landlord, get_user_and_property,
+    is_tenancy_tenant, list_property_tenancies, list_tenant_tenancies
+)
+
+
+@pytest.fixture(scope="function")
+def statements(app):
+    """Record the SQL statements executed during a test."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+class TestGetLandlordWithProperty:
+    """Tests for the owned-property lookup."""
+
+    def test_owner(self, session, test_landlord_1, test_property_1, statements):
+        """Test that the user and their property come back from one query."""
+        user_id, property_id = test_landlord_1.user_id, test_property_1.property_id
+        session.expunge_all()
+        statements.clear()
+
+        user, property = get_landlord_with_property(user_id, property_id)
+
+        assert user.user_id == user_id
+        assert property.property_id == property_id
+        assert len(statements) == 1
+
+    def test_other_landlord(self, session, test_landlord_2, test_property_1):
+        """Test that another landlord's property isn't returned."""
+        user, property = get_landlord_with_property(test_landlord_2.user_id, test_property_1.property_id)
+
+        assert user.user_id == test_landlord_2.user_id
+        assert property is None
+
+    def test_unknown_user(self, session, test_property_1):
+        """Test a user ID that doesn't exist."""
+        assert get_landlord_with_property(999999, test_property_1.property_id) == (None, None)
+
+    def test_statement_is_cached(self, session, test_landlord_1, test_landlord_2, test_property_1):
+        """Test that calls with different values reuse the cached compiled statement."""
+        get_landlord_with_property(test_landlord_1.user_id, test_property_1.property_id)
+        cache_size = len(db.engine._compiled_cache)
+
+        get_landlord_with_property(test_landlord_2.user_id, test_property_1.property_id + 1)
+
+        assert len(db.engine._compiled_cache) == cache_size
+
+
+class TestGetUserAndProperty:
+    """Tests for the unrestricted property lookup."""
+
+    def test_property_of_another_user(self, session, test_tenant_1, test_property_1):
+        """Test that the property is returned whoever owns it, so callers can tell 403 from 404."""
+        user, property = get_user_and_property(test_tenant_1.user_id, test_property_1.property_id)
+
+        assert user.user_id == test_tenant_1.user_id
+        assert property.landlord_id != test_tenant_1.user_id
+
+    def test_list_property_tenancies_without_tenancies(self, session, test_property_1):
+        """Test listing a property that has no tenancies."""
+        assert list_property_tenancies(test_property_1.property_id) == []
+
+
+@pytest.fixture(scope="function")
+def tenancy(session, test_tenant_1, test_property_1):
+    """Create a tenancy on the test property, rented by the test tenant."""
+    session.query(Tenancy).delete()
+    group_chat = GroupChat(group_name="Repository Chat")
+    session.add(group_chat)
+    session.flush()
+    tenancy = Tenancy(
+        property_id=test_property_1.property_id, rent_due=800, lease_start_date=date(2024, 1, 1),
+        group_chat_id=group_chat.group_chat_id
+    )
+    session.add(tenancy)
+    session.flush()
+    session.add(TenancyTenants(tenancy_id=tenancy.tenancy_id, tenant_id=test_tenant_1.user_id))
+    session.commit()
+    return tenancy
+
+
+class TestTenancyLookups:
+    """Tests for the tenancy ownership and membership lookups."""
+
+    def test_landlord_and_tenant(self, session, tenancy, test_tenant_1, test_landlord_1):
+        """Test that a tenancy's landlord and tenants are recognised."""
+        assert get_tenancy_landlord(tenancy.tenancy_id) == test_landlord_1.user_id
+        assert get_tenancy_landlord(tenancy.tenancy_id + 1) is None
+        assert is_tenancy_tenant(test_tenant_1.user_id, tenancy.tenancy_id)
+        assert not is_tenancy_tenant(test_landlord_1.user_id, tenancy.tenancy_id)
+
+    def test_find_owned_tenancy_ids(self, session, tenancy, test_landlord_1, test_landlord_2):
+        """Test that only the landlord's own tenancies are returned."""
+        tenancy_ids = {tenancy.tenancy_id, tenancy.tenancy_id + 1}
+
+        assert find_owned_tenancy_ids(test_landlord_1.user_id, tenancy_ids) == {tenancy.tenancy_id}
+        assert find_owned_tenancy_ids(test_landlord_2.user_id, tenancy_ids) == set()
+
+    def test_list_tenant_tenancies(self, session, tenancy, test_tenant_1, test_property_1):
+        """Test that a tenant's tenancies come back with their address and chat name."""
+        [(row, address, group_name)] = list_tenant_tenancies(test_tenant_1.user_id)
+
+        assert row.tenancy_id == tenancy.tenancy_id
+        assert (address, group_name) == (test_property_1.address, "Repository Chat")
@@ -0,0 +1,100 @@
+import io
+import json
+import logging
+import queue
+import pytest
+from app.request_log import NonBlockingQueueHandler
+
+
+@pytest.fixture(scope="function")
+def log_lines(app):
+    """Redirect the app's JSON log output to a buffer and return a reader for its lines."""
+    handler = next(handler for handler in app.logger.handlers if isinstance(handler, NonBlockingQueueHandler))
+    output = handler.listener.handlers[0]
+    buffer = io.StringIO()
+    previous = output.setStream(buffer)
+
+    def read():
+        handler.queue.join()  # Wait for the listener thread to write everything queued
+        return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+    yield read
+    handler.queue.join()
+    output.setStream(previous)
+
+
+def test_access_log(client, landlord_token, test_property_1, log_lines):
+    """Test that requests are logged as JSON with their id, endpoint, status and duration."""
+    headers = {"Authorization": f"Bearer {landlord_token}", "X-Request-ID": "mobile-123"}
+
+    response = client.get(f"/api/properties/{test_property_1.property_id}", headers=headers)
+
+    assert response.headers["X-Request-ID"] == "mobile-123"
+    entry = next(line for line in log_lines() if line["logger"] == "app.access")
+    assert entry["request_id"] == "mobile-123"
+    assert entry["endpoint"] == "properties.get_property"
+    assert entry["status"] == 200
+    assert entry["path"] == f"/api/properties/{test_property_1.property_id}"
+    assert entry["duration_ms"] >= 0
+
+
+def test_request_id_is_generated(client, log_lines):
+    """Test that requests without a usable id get a new one."""
+    response = client.get("/api/users/profile", headers={"X-Request-ID": "x" * 500})
+
+    assert len(response.headers["X-Request-ID"]) == 32
+    assert log_lines()[-1]["request_id"] == response.headers["X-Request-ID"]
+
+
+def test_batch_sub_requests_are_logged_under_the_batch_id(client, landlord_token, log_lines):
+    """Test that sub-requests don't replace the batch's request id or timing."""
+    headers = {"Authorization": f"Bearer {landlord_token}", "X-Request-ID": "outer-123"}
+
+    response = client.post("/api/batch", json={"requests": [{"path": "/api/users/profile"}] * 2}, headers=headers)
+
+    assert response.headers["X-Request-ID"] == "outer-123"
+    entries = [line for line in log_lines() if line["logger"] == "app.access"]
+    assert [(entry["endpoint"], entry["request_id"]) for entry in entries] == [
+        ("users.get_user_profile", "outer-123"),
+        ("users.get_user_profile", "outer-123"),
+        ("batch.run_batch", "outer-123"),
+    ]
+
+
+def test_errors_are_logged_with_traceback(client, landlord_token, test_property_1, log_lines, mocker):
+    """Test that a failing route logs the exception with the request id."""
+    mocker.patch("app.routes.properties.get_landlord_with_property", side_effect=RuntimeError("database down"))
+    headers = {"Authorization": f"Bearer {landlord_token}"}
+
+    response = client.get(f"/api/properties/{test_property_1.property_id}", headers=headers)
+
+    assert response.status_code == 500
+    error = next(line for line in log_lines() if line["level"] == "ERROR")
+    assert error["message"] == "Error while retrieving the property"
+    assert "RuntimeError: database down" in error["exception"]
+    assert error["request_id"] == response.headers["X-Request-ID"]
+
+
+def test_successful_requests_are_sampled(app, client, log_lines, monkeypatch):
+    """Test that sampling drops successful requests but keeps errors."""
+    monkeypatch.setitem(app.config, "LOG_ACCESS_SAMPLE_RATE", 0.0)
+
+    client.post("/api/auth/login", json={"email": "nobody@example.com", "password": "x"})
+    client.post("/api/auth/login", json={})
+
+    statuses = [line["status"] for line in log_lines() if line["logger"] == "app.access"]
+    assert statuses == [404, 400]
+
+
+def test_full_queue_drops_records():
+    """Test that logging never waits for a full queue."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test_request_log.full_queue")
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    logger.warning("first")
+    logger.warning("second")
+
+    assert handler.queue.get_nowait().msg == "first"
+    assert handler.dropped == 1
@@ -0,0 +1,286 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+from app import create_app
+from app.extensions import db
+from app.models.changeLog import ChangeLog
+from app.models.changeLogHead import ChangeLogHead
+from app.models.emailOutbox import EmailOutbox
+from app.models.groupChat import GroupChat
+from app.models.landlord import Landlord
+from app.models.landlordSummary import LandlordSummary
+from app.models.passwordSetupToken import PasswordSetupToken
+from app.models.property import Property
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.models.tenantShard import TenantShard
+from app.models.user import User
+from app.services.chat_membership import membership_cache
+from app.sharding import assign_landlord_shard, create_shard_schema, shard_directory, shard_engines
+
+
+def count_rows(engine, model):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model.__table__)).scalar_one()
+
+
+@pytest.fixture
+def sharded_app(monkeypatch, tmp_path):
+    """App with an in-memory default database and two file-backed shards."""
+    monkeypatch.setenv(
+        "SHARD_DATABASE_URLS", f"sqlite:///{tmp_path / 'shard_1.db'}, sqlite:///{tmp_path / 'shard_2.db'}"
+    )
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        engines = shard_engines()
+        for shard, engine in engines.items():
+            if shard:
+                create_shard_schema(engine)
+    shard_directory.clear()
+    membership_cache.clear()
+    yield app, engines
+    shard_directory.clear()
+    membership_cache.clear()
+    with app.app_context():
+        db.drop_all()
+    # init_app registers a metadata per bind on the shared db object; drop them so
+    # apps created by other test modules don't expect shard binds
+    db.metadatas.pop("shard_1", None)
+    db.metadatas.pop("shard_2", None)
+
+
+def register_landlord(app, client, email):
+    """Register a landlord through the API and return their id and auth headers."""
+    response = client.post("/api/auth/register", json={
+        "first_name": "Shard", "last_name": "Landlord", "email": email, "password": "password123",
+        "role": "Landlord"
+    })
+    assert response.status_code == 201
+    with app.app_context():
+        user_id = db.session.scalars(select(User.user_id).where(User.email == email)).one()
+        return user_id, {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+def test_portfolio_rows_follow_the_landlord_shard(sharded_app):
+    """Test that a landlord's properties, tenancies and chats are written to and read from their shard."""
+    app, engines = sharded_app
+    client = app.test_client()
+    landlords = [register_landlord(app, client, f"landlord{index}@example.com") for index in range(3)]
+    shards = [user_id % 3 for user_id, _ in landlords]
+    assert sorted(shards) == [0, 1, 2]
+
+    # Each landlord's summary was created on their shard
+    for shard, engine in engines.items():
+        assert count_rows(engine, LandlordSummary) == 1
+
+    for user_id, headers in landlords:
+        response = client.post("/api/properties", json={"address": f"{user_id} Shard Street"}, headers=headers)
+        assert response.status_code == 201
+        property_id = response.json["property_id"]
+        response = client.post(
+            f"/api/properties/{property_id}/tenancies",
+            json={"rent_due": 1000, "lease_start_date": "2024-01-01"}, headers=headers
+        )
+        assert response.status_code == 201
+
+    for shard, engine in engines.items():
+        assert count_rows(engine, Property) == 1
+        assert count_rows(engine, Tenancy) == 1
+        assert count_rows(engine, GroupChat) == 1
+
+    # Every landlord sees only their own portfolio, even though ids repeat across shards
+    for user_id, headers in landlords:
+        response = client.get("/api/properties", headers=headers)
+        assert [property["address"] for property in response.json["properties"]] == [f"{user_id} Shard Street"]
+        property_id = response.json["properties"][0]["property_id"]
+
+        response = client.get(f"/api/properties/{property_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.json["address"] == f"{user_id} Shard Street"
+
+        response = client.get(f"/api/properties/{property_id}/tenancies", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json) == 1
+
+        response = client.get("/api/properties?q=Shard", headers=headers)
+        assert response.json["total"] == 1
+
+        response = client.get("/api/properties/summary", headers=headers)
+        assert response.json["property_count"] == 1
+
+
+def create_tenancy(client, headers, address):
+    """Create a property with one tenancy through the API and return the tenancy."""
+    response = client.post("/api/properties", json={"address": address}, headers=headers)
+    response = client.post(
+        f"/api/properties/{response.json['property_id']}/tenancies",
+        json={"rent_due": 1000, "lease_start_date": "2024-01-01"}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json
+
+
+def test_chats_follow_the_landlord_shard(sharded_app):
+    """Test that chat membership, a UNION query, is read from the landlord's shard."""
+    app, engines = sharded_app
+    client = app.test_client()
+    landlords = [register_landlord(app, client, f"landlord{index}@example.com") for index in range(3)]
+
+    chat_ids = []
+    for user_id, headers in landlords:
+        tenancy = create_tenancy(client, headers, f"{user_id} Chat Street")
+        chat_ids.append(tenancy["group_chat"]["group_chat_id"])
+
+    for (user_id, headers), group_chat_id in zip(landlords, chat_ids):
+        response = client.get(f"/api/chats/{group_chat_id}/messages", headers=headers)
+        assert response.status_code == 200
+        assert response.json["messages"] == []
+
+        # The next chat id only exists on other shards, if at all
+        response = client.get(f"/api/chats/{group_chat_id + 1}/messages", headers=headers)
+        assert response.status_code == 403
+
+
+def test_tenants_follow_their_landlord_shard(sharded_app):
+    """Test that provisioned tenants read their tenancies, chat and ledger from their landlord's shard."""
+    app, engines = sharded_app
+    client = app.test_client()
+    landlords = [register_landlord(app, client, f"landlord{index}@example.com") for index in range(3)]
+
+    for index, (user_id, headers) in enumerate(landlords):
+        tenancy = create_tenancy(client, headers, f"{user_id} Tenant Street")
+        response = client.post("/api/tenants/provision", json={"tenants": [{
+            "first_name": "Shard", "last_name": "Tenant", "email": f"tenant{index}@example.com",
+            "tenancy_id": tenancy["tenancy_id"]
+        }]}, headers=headers)
+        assert response.status_code == 201
+        with app.app_context():
+            tenant_token = create_access_token(identity=str(response.json["tenants"][0]["user_id"]))
+        tenant_headers = {"Authorization": f"Bearer {tenant_token}"}
+
+        response = client.get("/api/tenants/me/tenancies", headers=tenant_headers)
+        assert [row["address"] for row in response.json] == [f"{user_id} Tenant Street"]
+
+        response = client.get(f"/api/chats/{tenancy['group_chat']['group_chat_id']}/messages", headers=tenant_headers)
+        assert response.status_code == 200
+
+        response = client.get(f"/api/tenancies/{tenancy['tenancy_id']}/ledger", headers=tenant_headers)
+        assert response.status_code == 200
+
+
+
+def test_provisioning_removes_accounts_if_the_shard_commit_fails(sharded_app):
+    """Test that tenant accounts committed to the default database are removed when their links fail on the shard."""
+    app, engines = sharded_app
+    client = app.test_client()
+    user_id, headers = register_landlord(app, client, "landlord@example.com")
+    tenancy = create_tenancy(client, headers, "1 Rollback Street")
+    payload = {"tenants": [{
+        "first_name": "Shard", "last_name": "Tenant", "email": "tenant@example.com", "tenancy_id": tenancy["tenancy_id"]
+    }]}
+    # The tenant will get the next user id; a stray link row for it makes the shard insert fail
+    with engines[1].begin() as connection:
+        connection.execute(
+            TenancyTenants.__table__.insert().values(tenancy_id=tenancy["tenancy_id"], tenant_id=user_id + 1)
+        )
+
+    response = client.post("/api/tenants/provision", json=payload, headers=headers)
+
+    assert response.status_code == 500
+    with app.app_context():
+        assert count_rows(engines[0], User) == 1
+        for model in (TenantShard, PasswordSetupToken, EmailOutbox):
+            assert count_rows(engines[0], model) == 0
+
+    with engines[1].begin() as connection:
+        connection.execute(TenancyTenants.__table__.delete())
+    response = client.post("/api/tenants/provision", json=payload, headers=headers)
+    assert response.status_code == 201
+    assert count_rows(engines[1], TenancyTenants) == 1
+
+
+def test_pending_tenants_are_purged(sharded_app):
+    """Test that accounts left pending by a request that died after linking them are deleted, links included."""
+    app, engines = sharded_app
+    client = app.test_client()
+    user_id, headers = register_landlord(app, client, "landlord@example.com")
+    tenancy = create_tenancy(client, headers, "1 Abandoned Street")
+    response = client.post("/api/tenants/provision", json={"tenants": [{
+        "first_name": "Shard", "last_name": "Tenant", "email": "tenant@example.com", "tenancy_id": tenancy["tenancy_id"]
+    }]}, headers=headers)
+    assert response.status_code == 201
+    runner = app.test_cli_runner()
+    assert "Deleted 0 pending" in runner.invoke(args=["shards", "purge-pending-tenants", "--minutes", "0"]).output
+
+    # As if the request died after the shard commit, before the activating one
+    with engines[0].begin() as connection:
+        connection.execute(TenantShard.__table__.update().values(
+            pending=True, assigned_at=datetime.utcnow() - timedelta(hours=2)
+        ))
+
+    result = runner.invoke(args=["shards", "purge-pending-tenants"])
+
+    assert "Deleted 1 pending" in result.output
+    with app.app_context():
+        assert count_rows(engines[0], User) == 1
+        assert count_rows(engines[0], TenantShard) == 0
+    assert count_rows(engines[1], TenancyTenants) == 0
+    with engines[1].connect() as connection:
+        last_change = connection.execute(
+            select(ChangeLog.entity, ChangeLog.operation).order_by(ChangeLog.version.desc())
+        ).first()
+    assert tuple(last_change) == ("tenancy_tenant", "delete")
+
+
+def test_registration_survives_a_failed_shard_commit(sharded_app):
+    """Test that a landlord whose shard rows failed to commit gets them from their first write."""
+    app, engines = sharded_app
+    client = app.test_client()
+    # The first landlord gets id 1, so shard 1; a stray head row there makes its insert fail
+    with engines[1].begin() as connection:
+        connection.execute(ChangeLogHead.__table__.insert().values(landlord_id=1, last_version=0))
+
+    user_id, headers = register_landlord(app, client, "landlord@example.com")
+    assert user_id == 1
+    assert count_rows(engines[1], LandlordSummary) == 0
+
+    response = client.post("/api/properties", json={"address": "1 Lazy Street"}, headers=headers)
+    assert response.status_code == 201
+    assert client.get("/api/properties/summary", headers=headers).json["property_count"] == 1
+    assert client.get("/api/sync", headers=headers).json["cursor"] == 1
+
+
+def test_users_stay_on_the_default_database(sharded_app):
+    """Test that only portfolio tables are created on shards and users are never written there."""
+    app, engines = sharded_app
+    client = app.test_client()
+    register_landlord(app, client, "landlord@example.com")
+
+    with app.app_context():
+        assert count_rows(engines[0], User) == 1
+    for shard in (1, 2):
+        with engines[shard].connect() as connection:
+            assert not engines[shard].dialect.has_table(connection, "users")
+
+
+def test_unsharded_users_are_cached_until_assigned(sharded_app, mocker):
+    """Test that shard 0 answers are cached too, and dropped once an assignment commits."""
+    app, engines = sharded_app
+    with app.app_context():
+        lookup = mocker.spy(db.session, "scalar")
+        assert shard_directory.shard_for(4) == 0
+        assert shard_directory.shard_for(4) == 0
+        assert lookup.call_count == 1
+
+        db.session.add(User(
+            user_id=4, first_name="Cached", last_name="Landlord", email="cached@example.com", password="x",
+            role="Landlord"
+        ))
+        db.session.add(Landlord(landlord_id=4))
+        db.session.flush()
+        shard = assign_landlord_shard(4)
+        assert shard_directory.shard_for(4) == 0  # Not committed yet
+        db.session.commit()
+        assert shard_directory.shard_for(4) == shard == 1
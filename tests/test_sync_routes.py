@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from app.extensions import db
+from app.models.changeLogHead import ChangeLogHead
+from app.models.changeLog import ChangeLog
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.services import change_feed
+from app.services.change_feed import purge_change_log
+
+
+@pytest.fixture(scope="function")
+def tenancies_cleared(session):
+    session.query(Tenancy).delete()
+    session.commit()
+
+
+def sync(client, token, **params):
+    return client.get("/api/sync", query_string=params, headers={"Authorization": f"Bearer {token}"})
+
+
+def create_property(client, token, address):
+    response = client.post("/api/properties", json={"address": address}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 201
+    return response.json["property_id"]
+
+
+def create_tenancy(client, token, property_id):
+    response = client.post(
+        f"/api/properties/{property_id}/tenancies",
+        json={"rent_due": 900, "lease_start_date": "2024-01-01"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 201
+    return response.json["tenancy_id"]
+
+
+class TestSync:
+    """Tests for the /api/sync endpoint."""
+
+    def test_returns_changes_since_cursor(self, client, session, landlord_token, tenancies_cleared):
+        """Test that a sync only returns what changed after the cursor, collapsed per row."""
+        cursor = sync(client, landlord_token).json["cursor"]
+        first_id = create_property(client, landlord_token, "1 Sync Street")
+
+        response = sync(client, landlord_token, since=cursor)
+        assert response.status_code == 200
+        assert [row["property_id"] for row in response.json["properties"]["upserted"]] == [first_id]
+        cursor = response.json["cursor"]
+
+        # Two updates of the same property and a new tenancy
+        for address in ("1 Sync Road", "1 Sync Avenue"):
+            client.put(f"/api/properties/{first_id}", json={"address": address},
+                       headers={"Authorization": f"Bearer {landlord_token}"})
+        tenancy_id = create_tenancy(client, landlord_token, first_id)
+
+        response = sync(client, landlord_token, since=cursor)
+        assert [row["address"] for row in response.json["properties"]["upserted"]] == ["1 Sync Avenue"]
+        assert [row["tenancy_id"] for row in response.json["tenancies"]["upserted"]] == [tenancy_id]
+        assert response.json["has_more"] is False
+
+        # Nothing changed since
+        response = sync(client, landlord_token, since=response.json["cursor"])
+        assert response.json["properties"] == {"upserted": [], "deleted": []}
+        assert response.json["cursor"] == cursor + 3
+
+    def test_tenancy_tenants_and_deletes(self, client, session, landlord_token, test_tenant_1,
+                                         test_property_1, tenancies_cleared):
+        """Test that tenants joining and leaving a tenancy are synced, and deleted rows returned by key."""
+        tenancy_id = create_tenancy(client, landlord_token, test_property_1.property_id)
+        cursor = sync(client, landlord_token).json["cursor"]
+
+        session.add(TenancyTenants(tenancy_id=tenancy_id, tenant_id=test_tenant_1.user_id))
+        session.commit()
+        response = sync(client, landlord_token, since=cursor)
+        key = {"tenancy_id": tenancy_id, "tenant_id": test_tenant_1.user_id}
+        assert response.json["tenancy_tenants"] == {"upserted": [key], "deleted": []}
+
+        session.delete(session.get(TenancyTenants, (tenancy_id, test_tenant_1.user_id)))
+        session.commit()
+        response = sync(client, landlord_token, since=response.json["cursor"])
+        assert response.json["tenancy_tenants"] == {"upserted": [], "deleted": [key]}
+
+    def test_batch_tenancies_are_logged(self, client, session, landlord_token, test_property_1, tenancies_cleared):
+        """Test that tenancies written by the bulk insert are in the feed."""
+        cursor = sync(client, landlord_token).json["cursor"]
+        response = client.post(
+            "/api/properties/tenancies/batch",
+            json={"tenancies": [
+                {"property_id": test_property_1.property_id, "rent_due": 500, "lease_start_date": "2024-01-01"}
+                for _ in range(3)
+            ]},
+            headers={"Authorization": f"Bearer {landlord_token}"}
+        )
+        created = sorted(tenancy["tenancy_id"] for tenancy in response.json["tenancies"])
+
+        response = sync(client, landlord_token, since=cursor, limit=2)
+        assert response.json["has_more"] is True
+        synced = [row["tenancy_id"] for row in response.json["tenancies"]["upserted"]]
+        response = sync(client, landlord_token, since=response.json["cursor"], limit=2)
+        synced += [row["tenancy_id"] for row in response.json["tenancies"]["upserted"]]
+        assert synced == created
+
+    def test_concurrent_first_writes_share_the_head(self, client, session, landlord_token, test_landlord_1,
+                                                    monkeypatch):
+        """Test that a write finding no head row tolerates another first write inserting it meanwhile."""
+        insert_missing_head = change_feed._insert_missing_head
+
+        def after_concurrent_insert(dialect_name, landlord_id):
+            # The other first write inserted the head and allocated version 1 after this one looked
+            db.session.connection().execute(insert(ChangeLogHead).values(landlord_id=landlord_id, last_version=1))
+            return insert_missing_head(dialect_name, landlord_id)
+
+        monkeypatch.setattr(change_feed, "_insert_missing_head", after_concurrent_insert)
+        create_property(client, landlord_token, "1 Race Street")
+
+        assert session.get(ChangeLogHead, test_landlord_1.user_id, populate_existing=True).last_version == 2
+        assert sync(client, landlord_token).json["cursor"] == 2
+
+    def test_only_own_changes(self, client, session, landlord_token, test_landlord_2, tenancies_cleared):
+        """Test that changes to another landlord's portfolio aren't returned."""
+        other_token = create_access_token(identity=str(test_landlord_2.user_id))
+        cursor = sync(client, landlord_token).json["cursor"]
+        create_property(client, other_token, "2 Other Street")
+
+        response = sync(client, landlord_token, since=cursor)
+        assert response.json["properties"]["upserted"] == []
+        assert response.json["cursor"] == cursor
+
+    def test_expired_and_unknown_cursor(self, client, session, landlord_token, tenancies_cleared):
+        """Test that a cursor older than the purged changes, or ahead of the feed, asks for a full sync."""
+        cursor = sync(client, landlord_token).json["cursor"]
+        create_property(client, landlord_token, "3 Purge Street")
+        create_property(client, landlord_token, "4 Purge Street")
+
+        assert purge_change_log(retention_days=0, now=datetime.utcnow() + timedelta(seconds=5)) == 2
+        assert session.query(ChangeLog).count() == 0
+        assert sync(client, landlord_token, since=cursor).status_code == 410
+        assert sync(client, landlord_token, since=cursor + 2).status_code == 200
+        assert sync(client, landlord_token, since=cursor + 3).status_code == 410
+
+    def test_invalid_parameters(self, client, landlord_token):
+        """Test that negative cursors and limits are rejected."""
+        assert sync(client, landlord_token, since=-1).status_code == 400
+        assert sync(client, landlord_token, since=0, limit=0).status_code == 400
+
+    def test_tenant_forbidden(self, client, auth_token):
+        """Test that only landlords can sync a portfolio."""
+        assert sync(client, auth_token, since=0).status_code == 403
@@ -0,0 +1,367 @@
+import socketserver
+import threading
+from datetime import date, datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import IntegrityError
+from app.models.emailOutbox import EmailOutbox
+from app.models.groupChat import GroupChat
+from app.models.tenancy import Tenancy
+from app.models.tenancyTenants import TenancyTenants
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.services import chat_membership
+from app.services.chat_membership import is_chat_member, membership_cache
+from app.services.outbox import drain_outbox
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """A minimal local SMTP server that records connections and delivered messages."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, rejected_recipients=()):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.rejected_recipients = set(rejected_recipients)
+        self.connections = 0
+        self.messages = []
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        recipients = []
+        self.reply("220 localhost SMTP stand-in")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 Bye")
+                return
+            if command in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in self.server.rejected_recipients:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (data_line := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(data_line)
+                self.server.messages.append((recipients, b"".join(data).decode()))
+                self.reply("250 OK")
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture(scope="function")
+def smtp_server(app, monkeypatch):
+    """Point the mail extension at a local SMTP stand-in."""
+    server = SMTPStandIn(rejected_recipients={"bounce@example.com"})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    mail_state = app.extensions["mail"]
+    monkeypatch.setattr(mail_state, "suppress", False)
+    monkeypatch.setattr(mail_state, "server", "127.0.0.1")
+    monkeypatch.setattr(mail_state, "port", server.server_address[1])
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="function")
+def outbox(session):
+    session.query(EmailOutbox).delete()
+    session.commit()
+    return session
+
+
+class TestSendInvitation:
+    """Tests for POST /api/tenants/invitations endpoint."""
+
+    def test_invitation_is_queued(self, client, outbox, landlord_token):
+        """Test that the request only commits an outbox row."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post(
+            "/api/tenants/invitations",
+            json={"email": "New.Tenant@example.com", "name": "Alex"},
+            headers=headers
+        )
+
+        assert response.status_code == 202
+        assert response.json["message"] == "Invitation queued"
+        email = outbox.get(EmailOutbox, response.json["outbox_id"])
+        assert email.recipient == "new.tenant@example.com"
+        assert email.status == "pending"
+        assert "Hi Alex," in email.body
+
+    def test_missing_email(self, client, landlord_token):
+        """Test an invitation without an email address."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post("/api/tenants/invitations", json={"name": "Alex"}, headers=headers)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "Missing tenant email"
+
+    def test_unauthorized(self, client, auth_token):
+        """Test that tenants cannot send invitations."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.post("/api/tenants/invitations", json={"email": "a@example.com"}, headers=headers)
+
+        assert response.status_code == 403
+
+
+class TestOutboxDelivery:
+    """Tests for draining the outbox against a local SMTP server."""
+
+    def test_drain_sends_batch_over_one_connection(self, client, outbox, landlord_token, smtp_server):
+        """Test that queued invitations are sent together over a single SMTP connection."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        for index in range(3):
+            client.post("/api/tenants/invitations", json={"email": f"tenant{index}@example.com"}, headers=headers)
+
+        assert drain_outbox() == 3
+
+        assert smtp_server.connections == 1
+        assert sorted(recipients[0] for recipients, _ in smtp_server.messages) == [
+            "tenant0@example.com", "tenant1@example.com", "tenant2@example.com"
+        ]
+        assert {email.status for email in outbox.query(EmailOutbox)} == {"sent"}
+
+    def test_rejected_recipient_is_retried_with_backoff(self, app, client, outbox, landlord_token, smtp_server):
+        """Test that a rejected message backs off without blocking the rest of the batch."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        client.post("/api/tenants/invitations", json={"email": "bounce@example.com"}, headers=headers)
+        client.post("/api/tenants/invitations", json={"email": "tenant@example.com"}, headers=headers)
+
+        started = datetime.utcnow()
+        assert drain_outbox() == 1
+
+        bounced = outbox.query(EmailOutbox).filter_by(recipient="bounce@example.com").one()
+        assert bounced.status == "pending"
+        assert bounced.attempts == 1
+        assert bounced.next_attempt_at >= started + timedelta(seconds=app.config["OUTBOX_RETRY_BASE_SECONDS"])
+        # Not due yet, so a second drain sends nothing
+        assert drain_outbox() == 0
+
+    def test_connection_failure_marks_batch_failed_after_max_attempts(self, app, client, outbox, landlord_token, monkeypatch):
+        """Test that an unreachable server retries every email until the attempt limit."""
+        mail_state = app.extensions["mail"]
+        monkeypatch.setattr(mail_state, "suppress", False)
+        monkeypatch.setattr(mail_state, "server", "127.0.0.1")
+        monkeypatch.setattr(mail_state, "port", 1)  # Nothing listens here
+        monkeypatch.setitem(app.config, "OUTBOX_MAX_ATTEMPTS", 2)
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+        client.post("/api/tenants/invitations", json={"email": "tenant@example.com"}, headers=headers)
+
+        for _ in range(2):
+            assert drain_outbox() == 0
+            # Make the retry due immediately
+            outbox.query(EmailOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+            outbox.commit()
+
+        email = outbox.query(EmailOutbox).one()
+        assert email.status == "failed"
+        assert email.attempts == 2
+        assert email.last_error
+
+
+@pytest.fixture(scope="function")
+def tenant_tenancies(session, test_tenant_1, test_property_1):
+    """Create two tenancies on the test property, the first one rented by the test tenant."""
+    session.query(Tenancy).delete()
+    session.query(Tenant).delete()
+    session.add(Tenant(tenant_id=test_tenant_1.user_id))
+    tenancies = []
+    for index, start in enumerate([date(2023, 1, 1), date(2024, 1, 1)]):
+        group_chat = GroupChat(group_name=f"Tenant Chat {index}")
+        session.add(group_chat)
+        session.flush()
+        tenancy = Tenancy(
+            property_id=test_property_1.property_id,
+            rent_due=900.00 + index,
+            lease_start_date=start,
+            group_chat_id=group_chat.group_chat_id
+        )
+        session.add(tenancy)
+        tenancies.append(tenancy)
+    session.flush()
+    session.add(TenancyTenants(tenancy_id=tenancies[0].tenancy_id, tenant_id=test_tenant_1.user_id))
+    session.commit()
+    membership_cache.clear()
+    return tenancies
+
+
+class TestMyTenancies:
+    """Tests for GET /api/tenants/me/tenancies endpoint."""
+
+    def test_success(self, client, auth_token, tenant_tenancies, test_property_1):
+        """Test that tenants see only the tenancies they belong to."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+
+        response = client.get("/api/tenants/me/tenancies", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json) == 1
+        assert response.json[0]["tenancy_id"] == tenant_tenancies[0].tenancy_id
+        assert response.json[0]["address"] == test_property_1.address
+        assert response.json[0]["group_chat"]["name"] == "Tenant Chat 0"
+
+    def test_unauthorized(self, client, landlord_token):
+        """Test that landlords cannot use the tenant endpoint."""
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.get("/api/tenants/me/tenancies", headers=headers)
+
+        assert response.status_code == 403
+
+
+def provision(client, token, tenants):
+    return client.post("/api/tenants/provision", json={"tenants": tenants}, headers={"Authorization": f"Bearer {token}"})
+
+
+class TestProvisionTenants:
+    """Tests for POST /api/tenants/provision endpoint."""
+
+    def test_creates_accounts(self, client, session, outbox, landlord_token, tenant_tenancies):
+        """Test that tenants are created, linked and emailed a link to set a password, not a password."""
+        tenancy_ids = [tenancy.tenancy_id for tenancy in tenant_tenancies]
+        payload = [
+            {"first_name": f"Bulk{index}", "last_name": "Tenant", "email": f"Bulk{index}@Example.com",
+             "tenancy_id": tenancy_ids[index % 2]}
+            for index in range(3)
+        ]
+
+        response = provision(client, landlord_token, payload)
+
+        assert response.status_code == 201
+        created = response.json["tenants"]
+        assert [tenant["email"] for tenant in created] == ["bulk0@example.com", "bulk1@example.com", "bulk2@example.com"]
+        assert "temporary_password" not in created[0]
+        for tenant, item in zip(created, payload):
+            assert session.get(User, tenant["user_id"]).role == "Tenant"
+            assert session.get(Tenant, tenant["user_id"]) is not None
+            assert session.get(TenancyTenants, (item["tenancy_id"], tenant["user_id"])) is not None
+
+        emails = session.query(EmailOutbox).order_by(EmailOutbox.outbox_id).all()
+        assert [email.recipient for email in emails] == [tenant["email"] for tenant in created]
+        token = emails[0].body.split("set_password_page?token=")[1].split("\n")[0]
+        # The stored placeholder isn't a password either
+        placeholder = session.get(User, created[0]["user_id"]).password
+        response = client.post("/api/auth/login", json={"email": "BULK0@example.com", "password": placeholder})
+        assert response.status_code == 401
+        response = client.post("/api/auth/set-password", json={"token": token, "password": "chosen-password"})
+        assert response.status_code == 200
+        response = client.post("/api/auth/login", json={"email": "BULK0@example.com", "password": "chosen-password"})
+        assert response.status_code == 200
+
+    def test_registered_email(self, client, session, outbox, landlord_token, tenant_tenancies):
+        """Test that a batch with an already registered address, in any case, creates nothing."""
+        users_before = session.query(User).count()
+        payload = [
+            {"first_name": "New", "last_name": "Tenant", "email": "new@example.com",
+             "tenancy_id": tenant_tenancies[0].tenancy_id},
+            {"first_name": "Old", "last_name": "Tenant", "email": "TEST@example.com",
+             "tenancy_id": tenant_tenancies[0].tenancy_id},
+        ]
+
+        response = provision(client, landlord_token, payload)
+
+        assert response.status_code == 409
+        assert response.json["emails"] == ["test@example.com"]
+        assert session.query(User).count() == users_before
+        assert session.query(EmailOutbox).count() == 0
+
+    def test_email_index_is_case_insensitive(self, session, test_tenant_1):
+        """Test that the database rejects an address differing from a registered one only in case."""
+        session.add(User(first_name="Case", last_name="Copy", email="Test@Example.com", password="x", role="Tenant"))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.rollback()
+
+    def test_other_landlords_tenancy(self, client, session, test_landlord_2, tenant_tenancies):
+        """Test that tenants can't be added to another landlord's tenancy."""
+        token = create_access_token(identity=str(test_landlord_2.user_id))
+        payload = [{"first_name": "A", "last_name": "B", "email": "a@example.com",
+                    "tenancy_id": tenant_tenancies[0].tenancy_id}]
+
+        assert provision(client, token, payload).status_code == 404
+
+    @pytest.mark.parametrize("payload", [
+        [],
+        [{"first_name": "A", "last_name": "B", "email": "a@example.com"}],
+        [{"first_name": "", "last_name": "B", "email": "a@example.com", "tenancy_id": 1}],
+        [{"first_name": "A", "last_name": "B", "email": "a@example.com", "tenancy_id": 1},
+         {"first_name": "C", "last_name": "D", "email": "A@example.com", "tenancy_id": 1}],
+    ])
+    def test_invalid_payload(self, client, landlord_token, payload):
+        """Test that missing fields and duplicate addresses are rejected before any write."""
+        assert provision(client, landlord_token, payload).status_code == 400
+
+    def test_unauthorized(self, client, auth_token):
+        """Test that tenants cannot provision accounts."""
+        payload = [{"first_name": "A", "last_name": "B", "email": "a@example.com", "tenancy_id": 1}]
+        assert provision(client, auth_token, payload).status_code == 403
+
+
+class TestChatMembership:
+    """Tests for the cached group chat membership check."""
+
+    def test_members(self, session, tenant_tenancies, test_tenant_1, test_landlord_1):
+        """Test membership of tenants and of the landlord who owns the property."""
+        first_chat, second_chat = (tenancy.group_chat_id for tenancy in tenant_tenancies)
+
+        assert is_chat_member(test_tenant_1.user_id, first_chat)
+        assert not is_chat_member(test_tenant_1.user_id, second_chat)
+        assert is_chat_member(test_landlord_1.user_id, second_chat)
+
+    def test_cache_invalidated_on_commit(self, session, tenant_tenancies, test_tenant_1, mocker):
+        """Test that adding or removing a tenancy link refreshes the cached membership."""
+        second_chat = tenant_tenancies[1].group_chat_id
+        assert not is_chat_member(test_tenant_1.user_id, second_chat)
+
+        # Served from the cache while nothing changes
+        loader = mocker.patch.object(
+            chat_membership, "load_group_chat_ids", wraps=chat_membership.load_group_chat_ids
+        )
+        assert not is_chat_member(test_tenant_1.user_id, second_chat)
+        assert loader.call_count == 0
+
+        link = TenancyTenants(tenancy_id=tenant_tenancies[1].tenancy_id, tenant_id=test_tenant_1.user_id)
+        session.add(link)
+        session.commit()
+        assert is_chat_member(test_tenant_1.user_id, second_chat)
+
+        session.delete(link)
+        session.commit()
+        assert not is_chat_member(test_tenant_1.user_id, second_chat)
+        assert loader.call_count == 2
+
+    def test_new_tenancy_adds_landlord_chat(self, client, session, landlord_token, tenant_tenancies,
+                                            test_landlord_1, test_property_1):
+        """Test that a landlord is a member of a tenancy chat as soon as it is created."""
+        assert is_chat_member(test_landlord_1.user_id, tenant_tenancies[0].group_chat_id)
+        headers = {"Authorization": f"Bearer {landlord_token}"}
+
+        response = client.post(
+            f"/api/properties/{test_property_1.property_id}/tenancies",
+            json={"rent_due": 1000.00, "lease_start_date": "2025-01-01"},
+            headers=headers
+        )
+
+        assert is_chat_member(test_landlord_1.user_id, response.json["group_chat"]["group_chat_id"])
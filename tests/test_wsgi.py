@@ -0,0 +1,30 @@
+import io
+import json
+from app import create_app, reinit_after_fork
+from app.extensions import db
+from app.request_log import NonBlockingQueueHandler
+
+
+def test_reinit_after_fork_replaces_pool_and_log_listener():
+    """Test that a forked worker gets its own connection pool and a running log writer."""
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        pool = engine.pool
+    handler = next(handler for handler in app.logger.handlers if isinstance(handler, NonBlockingQueueHandler))
+    parent_listener, parent_queue = handler.listener, handler.queue
+
+    reinit_after_fork(app)
+    parent_listener.stop()
+
+    assert engine.pool is not pool
+    assert handler.queue is not parent_queue
+    assert handler.listener is not parent_listener
+    assert handler.listener._thread.is_alive()
+
+    buffer = io.StringIO()
+    handler.listener.handlers[0].setStream(buffer)
+    app.logger.warning("written by the new listener")
+    handler.queue.join()
+    assert json.loads(buffer.getvalue())["message"] == "written by the new listener"
+    handler.listener.stop()